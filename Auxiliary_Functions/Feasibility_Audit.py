@@ -0,0 +1,222 @@
+import glob
+import json
+import os
+import pickle
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from Auxiliary_Functions.Feasibility_checks import VIOLATION_FAMILIES, feasibility_violations
+from Auxiliary_Functions.Instance_Catalog import DEFAULT_DATA_FOLDERS, InstanceCatalog
+from Auxiliary_Functions.Sparse_Solution import sparse_solution
+from Auxiliary_Functions.Virtual_Instances import VirtualInstances
+
+'''
+Batch feasibility audit of stored routing solutions.
+
+Stored solutions are pickle files written by save_solution (a dict with
+'instance_id' and 'solution', e.g. a result dict of the routing solvers) or
+bare solution dicts named '<instance_id>__<label>.pkl'. The files are grouped
+per instance and checked with feasibility_violations in a process pool; each
+worker resolves instances through its own VirtualInstances, so file-backed
+instances are read from the memory-mapped instance cache and share the page
+cache read-only. The report is one JSON file with a verdict, the violation
+count per constraint family and the check time of every solution.
+'''
+
+SOLUTION_SEPARATOR = "__"  # Between instance ID and label in stored solution file names
+DEFAULT_CHUNK_SIZE = 64  # Solutions per pool job (all of one instance)
+
+# Instance resolver of the worker process (set once per worker)
+_instances = None
+
+
+def solution_file(folder, instance_id, label):
+    """Path of a stored solution, e.g. '<folder>/8R-alpha=021__1011_alns.pkl'."""
+    return os.path.join(folder, f"{instance_id}{SOLUTION_SEPARATOR}{label}.pkl")
+
+
+def save_solution(folder, instance_id, label, result, instance_data=None):
+    """
+    Store a routing solution for the audit; returns the file path.
+
+    Parameters:
+    - label: Name of the solution within the instance, e.g. the configuration label.
+    - result: Result dict of a routing solver (its 'solution' and scalar entries are kept) or a bare solution.
+    - instance_data: If given, dense solution dicts are stored in sparse form.
+    """
+    stored = {key: value for key, value in result.items() if key == 'solution' or isinstance(value, (int, float, str))} \
+        if 'solution' in result else {'solution': result}
+    if instance_data is not None and stored['solution'] is not None:
+        N, Vtotal, W = int(instance_data.S) + 1, int(sum(instance_data.Vind)), int(instance_data.W)
+        stored['solution'] = sparse_solution(stored['solution'], N, Vtotal, W)
+    stored['instance_id'] = instance_id
+
+    os.makedirs(folder, exist_ok=True)
+    file_path = solution_file(folder, instance_id, label)
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(stored, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+def solution_instance_id(file_path):
+    """Instance ID of a stored solution: from its file name, or from its contents for other names."""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    if SOLUTION_SEPARATOR in stem:
+        return stem.split(SOLUTION_SEPARATOR)[0]
+    try:
+        return load_stored_solution(file_path)[0]
+    except Exception:
+        # Unreadable files are reported under their file name
+        return stem
+
+
+def load_stored_solution(file_path):
+    """Read a stored solution; returns (instance ID, solution)."""
+    with open(file_path, 'rb') as file:
+        stored = pickle.load(file)
+    if 'solution' in stored:
+        instance_id, solution = stored.get('instance_id'), stored['solution']
+    else:
+        instance_id, solution = None, stored
+    if instance_id is None:
+        instance_id = os.path.splitext(os.path.basename(file_path))[0].split(SOLUTION_SEPARATOR)[0]
+    return instance_id, solution
+
+
+def solution_files(paths):
+    """Stored solution files of a folder (recursive), a glob pattern, a file or a list of those."""
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, "**", "*.pkl"), recursive=True))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            files.extend(glob.glob(path, recursive=True))
+    return sorted(set(files))
+
+
+def _init_worker(data_folders):
+    global _instances
+    _instances = VirtualInstances(InstanceCatalog(data_folders))
+
+
+def _audit_files(instance_id, files):
+    """Audit the solutions of one instance; returns one record per file."""
+    records = []
+    start = time.perf_counter()
+    try:
+        instance_data = _instances.load(instance_id)
+        error = None if instance_data is not None else f"Instance '{instance_id}' not found"
+    except Exception as e:
+        instance_data, error = None, f"Instance '{instance_id}' could not be loaded: {e}"
+    instance_seconds = time.perf_counter() - start
+
+    for file_path in files:
+        record = {
+            "file": file_path, "instance_id": instance_id, "feasible": None,
+            "violations": dict.fromkeys(VIOLATION_FAMILIES, 0), "load_seconds": 0.0, "check_seconds": 0.0,
+            "error": error,
+        }
+        if error is None:
+            try:
+                start = time.perf_counter()
+                solution = load_stored_solution(file_path)[1]
+                record["load_seconds"] = time.perf_counter() - start
+                if solution is None:
+                    record["error"] = "No solution stored"
+                else:
+                    start = time.perf_counter()
+                    violations = feasibility_violations(instance_data, solution)
+                    record["check_seconds"] = time.perf_counter() - start
+                    for violation in violations:
+                        record["violations"][violation["family"]] += 1
+                    record["feasible"] = not violations
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+        records.append(record)
+    # Instance loading is counted once per job, on its first solution
+    records[0]["load_seconds"] += instance_seconds
+    return records
+
+
+def audit_solutions(paths, data_folders=DEFAULT_DATA_FOLDERS, report_file=None, max_workers=None,
+                    chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Check a batch of stored solutions in parallel and summarize the verdicts.
+
+    Parameters:
+    - paths: Folder, glob pattern or file of stored solutions, or a list of those.
+    - data_folders: Data folders of the instance catalog.
+    - report_file: JSON file the report is written to (None to only return it).
+    - max_workers: Worker processes (default: number of CPUs); 1 checks in this process.
+    - chunk_size: Solutions of one instance per pool job.
+
+    Returns the report: {'summary': totals, 'results': one record per solution, sorted by file}.
+    """
+    start = time.perf_counter()
+    groups = defaultdict(list)
+    for file_path in solution_files(paths):
+        instance_id = solution_instance_id(file_path)
+        groups[instance_id].append(file_path)
+    jobs = [(instance_id, files[k:k + chunk_size]) for instance_id, files in sorted(groups.items())
+            for k in range(0, len(files), chunk_size)]
+
+    results = []
+    if max_workers == 1:
+        _init_worker(data_folders)
+        for job in jobs:
+            results.extend(_audit_files(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(data_folders,)) as pool:
+            futures = [pool.submit(_audit_files, *job) for job in jobs]
+            for future in as_completed(futures):
+                results.extend(future.result())
+    results.sort(key=lambda record: record["file"])
+
+    summary = {
+        "solutions": len(results),
+        "feasible": sum(record["feasible"] is True for record in results),
+        "infeasible": sum(record["feasible"] is False for record in results),
+        "errors": sum(record["error"] is not None for record in results),
+        "violations": {family: sum(record["violations"][family] for record in results) for family in VIOLATION_FAMILIES},
+        "check_seconds": sum(record["check_seconds"] for record in results),
+        "load_seconds": sum(record["load_seconds"] for record in results),
+        "wall_seconds": time.perf_counter() - start,
+    }
+    report = {"summary": summary, "results": results}
+
+    if report_file is not None:
+        os.makedirs(os.path.dirname(report_file) or ".", exist_ok=True)
+        tmp_path = f"{report_file}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(report, file, indent=1)
+        os.replace(tmp_path, report_file)
+    return report
+
+
+if __name__ == "__main__":
+    # Stored solutions (folder, glob pattern or list), e.g. the solution folder of main.py
+    solution_paths = "ML Experiments/Heuristic Results/Solutions"
+
+    # Report of the audit
+    report_file = "ML Experiments/Heuristic Results/Solutions/feasibility_audit.json"
+
+    report = audit_solutions(solution_paths, report_file=report_file)
+    summary = report["summary"]
+    print(f"Audited {summary['solutions']} solutions in {summary['wall_seconds']:.1f} s: {summary['feasible']} feasible, "
+          f"{summary['infeasible']} infeasible, {summary['errors']} errors")
+    for family, count in summary["violations"].items():
+        if count:
+            print(f"  {family}: {count}")
+    print(f"Report saved to {report_file}")
@@ -1,172 +1,243 @@
+import os
+import sys
+from collections import deque
 
-def check_feasibility(instance_data, solution):
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from Auxiliary_Functions.Sparse_Solution import SparseVariable
+
+'''
+Feasibility checks of routing solutions.
+
+The solution is turned into arrays once (xijv dense, fijvw as the COO entries of
+its nonzero flows) and every constraint family is evaluated as array
+reductions, so the cost grows with the flows used rather than with N*N*V*W.
+'''
+
+TOLERANCE = 1e-6  # Tolerance of the balance and flow-arc checks
+
+# Constraint families of feasibility_violations, in check order
+VIOLATION_FAMILIES = (
+    "origin_flow", "destination_flow", "flow_conservation", "flow_without_arc", "transfer_without_hub",
+    "capacity", "node_balance", "vehicle_acquisition", "continuous_path",
+)
+
+
+def solution_arrays(instance_data, solution):
     """
-    Feasibility check function for a vehicle routing and transshipment problem.
+    Arrays of a solution given as {key: value} dicts or SparseVariable families:
+    av (V,), yi (N,), xijv (N, N, V) and the nonzero fijvw entries as (indices (k, 4), values (k,)).
+    """
+    N = int(instance_data.S) + 1
+    Vtotal = int(instance_data.Vind[0]) + int(instance_data.Vind[1])
+    av = _dense(solution['av'], (Vtotal,))
+    yi = _dense(solution['yi'], (N,))
+    xijv = _dense(solution['xijv'], (N, N, Vtotal))
+    f_index, f_values = _coo(solution['fijvw'], 4)
+    return av, yi, xijv, f_index, f_values
+
+
+def _coo(values, ndim):
+    """Indices (k, ndim) and values (k,) of the nonzero entries of a family."""
+    if isinstance(values, SparseVariable):
+        return values.indices.astype(np.int64), np.ones(len(values.indices))
+    entries = [(key, value) for key, value in values.items() if value != 0]
+    index = np.array([key for key, _ in entries], dtype=np.int64).reshape(-1, ndim)
+    return index, np.array([value for _, value in entries], dtype=float)
+
+
+def _dense(values, shape):
+    if isinstance(values, SparseVariable):
+        return values.to_dense(float)
+    dense = np.zeros(shape)
+    index, data = _coo(values, len(shape))
+    dense[tuple(index.T)] = data
+    return dense
+
+
+def _sum_by(keys, values):
+    """Sums of values per distinct key, keys in ascending order."""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=values, minlength=len(unique))
+
+
+def feasibility_violations(instance_data, solution):
+    """
+    Constraint violations of a routing solution, one dict per violation:
+    {'family', 'index', 'magnitude', 'message'}, in the order of the check_feasibility errors.
+
+    Families (index): origin_flow (w,), destination_flow (w,), flow_conservation (i, w),
+    flow_without_arc (i, j, v, w), transfer_without_hub (j, v, w), capacity (i, j, v),
+    node_balance (v, i), vehicle_acquisition (i, j, v) and continuous_path (w,).
+    Magnitudes are the absolute imbalance or the excess over the bound.
     """
     # Extract instance parameters
-    N = instance_data.S + 1 # Total number of nodes
-    W = instance_data.W  # Number of demands
-    V_small_total = instance_data.Vind[0]
-    V_big_total = instance_data.Vind[1]
-    Vtotal = V_small_total + V_big_total # Number of vehicles
-    ow = instance_data.ow # Origins of demands
-    dw = instance_data.dw  # Destinations of demands
-    qw = instance_data.qw # Demand quantities
+    N = int(instance_data.S) + 1  # Total number of nodes
+    V_small_total = int(instance_data.Vind[0])
+    ow = np.asarray(instance_data.ow)  # Origins of demands
+    dw = np.asarray(instance_data.dw)  # Destinations of demands
+    qw = np.asarray(instance_data.qw, dtype=float)  # Demand quantities
     vcapacity = instance_data.vcap  # Vehicle capacities
-    # si = instance_data.si  # Indicator for transshipment nodes
-    # tawv = instance_data.tawv  # Vehicle weights
-    
-    # Extract solution variables
-    fijvw = solution['fijvw']  # Flow variables
-    xijv = solution['xijv']  # Arc usage
-    av = solution['av']  # Vehicle acquisition
-    Zvi = solution['Zvi']  # Node visit
-    yi = solution['yi']  # Hub/transshipment node activation
-
-    # Initialize flags and error list
-    feasible = True
-    errors = []
-
-    nonzero_flows = [w for w, flow in enumerate(qw) if flow > 0]
-
-    # (2) Flow balance at origin
-    for w in nonzero_flows:
-        sum_flow = sum(
-            fijvw[ow[w], j, v, w] for v in range(Vtotal) for j in range(1, N)
-        )
-        if sum_flow != 1:  # Allow a small tolerance for floating-point errors
-            feasible = False
-            errors.append(f"Flow balance violated at origin for demand {w}.")
-
-    # (3) Flow balance at destination
-    for w in nonzero_flows:
-        sum_flow = sum(
-            fijvw[i, dw[w], v, w] for v in range(Vtotal) for i in range(1, N)
-        )
-        if sum_flow != 1:
-            feasible = False
-            errors.append(f"Flow balance violated at destination for demand {w}.")
-
-    # (4) Flow balance at intermediate nodes
-    for w in nonzero_flows:
-        for i in range(1, N):
-            if i != ow[w] and i != dw[w]:
-                sum_out = sum(
-                    fijvw[i, j, v, w] for v in range(Vtotal) for j in range(1, N) if j != i
-                )
-                sum_in = sum(
-                    fijvw[j, i, v, w] for v in range(Vtotal) for j in range(1, N) if j != i
-                )
-                if not abs(sum_out - sum_in) < 1e-6:
-                    feasible = False
-                    errors.append(f"Flow conservation violated at node {i} for demand {w}.")
+    nonzero_flows = np.asarray(instance_data.nonzero_flows, dtype=np.int64)
+
+    av, yi, xijv, f_index, f_values = solution_arrays(instance_data, solution)
+
+    # Flows of nonzero commodities on customer arcs (the entries the constraints read); commodities are
+    # numbered by their position in nonzero_flows so results come out in its order
+    K = len(nonzero_flows)
+    position = np.full(int(instance_data.W), -1)
+    position[nonzero_flows] = np.arange(K)
+    i, j, v, w = f_index.T
+    keep = (i >= 1) & (j >= 1) & (position[w] >= 0)
+    i, j, v, w, f = i[keep], j[keep], v[keep], w[keep], f_values[keep]
+    k = position[w]
+
+    violations = []
+
+    def add(family, index, magnitude, message):
+        violations.append({'family': family, 'index': index, 'magnitude': float(magnitude), 'message': message})
+
+    # (2) Flow balance at origin, (3) at destination
+    for family, at_node, place in [("origin_flow", i == ow[w], "origin"), ("destination_flow", j == dw[w], "destination")]:
+        sums = np.bincount(k[at_node], weights=f[at_node], minlength=K)
+        for c in np.flatnonzero(sums != 1):
+            add(family, (int(nonzero_flows[c]),), abs(sums[c] - 1),
+                f"Flow balance violated at {place} for demand {nonzero_flows[c]}.")
+
+    # (4) Flow balance at intermediate nodes: out - in per (w, i)
+    arc = i != j
+    keys, net = _sum_by(np.concatenate([k[arc] * N + i[arc], k[arc] * N + j[arc]]), np.concatenate([f[arc], -f[arc]]))
+    c, node = keys // N, keys % N
+    commodity = nonzero_flows[c]
+    for idx in np.flatnonzero((np.abs(net) >= TOLERANCE) & (node != ow[commodity]) & (node != dw[commodity])):
+        add("flow_conservation", (int(node[idx]), int(commodity[idx])), abs(net[idx]),
+            f"Flow conservation violated at node {node[idx]} for demand {commodity[idx]}.")
 
     # (5) Flow implies arc usage
-    for v in range(Vtotal):
-        for w in nonzero_flows:
-            for i in range(1, N):
-                for j in range(1, N):
-                    if fijvw[i, j, v, w] > xijv[i, j, v] + 1e-6:
-                        feasible = False
-                        errors.append(f"Flow on arc ({i}, {j}) in vehicle {v} without arc usage.")
-
-    # (6) Transshipment vehicle changes
-    for v in range(Vtotal):
-        for w in nonzero_flows:
-            for j in range(1, N):
-                if j != ow[w] and j != dw[w] and yi[j] == 0:
-                    sum_flow = sum(
-                        fijvw[i, j, v, w] - fijvw[j, i, v, w] for i in range(1, N) if i != j
-                    )
-                    if not abs(sum_flow) < 1e-6:
-                        feasible = False
-                        errors.append(f"Flow balance at non-transshipment node {j} violated for demand {w}.")
-
-    # (7) Vehicle capacity constraints
-    for v in range(Vtotal):
-        for i in range(1, N):
-            for j in range(1, N):
-                total_flow = sum(qw[w] * fijvw[i, j, v, w] for w in nonzero_flows)
-                if v in range (V_small_total):
-                    if total_flow > vcapacity[0] * xijv[i, j, v]:
-                        feasible = False
-                        errors.append(f"Capacity constraint violated on arc ({i}, {j}) for vehicle {v}.")
-                
-                if v in range (V_small_total):
-                    if total_flow > vcapacity[1] * xijv[i, j, v]:
-                        feasible = False
-                        errors.append(f"Capacity constraint violated on arc ({i}, {j}) for vehicle {v}.")
-
-    # (8) Node balance for vehicles
-    for v in range(Vtotal):
-        for i in range(N):
-            sum_out = sum(xijv[i, j, v] for j in range(N) if i != j)
-            sum_in = sum(xijv[j, i, v] for j in range(N) if i != j)
-            if not abs(sum_out - sum_in) < 1e-6:
-                feasible = False
-                errors.append(f"Node balance violated for vehicle {v} at node {i}.")
+    excess = f - xijv[i, j, v]
+    over = np.flatnonzero(excess > TOLERANCE)
+    for idx in over[np.lexsort((j[over], i[over], k[over], v[over]))]:
+        add("flow_without_arc", (int(i[idx]), int(j[idx]), int(v[idx]), int(w[idx])), excess[idx],
+            f"Flow on arc ({i[idx]}, {j[idx]}) in vehicle {v[idx]} without arc usage.")
+
+    # (6) Transshipment vehicle changes: in - out per (v, w, j) at nodes that are not open hubs
+    keys, net = _sum_by(np.concatenate([(v[arc] * K + k[arc]) * N + j[arc], (v[arc] * K + k[arc]) * N + i[arc]]),
+                        np.concatenate([f[arc], -f[arc]]))
+    vehicle, c, node = keys // (K * N), keys // N % K, keys % N
+    commodity = nonzero_flows[c]
+    changed = (np.abs(net) >= TOLERANCE) & (node != ow[commodity]) & (node != dw[commodity]) & (yi[node] == 0)
+    for idx in np.flatnonzero(changed):
+        add("transfer_without_hub", (int(node[idx]), int(vehicle[idx]), int(commodity[idx])), abs(net[idx]),
+            f"Flow balance at non-transshipment node {node[idx]} violated for demand {commodity[idx]}.")
+
+    # (7) Vehicle capacity constraints (small vehicles; checked against both capacities as before)
+    small = v < V_small_total
+    keys, load = _sum_by((v[small] * N + i[small]) * N + j[small], qw[w[small]] * f[small])
+    vehicle, a, b = keys // (N * N), keys // N % N, keys % N
+    arc_use = xijv[a, b, vehicle]
+    for idx in range(len(keys)):
+        for capacity in (vcapacity[0], vcapacity[1]):
+            if load[idx] > capacity * arc_use[idx]:
+                add("capacity", (int(a[idx]), int(b[idx]), int(vehicle[idx])), load[idx] - capacity * arc_use[idx],
+                    f"Capacity constraint violated on arc ({a[idx]}, {b[idx]}) for vehicle {vehicle[idx]}.")
+
+    # (8) Node balance for vehicles: out - in per (v, i)
+    loops = np.einsum('iiv->iv', xijv)
+    balance = ((xijv.sum(axis=1) - loops) - (xijv.sum(axis=0) - loops)).T
+    for vehicle, node in np.argwhere(np.abs(balance) >= TOLERANCE):
+        add("node_balance", (int(vehicle), int(node)), abs(balance[vehicle, node]),
+            f"Node balance violated for vehicle {vehicle} at node {node}.")
 
     # (12) Vehicle acquisition
-    for v in range(Vtotal):
-        if av[v] < 0.5:  # Vehicle not acquired
-            for i in range(N):
-                for j in range(N):
-                    if xijv[i, j, v] > 1e-6:
-                        feasible = False
-                        errors.append(f"Vehicle {v} traverses arc ({i}, {j}) without being acquired.")
-
-    # Final check for continuous paths
-    for w in nonzero_flows:
-        if not check_continuous_path(w, ow[w], dw[w], fijvw, xijv, Vtotal, yi):
-            feasible = False
-            # errors.append(f"No continuous feasible path for demand {w}.")******** (checking this error is not accurate)
-
-    # Return feasibility and errors
-    return feasible, errors
-
-def check_continuous_path(w, origin, destination, fijvw, xijv, Vtotal, yi):
+    unused = np.flatnonzero(av < 0.5)
+    arcs = xijv[:, :, unused].transpose(2, 0, 1)
+    for u, a, b in np.argwhere(arcs > TOLERANCE):
+        add("vehicle_acquisition", (int(a), int(b), int(unused[u])), arcs[u, a, b],
+            f"Vehicle {unused[u]} traverses arc ({a}, {b}) without being acquired.")
+
+    # Final check for continuous paths (flow arcs indexed once for all commodities)
+    arcs = commodity_arcs(f_index, f_values)
+    for commodity in nonzero_flows:
+        if not check_continuous_path(commodity, ow[commodity], dw[commodity], solution['fijvw'], None, None,
+                                     solution['yi'], arcs=arcs.get(int(commodity), {})):
+            add("continuous_path", (int(commodity),), 1.0, f"No continuous feasible path for demand {commodity}.")
+
+    return violations
+
+
+def check_feasibility(instance_data, solution):
+    """
+    Feasibility check function for a vehicle routing and transshipment problem.
+
+    Returns (feasible, errors): errors lists the messages of feasibility_violations, except for
+    continuous path violations, which make the solution infeasible without a message.
+    """
+    violations = feasibility_violations(instance_data, solution)
+    errors = [violation['message'] for violation in violations if violation['family'] != "continuous_path"]
+    return not violations, errors
+
+def commodity_arcs(f_index, f_values, threshold=0.05):
+    """
+    Outgoing flow arcs per commodity and node, {w: {i: [(j, v), ...]}}, of the fijvw entries above
+    threshold given as COO arrays (see solution_arrays).
+    """
+    arcs = {}
+    used = f_values > threshold
+    for i, j, v, w in f_index[used].tolist():
+        arcs.setdefault(w, {}).setdefault(i, []).append((j, v))
+    return arcs
+
+
+def check_continuous_path(w, origin, destination, fijvw, xijv, Vtotal, yi, *, arcs=None):
     """
     Check if there is a continuous path from origin to destination for a demand.
     Vehicle changes are allowed only at transshipment nodes.
-    
+
+    Breadth-first search over (node, vehicle) states along the flow arcs of the demand, so a node
+    reached on one vehicle can still be left on another one, and the work is linear in the arcs used.
+
     Parameters:
+    - w: Demand index.
     - origin: Origin node for the demand.
     - destination: Destination node for the demand.
-    - fijvw: Flow variables.
-    - xijv: Arc usage variables.
-    - Vtotal: Total number of vehicles.
-    - si: Indicator for transshipment nodes.
+    - fijvw: Flow variables (dict or SparseVariable; only read if arcs is None).
+    - xijv: Deprecated and ignored (the search only follows the flow arcs); pass None.
+    - Vtotal: Deprecated and ignored; pass None. Both keep their positions so existing
+      positional callers keep working.
     - yi: Hub/transshipment activation variables.
+    - arcs: Outgoing arcs of the demand per node ({i: [(j, v), ...]}, see commodity_arcs);
+      built from fijvw if None.
 
     Returns:
     - True if a continuous path exists, False otherwise.
     """
-    visited = set()  # Keep track of visited nodes
-    stack = [(origin, None)]  # Stack for DFS: (current node, current vehicle)
+    if arcs is None:
+        arcs = commodity_arcs(*_coo(fijvw, 4)).get(w, {})
 
-    while stack:
-        current_node, current_vehicle = stack.pop()
+    start = (origin, None)  # No vehicle boarded yet
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        node, vehicle = queue.popleft()
 
         # If we reach the destination, the path is valid
-        if current_node == destination:
+        if node == destination:
             return True
 
-        # Skip already visited nodes or the depot (if not relevant)
-        if current_node in visited:
-            continue
-        visited.add(current_node)
-
-        # Check all possible outgoing arcs
-        for j in range(len(xijv)):  # Assuming `xijv` has dimensions for all nodes
-            for v in range(Vtotal):  # Loop over all vehicles
-                if fijvw.get((current_node, j, v, w), 0) > 0.05:  # Check if flow exists
-                    if current_vehicle is None or current_vehicle == v:
-                        # Continue along the same vehicle
-                        stack.append((j, v))
-                    elif yi.get(current_node, 0) > 0.5:  # Change vehicle only at transshipment nodes
-                        stack.append((j, v))
-
-    # If we exit the loop without reaching the destination, the path is invalid
+        # Change vehicle only at transshipment nodes
+        hub = yi.get(node, 0) > 0.5
+        for j, v in arcs.get(node, ()):
+            if vehicle is None or vehicle == v or hub:
+                state = (j, v)
+                if state not in seen:
+                    seen.add(state)
+                    queue.append(state)
+
+    # If the search ends without reaching the destination, the path is invalid
     return False
 
 # Load instance data and solution from the .pkl file
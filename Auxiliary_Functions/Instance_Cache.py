@@ -0,0 +1,276 @@
+import atexit
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from Auxiliary_Functions.Reading_Instances import InstanceData, read_instance_from_dat
+
+'''
+Persistent binary cache of parsed .dat instances.
+
+Every cached instance is one binary file holding its arrays back to back, and
+index.json records, per source file, its mtime, size and content hash plus the
+layout of the arrays. Loads memory-map the binary file (copy-on-write), so the
+InstanceData arrays are views of the page cache instead of freshly parsed copies.
+
+Several processes may share one cache (e.g. the worker pools of
+Generate_Instances and Feasibility_Audit): entry files are named by source
+path and content hash, and every process merges its index into the one on disk
+under a lock file before replacing it, so no process drops the entries of
+another one and eviction sees every entry.
+'''
+
+DEFAULT_CACHE_DIR = os.path.join(project_root, "DATA", ".instance_cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+LOCK_TIMEOUT = 30.0  # Seconds after which a lock file is taken as left behind by a killed process
+ORPHAN_AGE = 600.0  # Seconds after which an entry file no index entry refers to is removed
+ALIGNMENT = 64
+
+
+def file_content_hash(file_path, chunk_size=1 << 20):
+    """SHA-256 of the file contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class InstanceCache:
+    """
+    Content-addressed cache of parsed instances with a size cap and LRU eviction.
+
+    Parameters:
+    - cache_dir: Folder holding the binary entries and the index.
+    - max_bytes: Total size of the binary entries kept before the least recently used are evicted.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._dropped = {}  # key -> content hash of the entries dropped since the last flush
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._read_index()
+
+    def load(self, file_path):
+        """Return the InstanceData for file_path, parsing and caching it if needed."""
+        file_path = os.path.abspath(file_path)
+        key = hashlib.sha1(file_path.encode()).hexdigest()
+        stat = os.stat(file_path)
+        entry = self._index.get(key)
+        if entry is None:
+            # Another process may have cached it since the index was read
+            entry = self._read_index().get(key)
+            if entry is not None:
+                self._index[key] = entry
+
+        content_hash = None
+        if entry is not None and not (entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size):
+            # The file was touched: still a hit if the contents are unchanged
+            content_hash = file_content_hash(file_path)
+            if entry['content_hash'] == content_hash:
+                entry['mtime_ns'] = stat.st_mtime_ns
+                entry['size'] = stat.st_size
+            else:
+                self._drop(key)
+                entry = None
+
+        if entry is not None:
+            try:
+                data = self._read_entry(key, entry)
+            except (OSError, ValueError):
+                self._drop(key)
+            else:
+                entry['last_access'] = time.time()
+                self._dirty = True
+                self.hits += 1
+                return data
+
+        self.misses += 1
+        data = read_instance_from_dat(file_path)
+        self._write_entry(key, file_path, stat, content_hash or file_content_hash(file_path), data)
+        self.flush()
+        return data
+
+    def flush(self):
+        """
+        Merge the in-memory index into the index on disk (under the lock file), evict least recently
+        used entries and orphaned entry files, and write the merged index back if anything changed.
+        """
+        if not self._dirty:
+            return
+        with self._locked():
+            index = self._read_index()
+            for key, content_hash in self._dropped.items():
+                if key in index and index[key]['content_hash'] == content_hash:
+                    del index[key]
+            for key, entry in self._index.items():
+                other = index.get(key)
+                if other is not None and other['content_hash'] == entry['content_hash']:
+                    entry['last_access'] = max(entry['last_access'], other['last_access'])
+                index[key] = entry
+            self._index = index
+            self._evict()
+            self._remove_orphans()
+
+            index_path = os.path.join(self.cache_dir, INDEX_FILE)
+            tmp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump(self._index, file)
+            os.replace(tmp_path, index_path)
+        self._dropped = {}
+        self._dirty = False
+
+    def clear(self):
+        """Remove every cached entry."""
+        self._index = {**self._read_index(), **self._index}
+        for key in list(self._index):
+            self._drop(key)
+        self.flush()
+
+    def total_bytes(self):
+        return sum(entry['bytes'] for entry in self._index.values())
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE), 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _entry_path(self, key, content_hash):
+        return os.path.join(self.cache_dir, f"{key}-{content_hash[:16]}.bin")
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Hold the lock file of the index (created exclusively; a lock older than LOCK_TIMEOUT is taken over)."""
+        lock_path = os.path.join(self.cache_dir, LOCK_FILE)
+        while True:
+            try:
+                descriptor = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > LOCK_TIMEOUT:
+                        os.remove(lock_path)
+                        continue
+                except OSError:
+                    continue
+                time.sleep(0.005)
+        try:
+            yield
+        finally:
+            os.close(descriptor)
+            os.remove(lock_path)
+
+    def _remove_orphans(self):
+        """Remove entry files no index entry refers to (replaced entries, entries of lost indexes)."""
+        referenced = {os.path.basename(self._entry_path(key, entry['content_hash'])) for key, entry in self._index.items()}
+        now = time.time()
+        for item in os.scandir(self.cache_dir):
+            if item.name.endswith(".bin") and item.name not in referenced:
+                try:
+                    # Entries of other processes are written just before their flush
+                    if now - item.stat().st_mtime > ORPHAN_AGE:
+                        os.remove(item.path)
+                except OSError:
+                    pass
+
+    def _write_entry(self, key, file_path, stat, content_hash, data):
+        state = data.__getstate__()
+        layout = {}
+        offset = 0
+        arrays = []
+        for name in InstanceData._ARRAY_FIELDS:
+            if name not in state:
+                continue
+            array = np.ascontiguousarray(state[name])
+            layout[name] = [array.dtype.str, list(array.shape), offset]
+            arrays.append((offset, array))
+            offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+        entry_path = self._entry_path(key, content_hash)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            for start, array in arrays:
+                file.seek(start)
+                file.write(array.tobytes())
+            file.truncate(max(offset, 1))
+        os.replace(tmp_path, entry_path)
+
+        self._index[key] = {
+            'path': file_path,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'content_hash': content_hash,
+            'bytes': max(offset, 1),
+            'last_access': time.time(),
+            'scalars': {
+                name: state[name].item() if isinstance(state[name], np.generic) else state[name]
+                for name in InstanceData._SCALAR_FIELDS
+            },
+            'layout': layout,
+        }
+        self._dirty = True
+
+    def _read_entry(self, key, entry):
+        buffer = np.memmap(self._entry_path(key, entry['content_hash']), dtype=np.uint8, mode='c')
+        fields = dict(entry['scalars'])
+        for name, (dtype, shape, offset) in entry['layout'].items():
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape))
+            fields[name] = buffer[offset:offset + count * dtype.itemsize].view(dtype).reshape(shape)
+        return InstanceData(**fields)
+
+    def _drop(self, key):
+        entry = self._index.pop(key, None)
+        self._dirty = True
+        if entry is None:
+            return
+        self._dropped[key] = entry['content_hash']
+        try:
+            os.remove(self._entry_path(key, entry['content_hash']))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        total = self.total_bytes()
+        for key in sorted(self._index, key=lambda k: self._index[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]['bytes']
+            self._drop(key)
+
+
+_default_cache = None
+
+
+def load_instance(file_path, cache=None):
+    """
+    Load an instance through the binary cache (drop-in for read_instance_from_dat).
+
+    Parameters:
+    - file_path: Path to the .dat file.
+    - cache: InstanceCache to use; defaults to a shared cache in DATA/.instance_cache.
+    """
+    global _default_cache
+    if cache is None:
+        if _default_cache is None:
+            _default_cache = InstanceCache()
+            atexit.register(_default_cache.flush)
+        cache = _default_cache
+    return cache.load(file_path)
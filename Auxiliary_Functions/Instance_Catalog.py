@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import re
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+
+'''
+Catalog of the instance library: instance ID -> path and metadata.
+
+The data folders are scanned once per run (one directory listing each) and the
+result is persisted, one file per folder list, so files whose size and mtime did
+not change are not re-read. Lookups and metadata selection are then plain
+dictionary operations.
+'''
+
+DEFAULT_DATA_FOLDERS = [
+    "DATA/Luisa Data",
+    "DATA/Modified/Flow Modifications",
+    "DATA/Modified/Hub Cost Modifications",
+    "DATA/Modified/BOTH",
+]
+DEFAULT_CATALOG_DIR = os.path.join(project_root, "DATA", ".instance_catalogs")
+
+INSTANCE_ID_PATTERN = re.compile(
+    r"^(?P<base>.+?)(?:_Flow_(?P<flow>\d+)perc)?(?:_HubCosts_(?P<hub>\d+)perc)?(?:_seed(?P<seed>\d+))?$"
+)
+
+
+def parse_instance_id(instance_id):
+    """
+    Split an instance ID into its base instance and modification percentages.
+
+    Example: '8R-alpha=021_Flow_50perc_HubCosts_5perc' -> ('8R-alpha=021', 50, 5).
+    Percentages that are not part of the ID are returned as None. The '_seed<N>' suffix
+    of recipe IDs (see Virtual_Instances.py) is not part of the base.
+    """
+    match = INSTANCE_ID_PATTERN.match(instance_id)
+    flow = match.group('flow')
+    hub = match.group('hub')
+    return match.group('base'), int(flow) if flow else None, int(hub) if hub else None
+
+
+def default_catalog_file(data_folders):
+    """Catalog file of a folder list, keyed by the resolved folders so callers with other lists keep their own."""
+    folders = "\n".join(os.path.abspath(folder) for folder in data_folders)
+    return os.path.join(DEFAULT_CATALOG_DIR, f"{hashlib.sha1(folders.encode()).hexdigest()[:16]}.json")
+
+
+def instance_record(instance_id, data):
+    """Metadata of an instance (S, nonzero commodities, base and modification percentages) as used by select."""
+    base, flow_perc, hub_perc = parse_instance_id(instance_id)
+    return {
+        'S': int(data.S),
+        'nonzero_commodities': len(data.nonzero_flows),
+        'base': base,
+        'flow_perc': flow_perc,
+        'hub_perc': hub_perc,
+    }
+
+
+def record_matches(record, criteria):
+    """True if a record satisfies every criterion (a value compared for equality or a predicate)."""
+    return all(
+        condition(record.get(field)) if callable(condition) else record.get(field) == condition
+        for field, condition in criteria.items()
+    )
+
+
+class InstanceCatalog:
+    """
+    Persisted index from instance ID to (absolute) path, file size, S and number of nonzero commodities.
+
+    Parameters:
+    - data_folders: Folders to scan. When an ID exists in several folders the first folder wins.
+    - catalog_file: JSON file the index is persisted to (default: one file per resolved folder list
+      in DATA/.instance_catalogs).
+    """
+    def __init__(self, data_folders=DEFAULT_DATA_FOLDERS, catalog_file=None):
+        self.data_folders = list(data_folders)
+        self.catalog_file = catalog_file if catalog_file is not None else default_catalog_file(self.data_folders)
+        self.records = {}
+        self.refresh()
+
+    def refresh(self):
+        """Rescan the data folders, re-reading only new or changed files."""
+        previous = self._read_catalog()
+        records = {}
+        for folder in self.data_folders:
+            if not os.path.isdir(folder):
+                continue
+            for entry in os.scandir(folder):
+                if not entry.name.endswith(".dat"):
+                    continue
+                instance_id = entry.name[:-len(".dat")]
+                if instance_id in records:
+                    continue
+                path = os.path.abspath(entry.path)
+                stat = entry.stat()
+                record = previous.get(instance_id)
+                if (record is None or record['path'] != path
+                        or record['mtime_ns'] != stat.st_mtime_ns or record['size'] != stat.st_size):
+                    record = self._make_record(instance_id, path, stat)
+                records[instance_id] = record
+
+        changed = records != previous
+        self.records = records
+        if changed:
+            self._write_catalog()
+
+    def resolve(self, instance_id):
+        """Return the path of an instance (ID with or without '.dat'), or None if unknown."""
+        if instance_id.endswith(".dat"):
+            instance_id = instance_id[:-len(".dat")]
+        record = self.records.get(instance_id)
+        return record['path'] if record is not None else None
+
+    def select(self, **criteria):
+        """
+        Return the sorted instance IDs whose metadata matches every criterion.
+
+        Each criterion is either a value compared for equality or a predicate, e.g.
+        catalog.select(S=lambda S: S <= 10, flow_perc=50).
+        """
+        return sorted(instance_id for instance_id, record in self.records.items() if record_matches(record, criteria))
+
+    def __contains__(self, instance_id):
+        return self.resolve(instance_id) is not None
+
+    def __len__(self):
+        return len(self.records)
+
+    def _make_record(self, instance_id, path, stat):
+        return {
+            'path': path,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            **instance_record(instance_id, read_instance_from_dat(path)),
+        }
+
+    def _read_catalog(self):
+        try:
+            with open(self.catalog_file, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_catalog(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.catalog_file)), exist_ok=True)
+        tmp_path = f"{self.catalog_file}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self.records, file, indent=1)
+        os.replace(tmp_path, self.catalog_file)
@@ -7,18 +7,19 @@ project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
 from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
-from Auxiliary_Functions.Reading_Instances import InstanceData
+from Auxiliary_Functions.Reading_Instances import SPARSE_MARKER
 import numpy as np
-import random
 
 
-def save_instance_to_file(data, file_path):
+def save_instance_to_file(data, file_path, sparse=False):
     """
     Save the modified InstanceData back to a .dat file.
     
     Parameters:
     - data: InstanceData object to save.
     - file_path: Path to the output file.
+    - sparse: If True, write the sparse variant: only the nonzero commodities
+      ('ow dw qw' rows) followed by the S x S distance matrix.
     """
     with open(file_path, 'w') as file:
         # Write vehicle data
@@ -33,58 +34,61 @@ def save_instance_to_file(data, file_path):
         for x, y in zip(data.Hub_x, data.Hub_y):
             file.write(f"{x} {y}\n")
         
+        if sparse:
+            # Write nonzero commodities and the distance matrix
+            commodities = data.commodities
+            file.write(f"{SPARSE_MARKER} {len(commodities.w)}\n")
+            for ow, dw, qw in zip(commodities.ow, commodities.dw, commodities.qw):
+                file.write(f"{ow} {dw} {qw}\n")
+            for row in data.od_dist_matrix:
+                file.write(" ".join(f"{od}" for od in row) + "\n")
+            return
+
         # Write demand data
         for ow, dw, qw, od in zip(data.ow, data.dw, data.qw, data.od_dist):
             file.write(f"{ow} {dw} {qw} {od}\n")
 
-def modify_flow(data, percentage):
+def modify_flow(data, percentage, rng=None):
     """
     Modify the flow data to match a given percentage by randomly selecting destinations for each origin.
     
     Parameters:
     - data: InstanceData object containing the demand data.
     - percentage: Percentage of flow to retain (e.g., 10, 20, ... 90).
+    - rng: numpy.random.Generator used for the selection (a fresh unseeded one if None).
     
     Returns:
     - modified_data: A new InstanceData object with modified flow data.
     """
     S = data.S  # Number of nodes
-    total_pairs = S * S
-
-    # Reshape qw into S x S matrix for easier manipulation
-    qw_matrix = np.array(data.qw).reshape(S, S)
-
-    # Set self-loops to zero
-    np.fill_diagonal(qw_matrix, 0)
 
     # Determine how many destinations to keep per origin
     num_to_keep = int(S * (percentage / 100.0))
-    
-    # Randomly modify flows
-    for i in range(S):
-        destinations = list(range(S))
-        destinations.remove(i)  # Exclude self-loops
-        
-        # Randomly select destinations to keep
-        keep = random.sample(destinations, num_to_keep)
-        
-        # Set flows to zero for non-selected destinations
-        for j in destinations:
-            if j not in keep:
-                qw_matrix[i, j] = 0
 
-    # Flatten modified flow matrix back into the qw list
-    modified_qw = qw_matrix.flatten().tolist()
-
-    # Create a modified InstanceData object
-    modified_data = InstanceData()
-    modified_data.__dict__.update(data.__dict__)  # Copy original data
-    modified_data.qw = modified_qw  # Replace qw with modified flows
+    if rng is None:
+        rng = np.random.default_rng()
+
+    # Select the kept destinations of all origins at once: the num_to_keep smallest
+    # random keys per row, with the self-loop key pushed to the end
+    keys = rng.random((S, S))
+    np.fill_diagonal(keys, np.inf)
+    keep = np.zeros((S, S), dtype=bool)
+    if num_to_keep > 0:
+        kept_destinations = np.argpartition(keys, num_to_keep - 1, axis=1)[:, :num_to_keep]
+        keep[np.arange(S)[:, None], kept_destinations] = True
+    # Self-loops are always dropped
+    np.fill_diagonal(keep, False)
+
+    # Create a modified InstanceData object sharing the unchanged arrays
+    if data.is_sparse:
+        kept = keep[data.sparse_w // S, data.sparse_w % S]
+        modified_data = data.replace(sparse_w=data.sparse_w[kept], sparse_q=data.sparse_q[kept])
+    else:
+        modified_data = data.replace(qw=np.where(keep, data.qw.reshape(S, S), 0.0).ravel())
 
     return modified_data
 
 
-
 def batch_modify_and_save(file_names, output_folder):
     """
     Modify and save multiple files with different flow percentages (10%-90%).
@@ -137,12 +141,10 @@ def modify_hub_costs(data, percentage):
     reduction_factor = (percentage) / 100.0
 
     # Apply the reduction to each hub cost
-    modified_hubs_fc = [fc * reduction_factor for fc in data.Hubs_FC]
+    modified_hubs_fc = data.Hubs_FC * reduction_factor
 
-    # Create a modified InstanceData object
-    modified_data = InstanceData()
-    modified_data.__dict__.update(data.__dict__)  # Copy original data
-    modified_data.Hubs_FC = modified_hubs_fc  # Replace Hubs_FC with modified values
+    # Create a modified InstanceData object sharing the unchanged arrays
+    modified_data = data.replace(Hubs_FC=modified_hubs_fc)
 
     return modified_data
 
@@ -14,8 +14,7 @@ def plot_commodity_paths (instance_data, solution):
     Vtotal = len(solution['solution']['av'])  # Total vehicles
     ow = instance_data.ow  # Origin nodes for demands
     dw = instance_data.dw  # Destination nodes for demands
-    qw = instance_data.qw
-    nonzero_flows = [w for w, flow in enumerate(qw) if flow > 0]
+    nonzero_flows = instance_data.nonzero_flows
 
     # Create node coordinates (adjusted for offset)
     node_coords = {i + 1: (instance_data.Hub_x[i], instance_data.Hub_y[i]) for i in range(len(instance_data.Hub_x))}
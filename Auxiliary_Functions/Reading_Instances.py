@@ -1,3 +1,6 @@
+import io
+import warnings
+from collections import namedtuple
 import numpy as np
 import os
 import sys
@@ -6,86 +9,281 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
+# Nonzero commodities in coordinate (COO) form: commodity index, origin, destination, quantity
+Commodities = namedtuple('Commodities', ['w', 'ow', 'dw', 'qw'])
+
 class InstanceData:
-    """Class to hold all extracted parameters."""
-    def __init__(self):
-        self.BIGM = None
-        self.Vtyp = None
-        self.S = None
-        #VEHICLES
-        self.vcap = []
-        self.speed = []
-        # Operating cost per Vehicle Type
-        self.OC = []
-        # Fixed cost per Vehicle Type
-        self.FC = []
-        # Indices of vehicle types
-        self.Vind = []
-        # Hubs:
-        self.Hubs_FC = []
-        self.Hub_x = []
-        self.Hub_y = []
+    """
+    Class to hold all extracted parameters.
+
+    Array parameters are stored as typed NumPy arrays. Views derived from them
+    (nonzero commodities, zero-based O/D indices, arc cost matrices, ...) are
+    computed on first access and cached until one of the base fields is reassigned.
+
+    Demand is stored either densely (ow, dw, qw over all W = S*S commodities) or
+    sparsely (sparse_w, sparse_q for the nonzero commodities only). For a sparse
+    instance the dense ow, dw and qw arrays are only built if something reads them.
+    """
+    # Base fields and the dtype each array field is stored with
+    _ARRAY_FIELDS = {
+        # VEHICLES
+        'vcap': float,
+        'speed': float,
+        'OC': float,     # Operating cost per Vehicle Type
+        'FC': float,     # Fixed cost per Vehicle Type
+        'Vind': int,     # Number of vehicles per Vehicle Type
+        # Hubs
+        'Hubs_FC': float,
+        'Hub_x': float,
+        'Hub_y': float,
         # DEMAND
-        self.W = None
-        self.ow = []
-        self.dw = []
-        self.qw = []
-        self.od_dist = []
+        'ow': int,
+        'dw': int,
+        'qw': float,
+        'od_dist': float,
+        # Sparse DEMAND (None for densely stored instances)
+        'sparse_w': int,   # Commodity index w = (ow - 1) * S + (dw - 1)
+        'sparse_q': float,
+    }
+    _SCALAR_FIELDS = ('BIGM', 'Vtyp', 'S', 'W')
+    _DENSE_DEMAND_FIELDS = ('ow', 'dw', 'qw')
+    _SPARSE_DEMAND_FIELDS = ('sparse_w', 'sparse_q')
+
+    __slots__ = _SCALAR_FIELDS + tuple(_ARRAY_FIELDS) + ('_cache',)
+
+    def __init__(self, **fields):
+        sparse = fields.get('sparse_w') is not None
+        for name in self._SCALAR_FIELDS:
+            setattr(self, name, None)
+        for name in self._ARRAY_FIELDS:
+            if name in self._SPARSE_DEMAND_FIELDS:
+                setattr(self, name, None)
+            elif not (sparse and name in self._DENSE_DEMAND_FIELDS):
+                setattr(self, name, [])
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def __setattr__(self, name, value):
+        dtype = self._ARRAY_FIELDS.get(name)
+        if dtype is not None and value is not None:
+            value = np.asarray(value, dtype=dtype)
+        if value is not None and name in self._DENSE_DEMAND_FIELDS and self.is_sparse:
+            # Switch to dense storage: materialise the other dense fields first
+            for other in self._DENSE_DEMAND_FIELDS:
+                getattr(self, other)
+            object.__setattr__(self, 'sparse_w', None)
+            object.__setattr__(self, 'sparse_q', None)
+        elif value is not None and name == 'sparse_w':
+            # Switch to sparse storage: the dense fields are rebuilt on demand
+            for other in self._DENSE_DEMAND_FIELDS:
+                if self._has_slot(other):
+                    object.__delattr__(self, other)
+        object.__setattr__(self, name, value)
+        # Any change to a base field invalidates the derived views
+        if name != '_cache':
+            object.__setattr__(self, '_cache', {})
+
+    def __getattr__(self, name):
+        # Only called for unset slots: dense demand of a sparse instance
+        if name in self._DENSE_DEMAND_FIELDS and self._has_slot('sparse_w') and self.sparse_w is not None:
+            self._densify()
+            return object.__getattribute__(self, name)
+        raise AttributeError(name)
+
+    def _has_slot(self, name):
+        try:
+            object.__getattribute__(self, name)
+        except AttributeError:
+            return False
+        return True
+
+    def _densify(self):
+        S = self.S
+        nodes = np.arange(1, S + 1)
+        qw = np.zeros(S * S)
+        qw[self.sparse_w] = self.sparse_q
+        object.__setattr__(self, 'ow', np.repeat(nodes, S))
+        object.__setattr__(self, 'dw', np.tile(nodes, S))
+        object.__setattr__(self, 'qw', qw)
+
+    @property
+    def is_sparse(self):
+        """True if the demand is stored as sparse commodities."""
+        return self._has_slot('sparse_w') and self.sparse_w is not None
+
+    def __getstate__(self):
+        sparse = self.is_sparse
+        state = {}
+        for name in self._SCALAR_FIELDS + tuple(self._ARRAY_FIELDS):
+            if sparse and name in self._DENSE_DEMAND_FIELDS:
+                continue
+            value = getattr(self, name)
+            if value is not None or name in self._SCALAR_FIELDS:
+                state[name] = value
+        return state
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def replace(self, **changes):
+        """
+        Return a new InstanceData with the given fields replaced.
+        Unchanged arrays are shared with this instance, not copied.
+        """
+        fields = self.__getstate__()
+        if any(name in changes for name in self._DENSE_DEMAND_FIELDS):
+            for name in self._DENSE_DEMAND_FIELDS:
+                fields[name] = getattr(self, name)
+            for name in self._SPARSE_DEMAND_FIELDS:
+                fields.pop(name, None)
+        elif any(name in changes for name in self._SPARSE_DEMAND_FIELDS):
+            for name in self._DENSE_DEMAND_FIELDS:
+                fields.pop(name, None)
+        fields.update(changes)
+        return InstanceData(**fields)
+
+    def _cached(self, key, build):
+        cache = self._cache
+        if key not in cache:
+            cache[key] = build()
+        return cache[key]
+
+    # Derived views
+    @property
+    def od_dist_matrix(self):
+        """S x S distance matrix (a view of od_dist)."""
+        return self._cached('od_dist_matrix', lambda: self.od_dist.reshape(self.S, self.S))
 
-        self.od_dist_matrix= []
+    @property
+    def Vtotal(self):
+        """Total number of vehicles over all vehicle types."""
+        return self._cached('Vtotal', lambda: int(self.Vind.sum()))
+
+    @property
+    def vehicle_type(self):
+        """Vehicle type index of every vehicle v in range(Vtotal)."""
+        return self._cached('vehicle_type', lambda: np.repeat(np.arange(self.Vtyp), self.Vind))
+
+    @property
+    def nonzero_flows(self):
+        """Indices w of the commodities with positive demand."""
+        return self._cached('nonzero_flows', lambda: self.commodities.w)
+
+    @property
+    def commodities(self):
+        """Nonzero commodities as COO arrays (w, ow, dw, qw), ordered by w."""
+        def build():
+            if self.is_sparse:
+                keep = self.sparse_q > 0
+                order = np.argsort(self.sparse_w[keep], kind='stable')
+                w = self.sparse_w[keep][order]
+                return Commodities(w, w // self.S + 1, w % self.S + 1, self.sparse_q[keep][order])
+            w = np.flatnonzero(self.qw > 0)
+            return Commodities(w, self.ow[w], self.dw[w], self.qw[w])
+        return self._cached('commodities', build)
+
+    @property
+    def ow_idx(self):
+        """Zero-based origin node of every commodity (ow - 1)."""
+        return self._cached('ow_idx', lambda: self.ow - 1)
+
+    @property
+    def dw_idx(self):
+        """Zero-based destination node of every commodity (dw - 1)."""
+        return self._cached('dw_idx', lambda: self.dw - 1)
+
+    @property
+    def commodity_dist(self):
+        """Direct origin-destination distance of every commodity."""
+        return self._cached('commodity_dist', lambda: self.od_dist_matrix[self.ow_idx, self.dw_idx])
+
+    @property
+    def arc_cost(self):
+        """Vtyp x S x S routing cost OC * dist / speed of every arc per vehicle type."""
+        return self._cached('arc_cost', lambda: (
+            self.OC[:, None, None] * self.od_dist_matrix[None, :, :] / self.speed[:, None, None]
+        ))
+
+SPARSE_MARKER = "SPARSE"
 
 def read_instance_from_dat(file_path):
-    """Parse the .dat file and populate InstanceData."""
+    """
+    Parse the .dat file and populate InstanceData.
+
+    The small header blocks (vehicles, hub costs, coordinates) are split off the
+    file text token-wise and the S*S demand block is handed to NumPy's C parser
+    in one call, so there is no per-row Python work.
+
+    Files in the sparse variant (see save_instance_to_file) replace the demand
+    block by a 'SPARSE <nnz>' line, nnz rows 'ow dw qw' and the S x S distance
+    matrix; they are loaded into sparse demand storage.
+    """
     data = InstanceData()
-    
+
     with open(file_path, 'r') as file:
-        lines = file.readlines()
-    
-    line_idx = 0
+        text = file.read()
 
     # Parse Vtyp
-    data.Vtyp = int(lines[line_idx].strip())
-    line_idx += 1
-
-    # Parse vehicle parameters
-    for _ in range(data.Vtyp):
-        params = lines[line_idx].strip().split()
-        data.vcap.append(float(params[0]))
-        data.speed.append(float(params[1]))
-        data.OC.append(float(params[2]))
-        data.FC.append(float(params[3]))
-        data.Vind.append(int(params[4]))
-        line_idx += 1
+    vtyp, text = text.split(maxsplit=1)
+    data.Vtyp = int(vtyp)
 
-    # Parse number of nodes (S)
-    data.S = int(lines[line_idx].strip())
-    line_idx += 1
+    # Parse vehicle parameters (vcap, speed, OC, FC, Vind per row) and S
+    *vehicle_tokens, S, text = text.split(maxsplit=5 * data.Vtyp + 1)
+    vehicles = np.array(vehicle_tokens, dtype=float).reshape(data.Vtyp, 5)
+    data.vcap = vehicles[:, 0].copy()
+    data.speed = vehicles[:, 1].copy()
+    data.OC = vehicles[:, 2].copy()
+    data.FC = vehicles[:, 3].copy()
+    data.Vind = vehicles[:, 4].astype(int)
 
-    # Parse hub fixed costs
-    for _ in range(data.S):
-        data.Hubs_FC.append(float(lines[line_idx].strip()))
-        line_idx += 1
+    # Parse number of nodes (S)
+    data.S = int(S)
+    S = data.S
 
-    # Parse hub coordinates
-    for _ in range(data.S):
-        coords = lines[line_idx].strip().split()
-        data.Hub_x.append(float(coords[0]))
-        data.Hub_y.append(float(coords[1]))
-        line_idx += 1
+    # Parse hub fixed costs and hub coordinates
+    *hub_tokens, text = text.split(maxsplit=3 * S)
+    hubs = np.array(hub_tokens, dtype=float)
+    data.Hubs_FC = hubs[:S].copy()
+    data.Hub_x = hubs[S::2].copy()
+    data.Hub_y = hubs[S + 1::2].copy()
 
     # Calculate W = S * S
-    data.W = data.S * data.S
+    data.W = S * S
+
+    # Parse sparse demand (nonzero commodities + distance matrix)
+    if text.lstrip().startswith(SPARSE_MARKER):
+        _, nnz, text = (text.split(maxsplit=2) + [''])[:3]
+        nnz = int(nnz)
+        with warnings.catch_warnings():
+            # Older NumPy stops at a malformed token with a DeprecationWarning instead of raising
+            warnings.simplefilter('error', DeprecationWarning)
+            try:
+                values = np.fromstring(text, dtype=float, sep=' ')
+            except (ValueError, DeprecationWarning) as e:
+                raise ValueError(f"Malformed SPARSE block in '{file_path}': {e}") from None
+        if values.size < 3 * nnz:
+            raise ValueError(
+                f"Expected {nnz} commodities (SPARSE {nnz}) in '{file_path}', got {values.size // 3}."
+            )
+        if values.size != 3 * nnz + data.W:
+            raise ValueError(
+                f"Expected {nnz} commodities and {data.W} distances in '{file_path}', got {values.size} values."
+            )
+        commodities = values[:3 * nnz].reshape(nnz, 3)
+        data.od_dist = values[3 * nnz:].copy()
+        data.sparse_w = (commodities[:, 0].astype(int) - 1) * S + (commodities[:, 1].astype(int) - 1)
+        data.sparse_q = commodities[:, 2].copy()
+        return data
 
     # Parse demand matrix (ow, dw, qw, od_dist)
-    while line_idx < len(lines):
-        row = lines[line_idx].strip().split()
-        data.ow.append(int(row[0]))
-        data.dw.append(int(row[1]))
-        data.qw.append(float(row[2]))
-        data.od_dist.append(float(row[3]))
-        line_idx += 1
-    
-    S = data.S  # Number of nodes
-    data.od_dist_matrix = np.array(data.od_dist).reshape(S, S)
+    demand = np.loadtxt(io.StringIO(text), dtype=float, ndmin=2)
+    if demand.shape != (data.W, 4):
+        raise ValueError(
+            f"Expected {data.W} demand rows of 4 values in '{file_path}', got shape {demand.shape}."
+        )
+    data.ow = demand[:, 0].astype(int)
+    data.dw = demand[:, 1].astype(int)
+    data.qw = demand[:, 2].copy()
+    data.od_dist = demand[:, 3].copy()
 
     return data
@@ -0,0 +1,110 @@
+import itertools
+import os
+import sys
+from collections.abc import Mapping
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+'''
+Sparse routing solutions.
+
+A thresholded routing solution is binary and mostly zeros (fijvw has N*N*V*W
+entries, of which a commodity uses a handful), so each variable family is kept
+as the COO indices of its entries equal to 1. SparseVariable reads like the
+{key: 0/1} dicts of the dense extraction, so check_feasibility,
+extract_solution_features, plot_commodity_paths and MIP starts take either.
+'''
+
+# Variable families of a routing solution and their dimensions
+SOLUTION_VARIABLES = ('av', 'xijv', 'fijvw', 'Zvi', 'yi')
+
+
+def solution_shapes(N, Vtotal, W):
+    """Index space of every variable family: av (V,), xijv (N, N, V), fijvw (N, N, V, W), Zvi (V, N), yi (N,)."""
+    return {'av': (Vtotal,), 'xijv': (N, N, Vtotal), 'fijvw': (N, N, Vtotal, W), 'Zvi': (Vtotal, N), 'yi': (N,)}
+
+
+class SparseVariable(Mapping):
+    """
+    Binary values of one variable family as the indices of its entries equal to 1.
+
+    Every key of the index space reads as 1 if it is listed and 0 otherwise, and iteration and len()
+    run over the whole index space, as for the dense dicts (len(av) is the number of vehicles).
+    Keys outside the index space raise KeyError, so .get(key, 0) behaves as before.
+
+    Parameters:
+    - indices: (k, d) array (or list of keys) of the entries equal to 1.
+    - shape: Index space of the family (see solution_shapes).
+    """
+    def __init__(self, indices, shape):
+        self.shape = tuple(int(n) for n in shape)
+        dtype = np.min_scalar_type(max(max(self.shape) - 1, 0))
+        self.indices = np.asarray(indices, dtype=dtype).reshape(-1, len(self.shape))
+        self._lookup = None
+
+    @classmethod
+    def from_dict(cls, values, shape, threshold=0.5):
+        """Sparse form of a {key: value} dict (keys above threshold are kept)."""
+        keys = [key for key, value in values.items() if value > threshold]
+        return cls(keys, shape)
+
+    def _ones(self):
+        # Set of the keys equal to 1, built at the first lookup
+        if self._lookup is None:
+            if len(self.shape) == 1:
+                self._lookup = set(self.indices[:, 0].tolist())
+            else:
+                self._lookup = set(map(tuple, self.indices.tolist()))
+        return self._lookup
+
+    def __getitem__(self, key):
+        if key in self._ones():
+            return 1
+        index = key if isinstance(key, tuple) else (key,)
+        if len(index) == len(self.shape) and all(0 <= k < n for k, n in zip(index, self.shape)):
+            return 0
+        raise KeyError(key)
+
+    def __iter__(self):
+        if len(self.shape) == 1:
+            return iter(range(self.shape[0]))
+        return itertools.product(*(range(n) for n in self.shape))
+
+    def __len__(self):
+        return int(np.prod(self.shape))
+
+    def nonzero(self):
+        """Keys equal to 1 (as for a dense dict, ints for one-dimensional families)."""
+        if len(self.shape) == 1:
+            return self.indices[:, 0].tolist()
+        return list(map(tuple, self.indices.tolist()))
+
+    def to_dense(self, dtype=np.int8):
+        """Values as an array of the index space."""
+        dense = np.zeros(self.shape, dtype=dtype)
+        dense[tuple(self.indices.T)] = 1
+        return dense
+
+    def __getstate__(self):
+        return {'shape': self.shape, 'indices': self.indices}
+
+    def __setstate__(self, state):
+        self.shape = state['shape']
+        self.indices = state['indices']
+        self._lookup = None
+
+    def __repr__(self):
+        return f"SparseVariable(shape={self.shape}, nonzeros={len(self.indices)})"
+
+
+def sparse_solution(solution, N, Vtotal, W):
+    """Sparse form ({name: SparseVariable}) of a solution of {key: value} dicts, e.g. a stored dense solution."""
+    shapes = solution_shapes(N, Vtotal, W)
+    return {
+        name: values if isinstance(values, SparseVariable) else SparseVariable.from_dict(values, shapes[name])
+        for name, values in solution.items()
+    }
@@ -0,0 +1,216 @@
+import os
+import sys
+import zlib
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from Auxiliary_Functions.Instance_Cache import load_instance
+from Auxiliary_Functions.Instance_Catalog import INSTANCE_ID_PATTERN, InstanceCatalog, instance_record, record_matches
+from Auxiliary_Functions.Modifying_Instances import (
+    modify_flow,
+    modify_hub_costs,
+    save_instance_to_file,
+)
+
+'''
+Virtual instances: modified instances resolved from their ID instead of a file.
+
+An ID such as '8R-alpha=021_Flow_50perc_HubCosts_5perc_seed54321' is read as a
+recipe (base instance, flow %, hub cost %, seed) and materialised in memory from
+the cached base instance. The flow thinning is seeded per (base, flow %), so a
+recipe always yields the same instance as DATA/Generate_Instances.py with the
+same master seed.
+
+Recipe IDs carry their seed so they never share a name with the shipped
+Flow_/HubCosts files: those were thinned with random.sample and no recipe
+reproduces them, so the ML predictions and stored results made from them
+always refer to the stored files.
+'''
+
+DEFAULT_MASTER_SEED = 54321
+
+Recipe = namedtuple('Recipe', ['base', 'flow_perc', 'hub_perc', 'seed'])
+
+
+def flow_rng(master_seed, base_name, flow_perc):
+    """
+    Random generator for the flow modification of one (base instance, flow %) pair.
+
+    The stream depends only on the master seed, the base name and the percentage,
+    so every instance can be regenerated on its own, in any order or process.
+    """
+    seed_sequence = np.random.SeedSequence(
+        master_seed, spawn_key=(zlib.crc32(base_name.encode()), flow_perc)
+    )
+    return np.random.default_rng(seed_sequence)
+
+
+def build_instance(data, base_name, flow_perc, hub_perc, master_seed):
+    """
+    Apply a (flow %, hub cost %) modification to a base instance.
+
+    Parameters:
+    - data: Base InstanceData.
+    - base_name: Name of the base instance (without extension), part of the seed.
+    - flow_perc: Flow percentage to retain, or None to keep the flows.
+    - hub_perc: Hub cost percentage, or None to keep the hub costs.
+    - master_seed: Master seed of the generation run.
+    """
+    if flow_perc is not None:
+        data = modify_flow(data, flow_perc, rng=flow_rng(master_seed, base_name, flow_perc))
+    if hub_perc is not None:
+        data = modify_hub_costs(data, hub_perc)
+    return data
+
+
+def instance_name(base_name, flow_perc, hub_perc, master_seed):
+    """Recipe ID of a modified instance, e.g. 8R-alpha=021_Flow_50perc_HubCosts_5perc_seed54321."""
+    name = base_name
+    if flow_perc is not None:
+        name += f"_Flow_{flow_perc}perc"
+    if hub_perc is not None:
+        name += f"_HubCosts_{hub_perc}perc"
+    if flow_perc is not None or hub_perc is not None:
+        name += f"_seed{master_seed}"
+    return name
+
+
+def same_instance(data, other):
+    """True if two InstanceData hold the same instance (dense or sparse demand, up to float rounding)."""
+    for name in data._SCALAR_FIELDS + tuple(data._ARRAY_FIELDS):
+        if name in data._SPARSE_DEMAND_FIELDS:
+            continue
+        a, b = getattr(data, name), getattr(other, name)
+        if a is None or b is None:
+            if a is not b:
+                return False
+        elif np.shape(a) != np.shape(b) or not np.allclose(a, b, rtol=1e-9, atol=1e-9):
+            return False
+    return True
+
+
+class VirtualInstances:
+    """
+    Resolve instance IDs to InstanceData, from a file when the catalog has one
+    and from a recipe on the cached base instance for recipe IDs ('..._seed<N>').
+
+    Parameters:
+    - catalog: InstanceCatalog holding (at least) the base instances.
+    - master_seed: Seed used by recipe_id for new recipe IDs.
+    - max_entries: Number of materialised instances kept in memory (least recently used are dropped).
+    """
+    def __init__(self, catalog=None, master_seed=DEFAULT_MASTER_SEED, max_entries=64):
+        self.catalog = catalog if catalog is not None else InstanceCatalog()
+        self.master_seed = master_seed
+        self.max_entries = max_entries
+        self._memo = OrderedDict()
+
+    def recipe_id(self, base_name, flow_perc, hub_perc):
+        """Recipe ID of a modification of a base instance under this master seed."""
+        return instance_name(base_name, flow_perc, hub_perc, self.master_seed)
+
+    def recipe(self, instance_id):
+        """
+        Return the Recipe of an instance ID, or None if it is not a recipe ID or its base instance is unknown.
+
+        A modified ID without a seed (e.g. a shipped '..._Flow_50perc') is not a recipe:
+        it only resolves to its stored file.
+        """
+        match = INSTANCE_ID_PATTERN.match(instance_id)
+        base, flow, hub, seed = match.group('base', 'flow', 'hub', 'seed')
+        if base not in self.catalog:
+            return None
+        if flow is None and hub is None:
+            return Recipe(base, None, None, None) if seed is None else None
+        if seed is None:
+            return None
+        return Recipe(base, int(flow) if flow else None, int(hub) if hub else None, int(seed))
+
+    def load(self, instance_id, prefer_files=True):
+        """
+        Return the InstanceData for an instance ID (with or without '.dat'), or None if it cannot be resolved.
+
+        Parameters:
+        - instance_id: Instance ID, stored or recipe.
+        - prefer_files: If True, an instance that exists as a file is read from the file.
+        """
+        if instance_id.endswith(".dat"):
+            instance_id = instance_id[:-len(".dat")]
+        if prefer_files:
+            path = self.catalog.resolve(instance_id)
+            if path is not None:
+                return load_instance(path)
+        recipe = self.recipe(instance_id)
+        if recipe is None:
+            return None
+        return self.materialize(recipe)
+
+    def select(self, instance_ids, **criteria):
+        """
+        Return the IDs of instance_ids (in order) whose metadata matches every criterion, as InstanceCatalog.select.
+
+        Stored instances use their catalog record; recipe IDs are materialised to compute theirs.
+        IDs that resolve to neither are dropped.
+        """
+        selected = []
+        for instance_id in instance_ids:
+            record = self.catalog.records.get(instance_id)
+            if record is None:
+                if self.recipe(instance_id) is None:
+                    continue
+                record = instance_record(instance_id, self.load(instance_id, prefer_files=False))
+            if record_matches(record, criteria):
+                selected.append(instance_id)
+        return selected
+
+    def materialize(self, recipe):
+        """Build (or fetch from the memo) the instance described by a recipe."""
+        data = self._memo.get(recipe)
+        if data is not None:
+            self._memo.move_to_end(recipe)
+            return data
+
+        if recipe.hub_perc is not None:
+            # Hub costs are applied on top of the (memoised) flow-modified instance
+            parent = self.materialize(recipe._replace(hub_perc=None))
+            data = modify_hub_costs(parent, recipe.hub_perc)
+        elif recipe.flow_perc is not None:
+            base = load_instance(self.catalog.resolve(recipe.base))
+            data = build_instance(base, recipe.base, recipe.flow_perc, None, recipe.seed)
+        else:
+            data = load_instance(self.catalog.resolve(recipe.base))
+
+        self._memo[recipe] = data
+        while len(self._memo) > self.max_entries:
+            self._memo.popitem(last=False)
+        return data
+
+    def export(self, instance_id, output_folder, sparse=False):
+        """
+        Write a virtual instance, materialised from its recipe, to <output_folder>/<instance_id>.dat and return the path.
+
+        A stored file of the same recipe ID with other contents (e.g. written by another
+        version of the generator) raises ValueError instead of being overwritten.
+
+        Parameters:
+        - instance_id: Recipe ID ('..._seed<N>').
+        - output_folder: Folder the .dat file is written to.
+        - sparse: If True, the demand is written as sparse commodities.
+        """
+        if instance_id.endswith(".dat"):
+            instance_id = instance_id[:-len(".dat")]
+        data = self.load(instance_id, prefer_files=False)
+        if data is None:
+            raise ValueError(f"'{instance_id}' is not a recipe ID with a known base instance.")
+        output_file = os.path.join(output_folder, f"{instance_id}.dat")
+        for stored_file in {self.catalog.resolve(instance_id), output_file} - {None}:
+            if os.path.exists(stored_file) and not same_instance(data, load_instance(stored_file)):
+                raise ValueError(f"The recipe of '{instance_id}' differs from the stored instance {stored_file}.")
+        os.makedirs(output_folder, exist_ok=True)
+        save_instance_to_file(data, output_file, sparse=sparse)
+        return output_file
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import os
 import sys
@@ -18,14 +19,13 @@ def extract_input_features(instance_data, file_name):
     Returns:
     - A DataFrame where each row corresponds to a commodity and the columns are the input features.
     """
-    # Initialize the features list
-    features = []
-
     # Extract relevant data from the instance
-    ow = instance_data.ow  # Origin nodes for demands
-    dw = instance_data.dw  # Destination nodes for demands
-    qw = instance_data.qw  # Demand for each commodity
-    od_distances = instance_data.od_dist_matrix  # Origin-destination distances
+    nonzero_flows = np.asarray(instance_data.nonzero_flows)  # Only consider non-zero demands
+    ow = np.asarray(instance_data.ow)  # Origin nodes for demands
+    dw = np.asarray(instance_data.dw)  # Destination nodes for demands
+    qw = np.asarray(instance_data.qw)  # Demand for each commodity
+    od_distances = np.asarray(instance_data.od_dist_matrix)  # Origin-destination distances
+    hubs_FC = np.asarray(instance_data.Hubs_FC)
     V_small_total = instance_data.vcap[0]  # Capacity of small vehicles
     V_big_total = instance_data.vcap[1]  # Capacity of big vehicles
     v_cost_small = instance_data.FC[0]
@@ -34,27 +34,21 @@ def extract_input_features(instance_data, file_name):
     unit_route_big = instance_data.OC[1]* instance_data.speed[1]
 
     # Compute global statistics
-    nonzero_flows = [w for w, flow in enumerate(qw) if flow > 0]
-    max_qw = max(qw)
-    min_qw = min(q for q in qw if q > 0)
-    avg_qw = sum(qw) / len(nonzero_flows)
     total_commodities_nonzero = len(nonzero_flows)
-
-    print(qw)
-    print(nonzero_flows)
+    total_qw = qw.sum()
+    max_qw = qw.max()
+    min_qw = qw[qw > 0].min()
 
     # Compute transshipment cost statistics for the entire network
-    avg_transshipment_cost = sum(instance_data.Hubs_FC) / len(instance_data.Hubs_FC)
-    max_transshipment_cost = max(instance_data.Hubs_FC)
-    min_transshipment_cost = min(instance_data.Hubs_FC)
-
-    print(ow)
-    print(od_distances.shape)
+    avg_transshipment_cost = hubs_FC.sum() / len(hubs_FC)
+    max_transshipment_cost = hubs_FC.max()
+    min_transshipment_cost = hubs_FC.min()
 
     # Compute the distance statistics for the network:
-    avg_distance = sum(od_distances[ow[i]-1,dw[i]-1] for i in nonzero_flows) / len(nonzero_flows)
-    min_distance = min(od_distances[ow[i]-1,dw[i]-1] for i in nonzero_flows)
-    max_distance = max(od_distances[ow[i]-1,dw[i]-1] for i in nonzero_flows)
+    commodity_dist = np.asarray(instance_data.commodity_dist)[nonzero_flows]
+    avg_distance = commodity_dist.sum() / total_commodities_nonzero
+    min_distance = commodity_dist.min()
+    max_distance = commodity_dist.max()
 
     thresholds = {
         "avg": avg_distance,
@@ -66,124 +60,85 @@ def extract_input_features(instance_data, file_name):
         "avg_plus_50": avg_distance * 1.5
     }
 
-    # Iterate over each commodity
-    for w in nonzero_flows:  # Only consider non-zero demands
-        origin = ow[w]-1
-        destination = dw[w]-1
-        od_distance = od_distances[origin,destination]
-        
-        commodities_with_same_origin = sum(
-            1 for other_w in nonzero_flows
-            if ow[other_w] == ow[w] and w != other_w
-        )
-
-        commodities_with_same_destination = sum(
-            1 for other_w in nonzero_flows
-            if dw[other_w] == dw[w] and w != other_w
-        )
-
-        for i in range(len(od_distances)):  # Loop over all nodes
-            dist_to_origin = od_distances[ow[w]-1, i]
-            dist_to_destination = od_distances[dw[w]-1,i]
-
-        # Proximity counts for origin and destination under different thresholds
-        proximity_counts_origin = {key: 0 for key in thresholds.keys()}
-        proximity_counts_destination = {key: 0 for key in thresholds.keys()}
-        
-        for key, threshold in thresholds.items():
-            if dist_to_origin <= threshold:
-                proximity_counts_origin[key] += 1
-            if dist_to_destination <= threshold:
-                proximity_counts_destination[key] += 1
-
-        # # Count commodities with the same OD distance
-        # commodities_with_same_od_distance = sum(
-        #     1 for other_w in nonzero_flows
-        #     if od_distances[ow[other_w]][dw[other_w]] == od_distance
-        # )
-
-        # Transshipment costs for origin and destination
-        transshipment_cost_origin = instance_data.Hubs_FC[ow[w] - 1]  # Subtract 1 for zero-based index
-        transshipment_cost_destination = instance_data.Hubs_FC[dw[w] - 1]
-
-        # Relative transshipment costs
-        relative_transshipment_cost_origin_to_max = transshipment_cost_origin / max_transshipment_cost
-        relative_transshipment_cost_origin_to_min = transshipment_cost_origin / min_transshipment_cost
-        relative_transshipment_cost_origin_to_avg = transshipment_cost_origin / avg_transshipment_cost
-
-        relative_transshipment_cost_destination_to_max = transshipment_cost_destination / max_transshipment_cost
-        relative_transshipment_cost_destination_to_min = transshipment_cost_destination / min_transshipment_cost
-        relative_transshipment_cost_destination_to_avg = transshipment_cost_destination / avg_transshipment_cost
-        
-        # Features for the current commodity
-        feature_row = {
-            "Instance ID": file_name,  # Use the file name as the instance ID
-            "Commodity ID": w,
-            "OD Distance": od_distance,
-            "Max OD Distance": max_distance,
-            "Min OD Distance": min_distance,
-            "Avg OD Distance": avg_distance,
-            "Total # Commodities in Instance": total_commodities_nonzero,
-            "Total Flow (sum qw) in Instance": sum(qw),
-            "Max Size (qw)": max_qw,
-            "Min Size (qw)": min_qw,
-            "Capacity of Small Vehicles": V_small_total,
-            "Capacity of Big Vehicles": V_big_total,
-            "Cost of Small Vehicles": v_cost_small,
-            "Cost of Big Vehicles": v_cost_big,
-
-            "Unit Routing cost small vehicles": unit_route_small,
-            "Unit Routing cost big vehicles": unit_route_big,
-
-            "Direct o-d routing cost small vehicle": od_distance* unit_route_small,
-
-            "Direct o-d routing cost big vehicle": od_distance* unit_route_big,
-
-            "Avg Transshipment Cost of All Nodes": avg_transshipment_cost,
-            "Max Transshipment Cost of All Nodes": max_transshipment_cost,
-            "Min Transshipment Cost of All Nodes": min_transshipment_cost,
-
-            "Demand Size (qw)": qw[w],
-
-            "Total # Commodities with Same Origin": commodities_with_same_origin,
-            "Total # Commodities with Same Destination": commodities_with_same_destination,
-
-            "Relative Demand Size to Max": qw[w] / max_qw,
-            "Relative Demand Size to Min": qw[w] / min_qw,
-            "Relative Demand Size to Total ": qw[w]/ sum(qw),
-            "Relative Demand size to small v cap":  qw[w]/V_small_total,
-            "Relative Demand size relative to big v cap":  qw[w]/V_big_total,
-
-            "Relative Distance to Max": od_distances[ow[w]-1,dw[w]-1] /max_distance,
-            "Relative Distance to Min": od_distances[ow[w]-1,dw[w]-1] /min_distance,
-            "Relative Distance to Avg": od_distances[ow[w]-1,dw[w]-1] /avg_distance,
-
-            
-            "Relative Transshipment Cost Origin to Max": relative_transshipment_cost_origin_to_max,
-            "Relative Transshipment Cost Origin to Min": relative_transshipment_cost_origin_to_min,
-            "Relative Transshipment Cost Origin to Avg": relative_transshipment_cost_origin_to_avg,
-            "Relative Transshipment Cost Destination to Max": relative_transshipment_cost_destination_to_max,
-            "Relative Transshipment Cost Destination to Min": relative_transshipment_cost_destination_to_min,
-            "Relative Transshipment Cost Destination to Avg": relative_transshipment_cost_destination_to_avg,
-            
-            "Relative # Commodities with Same Origin": commodities_with_same_origin/len(nonzero_flows),
-            "Relative  # Commodities with Same Destination": commodities_with_same_destination/len(nonzero_flows),
-
-            # "Routing Cost of o-d": 
-
-        }
-
-        # Add proximity counts to the feature dictionary
-        for key in thresholds.keys():
-            feature_row[f"Nodes Close to Origin ({key})"] = proximity_counts_origin[key]
-            feature_row[f"Nodes Close to Destination ({key})"] = proximity_counts_destination[key]
-            # Add relative columns
-            feature_row[f"Relative Nodes Close to Origin ({key})"] = proximity_counts_origin[key] / len(nonzero_flows)
-            feature_row[f"Relative Nodes Close to Destination ({key})"] = proximity_counts_destination[key] / len(nonzero_flows)
-
-        # Add features to the list
-        features.append(feature_row)
-    
+    # Per-commodity values, one entry per non-zero demand
+    origins = ow[nonzero_flows]
+    destinations = dw[nonzero_flows]
+    demand = qw[nonzero_flows]
+    od_distance = od_distances[origins - 1, destinations - 1]
+
+    # Other commodities sharing the origin / destination: node counts minus the commodity itself
+    commodities_with_same_origin = np.bincount(origins)[origins] - 1
+    commodities_with_same_destination = np.bincount(destinations)[destinations] - 1
+
+    # Proximity counts (0/1) for origin and destination under every threshold, measured to the
+    # last node of the network (the node the original per-node loop ended on)
+    threshold_values = np.array(list(thresholds.values()))
+    proximity_counts_origin = (od_distances[origins - 1, -1][:, None] <= threshold_values).astype(int)
+    proximity_counts_destination = (od_distances[destinations - 1, -1][:, None] <= threshold_values).astype(int)
+
+    # Transshipment costs for origin and destination
+    transshipment_cost_origin = hubs_FC[origins - 1]  # Subtract 1 for zero-based index
+    transshipment_cost_destination = hubs_FC[destinations - 1]
+
+    features = {
+        "Instance ID": file_name,  # Use the file name as the instance ID
+        "Commodity ID": nonzero_flows,
+        "OD Distance": od_distance,
+        "Max OD Distance": max_distance,
+        "Min OD Distance": min_distance,
+        "Avg OD Distance": avg_distance,
+        "Total # Commodities in Instance": total_commodities_nonzero,
+        "Total Flow (sum qw) in Instance": total_qw,
+        "Max Size (qw)": max_qw,
+        "Min Size (qw)": min_qw,
+        "Capacity of Small Vehicles": V_small_total,
+        "Capacity of Big Vehicles": V_big_total,
+        "Cost of Small Vehicles": v_cost_small,
+        "Cost of Big Vehicles": v_cost_big,
+
+        "Unit Routing cost small vehicles": unit_route_small,
+        "Unit Routing cost big vehicles": unit_route_big,
+
+        "Direct o-d routing cost small vehicle": od_distance * unit_route_small,
+        "Direct o-d routing cost big vehicle": od_distance * unit_route_big,
+
+        "Avg Transshipment Cost of All Nodes": avg_transshipment_cost,
+        "Max Transshipment Cost of All Nodes": max_transshipment_cost,
+        "Min Transshipment Cost of All Nodes": min_transshipment_cost,
+
+        "Demand Size (qw)": demand,
+
+        "Total # Commodities with Same Origin": commodities_with_same_origin,
+        "Total # Commodities with Same Destination": commodities_with_same_destination,
+
+        "Relative Demand Size to Max": demand / max_qw,
+        "Relative Demand Size to Min": demand / min_qw,
+        "Relative Demand Size to Total ": demand / total_qw,
+        "Relative Demand size to small v cap": demand / V_small_total,
+        "Relative Demand size relative to big v cap": demand / V_big_total,
+
+        "Relative Distance to Max": od_distance / max_distance,
+        "Relative Distance to Min": od_distance / min_distance,
+        "Relative Distance to Avg": od_distance / avg_distance,
+
+        "Relative Transshipment Cost Origin to Max": transshipment_cost_origin / max_transshipment_cost,
+        "Relative Transshipment Cost Origin to Min": transshipment_cost_origin / min_transshipment_cost,
+        "Relative Transshipment Cost Origin to Avg": transshipment_cost_origin / avg_transshipment_cost,
+        "Relative Transshipment Cost Destination to Max": transshipment_cost_destination / max_transshipment_cost,
+        "Relative Transshipment Cost Destination to Min": transshipment_cost_destination / min_transshipment_cost,
+        "Relative Transshipment Cost Destination to Avg": transshipment_cost_destination / avg_transshipment_cost,
+
+        "Relative # Commodities with Same Origin": commodities_with_same_origin / total_commodities_nonzero,
+        "Relative  # Commodities with Same Destination": commodities_with_same_destination / total_commodities_nonzero,
+    }
+
+    # Add proximity counts and their relative columns
+    for k, key in enumerate(thresholds):
+        features[f"Nodes Close to Origin ({key})"] = proximity_counts_origin[:, k]
+        features[f"Nodes Close to Destination ({key})"] = proximity_counts_destination[:, k]
+        features[f"Relative Nodes Close to Origin ({key})"] = proximity_counts_origin[:, k] / total_commodities_nonzero
+        features[f"Relative Nodes Close to Destination ({key})"] = proximity_counts_destination[:, k] / total_commodities_nonzero
+
     # Convert to a pandas DataFrame
-    features_df = pd.DataFrame(features)
-    return features_df
\ No newline at end of file
+    features_df = pd.DataFrame(features, index=pd.RangeIndex(total_commodities_nonzero))
+    return features_df
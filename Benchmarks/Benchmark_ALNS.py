@@ -0,0 +1,79 @@
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Feasibility_checks import check_feasibility
+from Auxiliary_Functions.Virtual_Instances import VirtualInstances
+from Heuristics.ALNS import ALNS, ALNSState, solve_routing_alns
+from Heuristics.Greedy_Constructive import greedy_routing_plan, plan_cost
+from Benchmark_Greedy_Heuristic import reference_results
+
+'''
+ALNS against the greedy start and the stored MIP optima of the shipped
+instances, without and with ML move biases, and on 20R instances beyond the
+MIP. Every result is checked for feasibility and for agreement of the
+incrementally kept cost and loads with a recomputation.
+'''
+
+ML_FILE = os.path.join(project_root, "ML Experiments", "XG_BOOST Predictions", "ML_combined_output_features_1.csv")
+TIME_BUDGET = 10.0
+EXTRA_INSTANCES = [
+    "8R-alpha=021_Flow_40perc", "8R-alpha=021_Flow_70perc", "9R-alpha=021_Flow_40perc", "9R-alpha=021_Flow_70perc",
+    "20R-alpha=021_Flow_80perc",
+]
+
+
+def check_result(data, result):
+    """Assert that an ALNS result is feasible and that its objective is the MIP objective of its solution."""
+    solution = result['solution']
+    with contextlib.redirect_stdout(io.StringIO()):
+        feasible, errors = check_feasibility(data, solution)
+    assert feasible, errors
+    assert np.isclose(result['objective_value'], plan_cost(data, solution)), (result['objective_value'], plan_cost(data, solution))
+
+
+def check_incremental_state(data, seed=0):
+    """Assert that ALNSState loads and cost after a search equal those of a state rebuilt from its plan."""
+    best = ALNS(data, seed=seed).run(greedy_routing_plan(data), time_budget=2.0)
+    rebuilt = ALNSState.from_plan(best.to_plan())
+    assert np.allclose(best.load, rebuilt.load)
+    assert np.isclose(best.cost, rebuilt.cost), (best.cost, rebuilt.cost)
+
+
+if __name__ == "__main__":
+    instances = VirtualInstances()
+    ml_combined_data = pd.read_csv(ML_FILE)
+    references = reference_results()
+
+    check_incremental_state(instances.load(references.index[0]))
+
+    print(f"{'instance':<45} {'ML':<5} {'greedy':>10} {'ALNS':>10} {'MIP OFV':>10} {'gap':>7} {'iterations':>10} {'MIP (s)':>8}")
+    runs = [(instance_id, ofv, seconds) for instance_id, (ofv, seconds) in references.iterrows()]
+    # Instances with routes where a leg's both ends are inserted into big-vehicle routes
+    runs += [(instance_id, None, None) for instance_id in EXTRA_INSTANCES]
+    runs += [(instance_id, None, None) for instance_id in ["20R-alpha=021_Flow_50perc", "20R-alpha=021"]]
+    for instance_id, mip_ofv, mip_time in runs:
+        data = instances.load(instance_id)
+        ml_data = ml_combined_data[ml_combined_data["Instance ID"] == instance_id]
+        fixed_hubs = list(range(1, int(data.S) + 1))
+        greedy = greedy_routing_plan(data).cost()
+        for use_ml_guidance in ([False, True] if len(ml_data) else [False]):
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = solve_routing_alns(
+                    data, ml_data, fixed_hubs, use_ml_guidance, False, use_ml_guidance, use_ml_guidance,
+                    time_budget=TIME_BUDGET,
+                )
+            check_result(data, result)
+            gap = '-' if mip_ofv is None else f"{result['objective_value'] / mip_ofv - 1:.1%}"
+            print(f"{instance_id:<45} {str(use_ml_guidance):<5} {greedy:>10.2f} {result['objective_value']:>10.2f} "
+                  f"{'-' if mip_ofv is None else f'{mip_ofv:.2f}':>10} {gap:>7} {result['iterations']:>10} "
+                  f"{'-' if mip_time is None else f'{mip_time:.2f}':>8}")
@@ -0,0 +1,148 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Feasibility_checks import check_continuous_path, check_feasibility, commodity_arcs, solution_arrays
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from Auxiliary_Functions.Sparse_Solution import sparse_solution
+from Auxiliary_Functions.Virtual_Instances import VirtualInstances
+from Heuristics.ALNS import solve_routing_alns
+from Heuristics.Greedy_Constructive import greedy_routing_plan
+from MIP_Models.MIPs import solve_routing_decisions
+from Benchmark_Feasibility_Checks import SWEEP_MUTATIONS, mutate
+from Benchmark_Greedy_Heuristic import reference_results
+from Benchmark_Reading_Instances import write_synthetic_dat
+from Benchmark_Routing_Builders import alternating_predictions
+from Benchmark_Routing_Session import MAIN_CONFIGURATIONS
+
+'''
+Continuous path check: the (node, vehicle)-state BFS over indexed flow arcs
+against the DFS it replaced, on hand-made paths (hub transfer rule, a node
+reached first on a dead-end vehicle), on the greedy and ALNS plans of a subset
+of the shipped instances, on the greedy plans and broken copies of all of
+them and on MIP solutions, and the time per solution.
+'''
+
+def reference_continuous_path(w, origin, destination, fijvw, xijv, Vtotal, yi):
+    """check_continuous_path as a DFS over visited nodes scanning range(len(xijv)) x Vtotal per node."""
+    visited = set()
+    stack = [(origin, None)]
+    while stack:
+        current_node, current_vehicle = stack.pop()
+        if current_node == destination:
+            return True
+        if current_node in visited:
+            continue
+        visited.add(current_node)
+        for j in range(len(xijv)):
+            for v in range(Vtotal):
+                if fijvw.get((current_node, j, v, w), 0) > 0.05:
+                    if current_vehicle is None or current_vehicle == v:
+                        stack.append((j, v))
+                    elif yi.get(current_node, 0) > 0.5:
+                        stack.append((j, v))
+    return False
+
+
+def path_solution(legs, hubs, N=6, Vtotal=2):
+    """Flows of commodity 0 on the given (i, j, v) arcs, with the given open hubs."""
+    fijvw = {(i, j, v, 0): 1 for i, j, v in legs}
+    xijv = {(i, j, v): 1 for i, j, v in legs}
+    return fijvw, xijv, Vtotal, {i: int(i in hubs) for i in range(N)}
+
+
+def check_hand_made():
+    # Vehicle change at node 2: only allowed if 2 is an open hub
+    legs = [(1, 2, 0), (2, 3, 1)]
+    assert not check_continuous_path(0, 1, 3, *path_solution(legs, hubs=()))
+    assert check_continuous_path(0, 1, 3, *path_solution(legs, hubs=(2,)))
+    # Node 2 is reached first on vehicle 0 (dead end) and then on vehicle 1, which goes on to 5:
+    # the node-visited DFS stops at the second visit, the state BFS does not
+    legs = [(1, 4, 0), (4, 2, 0), (1, 3, 1), (3, 2, 1), (2, 5, 1)]
+    assert not reference_continuous_path(0, 1, 5, *path_solution(legs, hubs=()))
+    assert check_continuous_path(0, 1, 5, *path_solution(legs, hubs=()))
+    # No flow out of the origin
+    assert not check_continuous_path(0, 1, 5, *path_solution([], hubs=()))
+
+
+def compare(instance_data, solution):
+    """Paths of all commodities with both checks; returns (new verdicts, old verdicts, new s, old s)."""
+    fijvw, xijv, yi = solution['fijvw'], solution['xijv'], solution['yi']
+    Vtotal = len(solution['av'])
+    ow, dw = instance_data.ow, instance_data.dw
+    commodities = [int(w) for w in instance_data.nonzero_flows]
+
+    start = time.perf_counter()
+    arcs = commodity_arcs(*solution_arrays(instance_data, solution)[3:])
+    new = [check_continuous_path(w, ow[w], dw[w], fijvw, xijv, Vtotal, yi, arcs=arcs.get(w, {})) for w in commodities]
+    new_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    old = [reference_continuous_path(w, ow[w], dw[w], fijvw, xijv, Vtotal, yi) for w in commodities]
+    old_time = time.perf_counter() - start
+    return new, old, new_time, old_time
+
+
+def report(label, instance_data, solution):
+    new, old, new_time, old_time = compare(instance_data, solution)
+    assert all(new), f"{label}: no continuous path for {new.count(False)} commodities"
+    print(f"{label:<55} {len(new):>11} {old.count(False):>9} {old_time * 1e3:>10.1f} {new_time * 1e3:>9.2f} "
+          f"{old_time / new_time:>7.0f}x")
+
+
+if __name__ == "__main__":
+    check_hand_made()
+    print("Hand-made paths: transfers only at open hubs, dead-end first visits handled")
+
+    print(f"\n{'solution':<55} {'commodities':>11} {'old fails':>9} {'DFS (ms)':>10} {'BFS (ms)':>9} {'speedup':>8}")
+    instances = VirtualInstances()
+    for instance_id in list(reference_results().index) + ["20R-alpha=021"]:
+        data = instances.load(instance_id)
+        N, Vtotal, W = int(data.S) + 1, int(sum(data.Vind)), int(data.W)
+        plans = {"greedy": greedy_routing_plan(data).to_solution()}
+        with contextlib.redirect_stdout(io.StringIO()):
+            plans["ALNS"] = solve_routing_alns(data, [], list(range(1, N)), False, False, False, False, time_budget=2.0)['solution']
+        for name, solution in plans.items():
+            report(f"{instance_id} {name}", data, solution)
+        if data.S <= 10:
+            # Sparse solutions: len(xijv) is N * N * V, so the DFS scans every key per node
+            report(f"{instance_id} greedy (sparse)", data, sparse_solution(plans["greedy"], N, Vtotal, W))
+
+    # Every shipped instance: greedy plan (all paths found) and broken copies (every path the DFS finds is found)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    checked = broken = 0
+    for instance_id in sorted(instances.catalog.records):
+        data = instances.load(instance_id)
+        plan = greedy_routing_plan(data).to_solution()
+        new, old, _, _ = compare(data, plan)
+        assert all(new), instance_id
+        for _ in range(SWEEP_MUTATIONS):
+            new, old, _, _ = compare(data, mutate(data, plan, rng))
+            assert all(n or not o for n, o in zip(new, old)), instance_id
+            broken += new.count(False)
+        checked += 1
+    print(f"\nAll {checked} shipped instances ({time.perf_counter() - start:.0f} s): greedy paths found, "
+          f"{broken} broken paths in the mutated copies, none the DFS finds")
+
+    # MIP solutions of instances solvable with a size-limited Gurobi license
+    with tempfile.TemporaryDirectory() as tmp:
+        for S in (3, 4):
+            file_path = os.path.join(tmp, f"synthetic_{S}.dat")
+            write_synthetic_dat(file_path, S, seed=0)
+            data = read_instance_from_dat(file_path)
+            for configuration in MAIN_CONFIGURATIONS:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = solve_routing_decisions(data, alternating_predictions(data), list(range(1, S + 1)), *configuration)
+                report(f"synthetic S={S} {configuration}", data, result['solution'])
+                assert check_feasibility(data, result['solution'])[0]
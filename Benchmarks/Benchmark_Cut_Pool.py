@@ -0,0 +1,87 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from Auxiliary_Functions.Virtual_Instances import DEFAULT_MASTER_SEED, build_instance, instance_name
+from MIP_Models.Cut_Pool import CutPool, cut_pool_key
+from MIP_Models.Routing_Session import RoutingSession
+from Benchmark_Reading_Instances import write_synthetic_dat
+from Benchmark_Routing_Builders import alternating_predictions
+from Benchmark_Routing_Session import MAIN_CONFIGURATIONS
+
+'''
+Cross-run cut pool: the main.py configurations of a base instance and its flow
+/ hub cost variants solved in sequence without a pool, with a pool that only
+records (hit rate: share of the cuts found that the pool already held) and
+with a pool seeding every solve (cuts found by the callback, solving time).
+'''
+
+VARIANTS = [(None, None), (None, 20), (60, None), (60, 5)]  # (flow %, hub cost %)
+
+
+def variants(base_name, base):
+    return [(instance_name(base_name, flow, hub, DEFAULT_MASTER_SEED), build_instance(base, base_name, flow, hub, DEFAULT_MASTER_SEED))
+            for flow, hub in VARIANTS]
+
+
+def run_sequence(instances, cut_pool):
+    """Solve MAIN_CONFIGURATIONS of every instance; returns one row per solve."""
+    rows = []
+    for instance_id, data in instances:
+        with RoutingSession(data, alternating_predictions(data), cut_pool=cut_pool,
+                            cut_pool_key=cut_pool_key(instance_id, data)) as session:
+            for configuration in MAIN_CONFIGURATIONS:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = session.solve(list(range(1, int(data.S) + 1)), *configuration)
+                rows.append((instance_id, configuration, result))
+    return rows
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "synthetic_4.dat")
+        write_synthetic_dat(file_path, 4, seed=0)
+        instances = variants("synthetic_4", read_instance_from_dat(file_path))
+
+        runs = {
+            "none": run_sequence(instances, None),
+            "record": run_sequence(instances, CutPool(seed_cuts=False)),
+        }
+        seeding_pool = CutPool(os.path.join(tmp, "cut_pool.json"))
+        runs["seed"] = run_sequence(instances, seeding_pool)
+
+        # The pool survives a save / load round trip
+        seeding_pool.save()
+        reloaded = CutPool(seeding_pool.pool_file)
+        assert {key: set(reloaded.cuts(key)) for key in reloaded.entries} == \
+            {key: set(seeding_pool.cuts(key)) for key in seeding_pool.entries}
+
+    # Pool cuts are valid: same optimum with and without them
+    objectives = {name: [result['objective_value'] for _, _, result in rows] for name, rows in runs.items()}
+    for name in ("record", "seed"):
+        assert all(a is b or np.isclose(a, b) for a, b in zip(objectives["none"], objectives[name])), objectives
+
+    print(f"{'instance':<40} {'configuration':<30} {'cuts (none)':>11} {'hits (record)':>13} "
+          f"{'seeded':>6} {'tight':>5} {'cuts (seed)':>11} {'time none / seed (s)':>21}")
+    for (instance_id, configuration, none), (_, _, record), (_, _, seed) in zip(runs["none"], runs["record"], runs["seed"]):
+        hits = record['cut_pool']
+        print(f"{instance_id:<40} {str(configuration):<30} {hits['found']:>11} "
+              f"{hits['found_in_pool']:>6}/{hits['found']:<6} {seed['cut_pool']['seeded']:>6} "
+              f"{seed['cut_pool']['tight']:>5} {seed['cut_pool']['found']:>11} "
+              f"{none['total_solving_time']:>10.3f} / {seed['total_solving_time']:<8.3f}")
+
+    found = sum(result['cut_pool']['found'] for _, _, result in runs["record"])
+    hits = sum(result['cut_pool']['found_in_pool'] for _, _, result in runs["record"])
+    print(f"\nHit rate without seeding: {hits}/{found} cuts found were already in the pool")
+    for name in ("none", "seed"):
+        print(f"Total solving time ({name}): {sum(result['total_solving_time'] for _, _, result in runs[name]):.3f} s")
@@ -0,0 +1,169 @@
+import contextlib
+import copy
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Feasibility_checks import check_feasibility, feasibility_violations
+from Auxiliary_Functions.Sparse_Solution import sparse_solution
+from Auxiliary_Functions.Virtual_Instances import VirtualInstances
+from Heuristics.Delta_Evaluator import DeltaEvaluator
+from Heuristics.Greedy_Constructive import greedy_routing_plan, plan_cost
+from Benchmark_Greedy_Heuristic import reference_results
+
+'''
+Incremental evaluation: random moves (arc, flow, hub and vehicle flips and
+reroutes of a commodity along another vehicle's route) on greedy plans are
+evaluated with DeltaEvaluator and compared with check_feasibility and
+plan_cost of the full solution after the move, on a subset of the shipped
+instances and (with fewer moves) on all of them; part of the moves are applied
+so later moves start from changed (often infeasible) states. Reports the time
+per move against a full check.
+'''
+
+MOVES = 300  # Moves per instance
+SWEEP_MOVES = 30  # Moves per instance on the sweep over all shipped instances
+APPLY_PROBABILITY = 0.3  # Share of the evaluated moves that are applied
+
+
+def vehicle_routes(solution, Vtotal):
+    """Node sequence of every vehicle, following its arcs from the depot ([] for unused vehicles)."""
+    successor = [{} for _ in range(Vtotal)]
+    for (i, j, v), value in solution['xijv'].items():
+        if value > 0.5:
+            successor[v][i] = j
+    routes = []
+    for v in range(Vtotal):
+        route, node = [], successor[v].get(0)
+        while node is not None and node != 0 and node not in route:
+            route.append(node)
+            node = successor[v].get(node)
+        routes.append(route)
+    return routes
+
+
+def random_move(evaluator, solution, rng):
+    """A random move on the current solution (see the module description)."""
+    N, Vtotal = evaluator.N, evaluator.Vtotal
+    commodities = sorted(evaluator.commodities)
+    kind = rng.integers(6)
+    if kind == 0 and commodities:
+        # Reroute a commodity along the route of a vehicle visiting its origin before its destination
+        w = int(rng.choice(commodities))
+        o, d = int(evaluator.ow[w]), int(evaluator.dw[w])
+        options = [(v, route) for v, route in enumerate(vehicle_routes(solution, Vtotal))
+                   if o in route and d in route and route.index(o) < route.index(d)]
+        if options:
+            v, route = options[rng.integers(len(options))]
+            path = route[route.index(o):route.index(d) + 1]
+            return evaluator.reroute(w, [(a, b, v) for a, b in zip(path[:-1], path[1:])])
+    if kind == 1:
+        i, j = rng.choice(np.arange(N), 2, replace=False)
+        key = (int(i), int(j), int(rng.integers(Vtotal)))
+        return {'xijv': {key: 0 if solution['xijv'].get(key, 0) else 1}}
+    if kind == 2:
+        flows = list(solution['fijvw'])
+        if flows:
+            return {'fijvw': {flows[rng.integers(len(flows))]: 0}}
+    if kind == 3 and commodities:
+        i, j = rng.choice(np.arange(1, N), 2, replace=False)
+        return {'fijvw': {(int(i), int(j), int(rng.integers(Vtotal)), int(rng.choice(commodities))): 1}}
+    if kind == 4:
+        i = int(rng.integers(1, N))
+        return {'yi': {i: 1 - solution['yi'][i]}}
+    v = int(rng.integers(Vtotal))
+    return {'av': {v: 1 - solution['av'][v]}}
+
+
+def applied(solution, move):
+    """Copy of a dict solution with a move applied."""
+    solution = copy.deepcopy(solution)
+    for name, values in move.items():
+        for key, value in values.items():
+            if value or name in ('av', 'yi'):
+                solution[name][key] = value
+            else:
+                solution[name].pop(key, None)
+    return solution
+
+
+def violated_keys(instance_data, solution):
+    """Violated constraint keys per family, from the batch check."""
+    keys = {}
+    for violation in feasibility_violations(instance_data, solution):
+        keys.setdefault(violation['family'], set()).add(violation['index'])
+    return keys
+
+
+def check_moves(instance_data, plan, rng, moves=MOVES):
+    """Evaluate random moves against full checks; returns (seconds per move, seconds per full check)."""
+    evaluator = DeltaEvaluator(instance_data, plan)
+    solution = evaluator.to_solution()
+    assert evaluator.feasible == check_feasibility(instance_data, plan)[0]
+    assert np.isclose(evaluator.cost, plan_cost(instance_data, plan))
+
+    move_time = check_time = 0.0
+    for _ in range(moves):
+        move = random_move(evaluator, solution, rng)
+        start = time.perf_counter()
+        feasible, delta = evaluator.evaluate(move)
+        move_time += time.perf_counter() - start
+
+        after = applied(solution, move)
+        start = time.perf_counter()
+        expected = check_feasibility(instance_data, after)[0]
+        check_time += time.perf_counter() - start
+        assert feasible == expected, move
+        assert np.isclose(delta, plan_cost(instance_data, after) - plan_cost(instance_data, solution)), move
+
+        if rng.random() < APPLY_PROBABILITY:
+            evaluator.apply(move)
+            solution = after
+            expected_keys = violated_keys(instance_data, solution)
+            assert {family: keys for family, keys in evaluator.violated.items() if keys} == expected_keys, move
+            assert np.isclose(evaluator.cost, plan_cost(instance_data, solution))
+
+    # The state after the applied moves reads back as the same solution
+    assert check_feasibility(instance_data, evaluator.to_solution()) == check_feasibility(instance_data, solution)
+    return move_time / moves, check_time / moves
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    instances = VirtualInstances()
+
+    print(f"{'instance':<45} {'moves':>6} {'move (ms)':>10} {'full (ms)':>10} {'speedup':>8}")
+    for instance_id in list(reference_results().index) + ["20R-alpha=021_Flow_50perc", "20R-alpha=021"]:
+        data = instances.load(instance_id)
+        plan = greedy_routing_plan(data).to_solution()
+        move_time, check_time = check_moves(data, plan, rng)
+        print(f"{instance_id:<45} {MOVES:>6} {move_time * 1e3:>10.3f} {check_time * 1e3:>10.2f} "
+              f"{check_time / move_time:>7.0f}x")
+
+    # Every shipped instance, fewer moves each
+    start = time.perf_counter()
+    instance_ids = sorted(instances.catalog.records)
+    for instance_id in instance_ids:
+        data = instances.load(instance_id)
+        check_moves(data, greedy_routing_plan(data).to_solution(), rng, moves=SWEEP_MOVES)
+    print(f"\nAll {len(instance_ids)} shipped instances, {SWEEP_MOVES} moves each ({time.perf_counter() - start:.0f} s): "
+          f"same verdicts, violations and cost deltas")
+
+    # Sparse solutions (e.g. extracted from the MIP) initialize the same state
+    data = instances.load("20R-alpha=021")
+    plan = greedy_routing_plan(data).to_solution()
+    N, Vtotal, W = int(data.S) + 1, int(sum(data.Vind)), int(data.W)
+    dense, sparse = DeltaEvaluator(data, plan), DeltaEvaluator(data, sparse_solution(plan, N, Vtotal, W))
+    assert dense.to_solution() == sparse.to_solution() and dense.cost == sparse.cost
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        DeltaEvaluator(data, plan)
+    print(f"\nInitialization on 20R-alpha=021: {(time.perf_counter() - start) * 1e3:.1f} ms")
@@ -0,0 +1,84 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Feasibility_Audit import audit_solutions, save_solution, solution_file
+from Auxiliary_Functions.Feasibility_checks import check_feasibility
+from Auxiliary_Functions.Virtual_Instances import VirtualInstances
+from Heuristics.Greedy_Constructive import greedy_routing_plan
+from Benchmark_Feasibility_Checks import mutate
+from Benchmark_Greedy_Heuristic import reference_results
+
+'''
+Batch feasibility audit: greedy plans of the shipped instances and of 20R plus
+randomly broken copies are stored as solution files, audited in this process
+and in a process pool, and the verdicts compared with check_feasibility run
+one solution at a time. Reports audit throughput (solutions per second).
+'''
+
+MUTATIONS = 15  # Broken copies per greedy plan
+
+
+def write_solutions(folder, rng):
+    """Store the greedy plan and MUTATIONS broken copies of each instance; returns {file: expected verdict}."""
+    instances = VirtualInstances()
+    expected = {}
+    for instance_id in list(reference_results().index) + ["20R-alpha=021", "20R-alpha=021_Flow_50perc"]:
+        data = instances.load(instance_id)
+        plan = greedy_routing_plan(data).to_solution()
+        solutions = {"greedy": plan}
+        solutions.update({f"mutated_{k}": mutate(data, plan, rng) for k in range(MUTATIONS)})
+        for label, solution in solutions.items():
+            with contextlib.redirect_stdout(io.StringIO()):
+                feasible = check_feasibility(data, solution)[0]
+            expected[save_solution(folder, instance_id, label, {'solution': solution}, data)] = feasible
+    return expected
+
+
+def check_report(report, expected):
+    results = {record["file"]: record for record in report["results"]}
+    for file_path, feasible in expected.items():
+        record = results[file_path]
+        assert record["error"] is None, record["error"]
+        assert record["feasible"] == feasible, file_path
+        assert (sum(record["violations"].values()) == 0) == feasible, file_path
+    summary = report["summary"]
+    assert summary["feasible"] == sum(expected.values())
+    assert summary["infeasible"] == len(expected) - sum(expected.values())
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "Solutions")
+        start = time.perf_counter()
+        expected = write_solutions(folder, rng)
+        print(f"Stored {len(expected)} solutions ({sum(expected.values())} feasible) in {time.perf_counter() - start:.1f} s")
+
+        # Files the audit reports as errors instead of failing on
+        save_solution(folder, "99R-alpha=021", "unknown", {'solution': {}})
+        with open(solution_file(folder, "8R-alpha=021", "corrupt"), 'wb') as file:
+            file.write(b"not a pickle")
+
+        print(f"\n{'audit':<22} {'solutions':>9} {'errors':>6} {'check (s)':>9} {'wall (s)':>8} {'per s':>8}")
+        for label, max_workers in [("in process", 1), ("pool, 2 workers", 2), ("pool, all CPUs", None)]:
+            report_file = os.path.join(tmp, f"audit_{max_workers}.json")
+            report = audit_solutions(folder, report_file=report_file, max_workers=max_workers)
+            check_report(report, expected)
+            summary = report["summary"]
+            assert summary["errors"] == 2 and summary["solutions"] == len(expected) + 2
+            assert os.path.getsize(report_file) > 0
+            print(f"{label:<22} {summary['solutions']:>9} {summary['errors']:>6} {summary['check_seconds']:>9.2f} "
+                  f"{summary['wall_seconds']:>8.2f} {summary['solutions'] / summary['wall_seconds']:>8.0f}")
+
+        print("\nViolations per family:", {family: count for family, count in summary["violations"].items() if count})
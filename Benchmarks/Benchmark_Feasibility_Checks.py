@@ -0,0 +1,264 @@
+import contextlib
+import copy
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Feasibility_checks import check_continuous_path, check_feasibility, feasibility_violations
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from Auxiliary_Functions.Sparse_Solution import sparse_solution
+from Auxiliary_Functions.Virtual_Instances import VirtualInstances
+from Heuristics.Greedy_Constructive import greedy_routing_plan
+from MIP_Models.MIPs import solve_routing_decisions
+from Benchmark_Greedy_Heuristic import reference_results
+from Benchmark_Reading_Instances import write_synthetic_dat
+from Benchmark_Routing_Builders import alternating_predictions
+from Benchmark_Routing_Session import MAIN_CONFIGURATIONS
+
+'''
+Array-based check_feasibility against the loop implementation it replaced:
+same verdicts and error lists on greedy plans of every shipped instance, on
+randomly broken copies of them and on MIP solutions (dicts and sparse
+solutions), and the time per check on a subset.
+'''
+
+
+def reference_check_feasibility(instance_data, solution):
+    """
+    check_feasibility as nested Python loops over dict lookups (before the array implementation).
+
+    The continuous-path check calls the current, adjacency-indexed check_continuous_path
+    rather than the DFS the loop implementation used, so it only mirrors the other checks.
+    """
+    # Extract instance parameters
+    N = instance_data.S + 1 # Total number of nodes
+    V_small_total = instance_data.Vind[0]
+    V_big_total = instance_data.Vind[1]
+    Vtotal = V_small_total + V_big_total # Number of vehicles
+    ow = instance_data.ow # Origins of demands
+    dw = instance_data.dw  # Destinations of demands
+    qw = instance_data.qw # Demand quantities
+    vcapacity = instance_data.vcap  # Vehicle capacities
+    # si = instance_data.si  # Indicator for transshipment nodes
+    # tawv = instance_data.tawv  # Vehicle weights
+    
+    # Extract solution variables (fijvw and xijv may hold only the variables of the
+    # sparse model; missing keys are 0)
+    fijvw = solution['fijvw']  # Flow variables
+    xijv = solution['xijv']  # Arc usage
+    av = solution['av']  # Vehicle acquisition
+    yi = solution['yi']  # Hub/transshipment node activation
+
+    # Initialize flags and error list
+    feasible = True
+    errors = []
+
+    nonzero_flows = instance_data.nonzero_flows
+
+    # (2) Flow balance at origin
+    for w in nonzero_flows:
+        sum_flow = sum(
+            fijvw.get((ow[w], j, v, w), 0) for v in range(Vtotal) for j in range(1, N)
+        )
+        if sum_flow != 1:  # Allow a small tolerance for floating-point errors
+            feasible = False
+            errors.append(f"Flow balance violated at origin for demand {w}.")
+
+    # (3) Flow balance at destination
+    for w in nonzero_flows:
+        sum_flow = sum(
+            fijvw.get((i, dw[w], v, w), 0) for v in range(Vtotal) for i in range(1, N)
+        )
+        if sum_flow != 1:
+            feasible = False
+            errors.append(f"Flow balance violated at destination for demand {w}.")
+
+    # (4) Flow balance at intermediate nodes
+    for w in nonzero_flows:
+        for i in range(1, N):
+            if i != ow[w] and i != dw[w]:
+                sum_out = sum(
+                    fijvw.get((i, j, v, w), 0) for v in range(Vtotal) for j in range(1, N) if j != i
+                )
+                sum_in = sum(
+                    fijvw.get((j, i, v, w), 0) for v in range(Vtotal) for j in range(1, N) if j != i
+                )
+                if not abs(sum_out - sum_in) < 1e-6:
+                    feasible = False
+                    errors.append(f"Flow conservation violated at node {i} for demand {w}.")
+
+    # (5) Flow implies arc usage
+    for v in range(Vtotal):
+        for w in nonzero_flows:
+            for i in range(1, N):
+                for j in range(1, N):
+                    if fijvw.get((i, j, v, w), 0) > xijv.get((i, j, v), 0) + 1e-6:
+                        feasible = False
+                        errors.append(f"Flow on arc ({i}, {j}) in vehicle {v} without arc usage.")
+
+    # (6) Transshipment vehicle changes
+    for v in range(Vtotal):
+        for w in nonzero_flows:
+            for j in range(1, N):
+                if j != ow[w] and j != dw[w] and yi[j] == 0:
+                    sum_flow = sum(
+                        fijvw.get((i, j, v, w), 0) - fijvw.get((j, i, v, w), 0) for i in range(1, N) if i != j
+                    )
+                    if not abs(sum_flow) < 1e-6:
+                        feasible = False
+                        errors.append(f"Flow balance at non-transshipment node {j} violated for demand {w}.")
+
+    # (7) Vehicle capacity constraints
+    for v in range(Vtotal):
+        for i in range(1, N):
+            for j in range(1, N):
+                total_flow = sum(qw[w] * fijvw.get((i, j, v, w), 0) for w in nonzero_flows)
+                if v in range (V_small_total):
+                    if total_flow > vcapacity[0] * xijv.get((i, j, v), 0):
+                        feasible = False
+                        errors.append(f"Capacity constraint violated on arc ({i}, {j}) for vehicle {v}.")
+                
+                if v in range (V_small_total):
+                    if total_flow > vcapacity[1] * xijv.get((i, j, v), 0):
+                        feasible = False
+                        errors.append(f"Capacity constraint violated on arc ({i}, {j}) for vehicle {v}.")
+
+    # (8) Node balance for vehicles
+    for v in range(Vtotal):
+        for i in range(N):
+            sum_out = sum(xijv.get((i, j, v), 0) for j in range(N) if i != j)
+            sum_in = sum(xijv.get((j, i, v), 0) for j in range(N) if i != j)
+            if not abs(sum_out - sum_in) < 1e-6:
+                feasible = False
+                errors.append(f"Node balance violated for vehicle {v} at node {i}.")
+
+    # (12) Vehicle acquisition
+    for v in range(Vtotal):
+        if av[v] < 0.5:  # Vehicle not acquired
+            for i in range(N):
+                for j in range(N):
+                    if xijv.get((i, j, v), 0) > 1e-6:
+                        feasible = False
+                        errors.append(f"Vehicle {v} traverses arc ({i}, {j}) without being acquired.")
+
+    # Final check for continuous paths
+    for w in nonzero_flows:
+        if not check_continuous_path(w, ow[w], dw[w], fijvw, xijv, Vtotal, yi):
+            feasible = False
+            # errors.append(f"No continuous feasible path for demand {w}.")******** (checking this error is not accurate)
+
+    # Return feasibility and errors
+    return feasible, errors
+
+
+
+SWEEP_MUTATIONS = 2  # Broken copies per plan on the sweep over all shipped instances
+
+
+def mutate(instance_data, solution, rng):
+    """Copy of a solution with one to three random breaks (flows, arcs, vehicles, hubs, overloads)."""
+    solution = copy.deepcopy(solution)
+    N = int(instance_data.S) + 1
+    Vtotal = len(solution['av'])
+    nonzero_flows = instance_data.nonzero_flows
+    for _ in range(rng.integers(1, 4)):
+        kind = rng.integers(6)
+        flows = [key for key, value in solution['fijvw'].items() if value]
+        arcs = [key for key, value in solution['xijv'].items() if value]
+        if kind == 0 and flows:
+            del solution['fijvw'][flows[rng.integers(len(flows))]]
+        elif kind == 1 and len(nonzero_flows):
+            i, j = rng.choice(np.arange(1, N), 2, replace=False)
+            solution['fijvw'][int(i), int(j), int(rng.integers(Vtotal)), int(rng.choice(nonzero_flows))] = 1
+        elif kind == 2 and arcs:
+            del solution['xijv'][arcs[rng.integers(len(arcs))]]
+        elif kind == 3:
+            solution['av'][int(rng.integers(Vtotal))] = 0
+        elif kind == 4:
+            solution['yi'] = {i: 0 for i in solution['yi']}
+        elif kind == 5 and arcs:
+            # Every commodity on one arc
+            i, j, v = arcs[rng.integers(len(arcs))]
+            if i > 0 and j > 0:
+                for w in nonzero_flows:
+                    solution['fijvw'][i, j, v, int(w)] = 1
+    return solution
+
+
+def check_same(instance_data, solution):
+    """Assert that both implementations give the same verdict and errors, for dicts and sparse solutions."""
+    N, Vtotal, W = int(instance_data.S) + 1, len(solution['av']), int(instance_data.W)
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = reference_check_feasibility(instance_data, solution)
+    assert check_feasibility(instance_data, solution) == expected
+    assert check_feasibility(instance_data, sparse_solution(solution, N, Vtotal, W)) == expected
+    return expected[0]
+
+
+def time_per_check(check, instance_data, solution, repeats=3):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            check(instance_data, solution)
+    return (time.perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    instances = VirtualInstances()
+
+    print(f"{'instance':<45} {'solutions':>9} {'infeasible':>10} {'loops (ms)':>11} {'arrays (ms)':>11} {'speedup':>8}")
+    instance_ids = list(reference_results().index) + ["20R-alpha=021_Flow_50perc", "20R-alpha=021"]
+    for instance_id in instance_ids:
+        data = instances.load(instance_id)
+        plan = greedy_routing_plan(data).to_solution()
+        samples = [plan] + [mutate(data, plan, rng) for _ in range(10)]
+        infeasible = sum(not check_same(data, solution) for solution in samples)
+        reference = time_per_check(reference_check_feasibility, data, plan)
+        vectorized = time_per_check(check_feasibility, data, plan)
+        print(f"{instance_id:<45} {len(samples):>9} {infeasible:>10} {reference * 1e3:>11.1f} "
+              f"{vectorized * 1e3:>11.1f} {reference / vectorized:>7.1f}x")
+
+    # Every shipped instance: greedy plan and broken copies, both implementations
+    start = time.perf_counter()
+    sizes = {}
+    for instance_id in sorted(instances.catalog.records):
+        data = instances.load(instance_id)
+        plan = greedy_routing_plan(data).to_solution()
+        samples = [plan] + [mutate(data, plan, rng) for _ in range(SWEEP_MUTATIONS)]
+        counts = sizes.setdefault(instance_id.split("-")[0], [0, 0, 0])
+        counts[0] += 1
+        counts[1] += len(samples)
+        counts[2] += sum(not check_same(data, solution) for solution in samples)
+    print(f"\nAll shipped instances ({time.perf_counter() - start:.0f} s): same verdicts and errors")
+    for size, (count, solutions, infeasible) in sorted(sizes.items()):
+        print(f"  {size:<5} {count:>4} instances {solutions:>5} solutions {infeasible:>5} infeasible")
+
+    # MIP solutions (sparse) of instances solvable with a size-limited Gurobi license
+    with tempfile.TemporaryDirectory() as tmp:
+        for S in (3, 4):
+            file_path = os.path.join(tmp, f"synthetic_{S}.dat")
+            write_synthetic_dat(file_path, S, seed=0)
+            data = read_instance_from_dat(file_path)
+            for configuration in MAIN_CONFIGURATIONS:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = solve_routing_decisions(data, alternating_predictions(data), list(range(1, S + 1)), *configuration)
+                dense = {name: dict(values.items()) for name, values in result['solution'].items()}
+                with contextlib.redirect_stdout(io.StringIO()):
+                    assert check_feasibility(data, result['solution']) == reference_check_feasibility(data, dense)
+                assert check_feasibility(data, result['solution'])[0]
+    print("\nMIP solutions of synthetic S=3/4 instances: same verdicts, all feasible")
+
+    # Violation report of a broken plan
+    data = instances.load(instance_ids[0])
+    for violation in feasibility_violations(data, mutate(data, greedy_routing_plan(data).to_solution(), rng))[:5]:
+        print(violation)
@@ -0,0 +1,94 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+from gurobipy import GurobiError
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from MIP_Models.Routing_Session import RoutingSession
+from MIP_Models.Subtours import separate_fractional_subtours
+from Benchmark_Reading_Instances import write_synthetic_dat
+from Benchmark_Routing_Builders import alternating_predictions
+from Benchmark_Routing_Session import MAIN_CONFIGURATIONS
+from Benchmark_Subtour_Separation import random_solution
+
+'''
+Fractional subtour cuts at MIPNODE: separation checks on fractional
+solutions, then solves with and without the user cuts (final bound, nodes,
+solving time).
+'''
+
+def in_flow(x, subset, v):
+    outside = np.setdiff1d(np.arange(x.shape[0]), subset)
+    return x[np.ix_(outside, subset, [v])].sum()
+
+
+def check_separation(rng, N=21, V=10, samples=50, tolerance=1e-3):
+    """
+    Every returned cut is violated by the fractional solution, and solutions whose vehicles are
+    single depot tours get no cuts.
+    """
+    for _ in range(samples):
+        x, active, visited = random_solution(N, V, rng)
+        # Average with a second solution to get fractional values
+        x2, active2, visited2 = random_solution(N, V, rng)
+        weight = rng.uniform(0.2, 0.8)
+        x, active, visited = weight * x + (1 - weight) * x2, weight * active + (1 - weight) * active2, \
+            weight * visited + (1 - weight) * visited2
+        for v, cuts in enumerate(separate_fractional_subtours(x, active, visited, tolerance)):
+            for subset, k in cuts:
+                assert 0 not in subset and k in subset
+                assert in_flow(x, subset, v) < visited[v, k] - tolerance
+
+    x = np.zeros((N, N, V))
+    tour = [0] + list(rng.permutation(np.arange(1, N))) + [0]
+    x[tour[:-1], tour[1:], :] = 1.0
+    visited = np.ones((V, N))
+    assert all(not cuts for cuts in separate_fractional_subtours(x, np.ones(V), visited))
+
+
+def solve(data, fractional_cuts):
+    """Solve MAIN_CONFIGURATIONS on one session; returns the solve log entries and results."""
+    rows = []
+    with RoutingSession(data, alternating_predictions(data)) as session:
+        for configuration in MAIN_CONFIGURATIONS:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = session.solve(list(range(1, int(data.S) + 1)), *configuration, fractional_cuts=fractional_cuts)
+            rows.append((configuration, result))
+    return rows
+
+
+if __name__ == "__main__":
+    check_separation(np.random.default_rng(0))
+    print("Separation: every cut violated, no cuts for depot tours")
+
+    print(f"\n{'instance':<12} {'configuration':<30} {'cuts':<9} {'user cuts':>9} {'bound':>10} {'OFV':>10} "
+          f"{'nodes':>6} {'time (s)':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for S, seed in [(3, 0), (3, 1), (3, 2), (4, 0), (5, 0)]:
+            file_path = os.path.join(tmp, f"synthetic_{S}_{seed}.dat")
+            write_synthetic_dat(file_path, S, seed=seed)
+            data = read_instance_from_dat(file_path)
+            label = f"S={S} seed {seed}"
+            try:
+                runs = {"MIPSOL": solve(data, None), "MIPNODE": solve(data, {'node_frequency': 1})}
+            except GurobiError as e:
+                print(f"{label:<12} skipped: {e}")
+                continue
+            for name, rows in runs.items():
+                for configuration, result in rows:
+                    bound, ofv = result['objective_bound'], result['objective_value']
+                    print(f"{label:<12} {str(configuration):<30} {name:<9} {result['user_cuts']:>9} "
+                          f"{'-' if bound is None else f'{bound:.2f}':>10} {'-' if ofv is None else f'{ofv:.2f}':>10} "
+                          f"{result['node_count']:>6.0f} {result['total_solving_time']:>9.3f}")
+            # Valid cuts keep the optimum
+            objectives = [[result['objective_value'] for _, result in rows] for rows in runs.values()]
+            assert all(a is b or np.isclose(a, b) for a, b in zip(*objectives)), objectives
@@ -0,0 +1,162 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from gurobipy import GurobiError
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Feasibility_checks import check_feasibility
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from Auxiliary_Functions.Virtual_Instances import VirtualInstances
+from Heuristics.Greedy_Constructive import RoutingPlan, _place_through_hub, best_leg_insertion, greedy_routing_plan, plan_cost
+from MIP_Models.Routing_Session import RoutingSession
+from Benchmark_Reading_Instances import write_synthetic_dat
+from Benchmark_Routing_Builders import alternating_predictions
+
+'''
+Greedy constructive heuristic: feasibility on every shipped instance (all nodes
+and a random half of them as hubs), leg insertion on unlimited-capacity vehicles,
+hub transfers past non-hub nodes, construction time and cost against
+the stored MIP optima, and the MIP solve with and without the greedy plan as
+MIP start.
+'''
+
+REFERENCE_FILE = os.path.join(
+    project_root, "ML Experiments", "Heuristic Results", "Heuristic_output_ML_combined_output_features_1.csv"
+)
+BASELINE = (False, False, False, False)
+
+
+def reference_results():
+    """Stored OFV and solving time of the baseline configuration (no ML guidance) per instance."""
+    results = pd.read_csv(REFERENCE_FILE)
+    baseline = results[
+        (results["use_ml_guidance"] == BASELINE[0]) & (results["use_location_first"] == BASELINE[1])
+        & (results["use_ML_direct"] == BASELINE[2]) & (results["use_ML_transhipment"] == BASELINE[3])
+    ]
+    return baseline.set_index("Instance ID")[["ML_OFV - Total Costs", "ML_Total Solving Time"]]
+
+
+def greedy_report(data, hubs=None):
+    """Return (seconds, plan, feasible); asserts that the plan is scored like the MIP objective."""
+    start = time.perf_counter()
+    plan = greedy_routing_plan(data, hubs=hubs)
+    seconds = time.perf_counter() - start
+    solution = plan.to_solution()
+    assert np.isclose(plan.cost(), plan_cost(data, solution)), (plan.cost(), plan_cost(data, solution))
+    with contextlib.redirect_stdout(io.StringIO()):
+        feasible = check_feasibility(data, solution)[0]
+    return seconds, plan, feasible
+
+
+def check_leg_insertion(data):
+    """Inserting both ends of a leg into a big-vehicle route keeps o before d and repeats no node."""
+    route = [1, 2, 9, 4]
+    for o, d in [(7, 6), (6, 7), (3, 5), (8, 3)]:
+        added, new_route = best_leg_insertion(route, np.zeros(len(route) + 1), data.arc_cost[1], np.inf, o, d, 1.0)
+        assert len(set(new_route)) == len(new_route) and new_route.index(o) < new_route.index(d), new_route
+        assert set(new_route) == set(route) | {o, d}
+    # o == d off the route is not a leg (it would visit the node twice)
+    assert best_leg_insertion(route, np.zeros(len(route) + 1), data.arc_cost[1], np.inf, 7, 7, 1.0) is None
+
+
+def check_hub_transfer(data):
+    """A commodity changes vehicle at a hub reached past a non-hub node: route1 = [o, x, h], route2 = [h, d]."""
+    w = int(data.nonzero_flows[0])
+    o, d = int(data.ow[w]), int(data.dw[w])
+    x, h = [node for node in range(1, int(data.S) + 1) if node not in (o, d)][:2]
+    for hubs in [{h}, {x, h}]:
+        plan = RoutingPlan(data)
+        plan.routes[plan.V_small], plan.routes[plan.V_small + 1] = [o, x, h], [h, d]
+        assert _place_through_hub(plan, w, o, d, hubs), hubs
+        assert plan.commodity_path(w) == [o, x, h, d], plan.commodity_path(w)
+
+
+def check_all_instances(instances, restricted_hubs=False):
+    """
+    Greedy plans of every shipped instance are feasible with simple commodity paths; returns (instances, seconds).
+
+    With restricted_hubs, a random half of the nodes are hubs (as fixed_hubs in main.py and ALNS)
+    and no commodity changes vehicle elsewhere.
+    """
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    instance_ids = sorted(instances.catalog.records)
+    infeasible, repeated, outside = [], [], []
+    for instance_id in instance_ids:
+        data = instances.load(instance_id)
+        hubs = None
+        if restricted_hubs:
+            hubs = set(rng.choice(np.arange(1, int(data.S) + 1), int(data.S) // 2, replace=False).tolist())
+        _, plan, feasible = greedy_report(data, hubs)
+        if not feasible:
+            infeasible.append(instance_id)
+        if any(len(set(path)) < len(path) for path in map(plan.commodity_path, plan.legs)):
+            repeated.append(instance_id)
+        if hubs is not None and not plan.hubs() <= hubs:
+            outside.append(instance_id)
+    assert not infeasible, infeasible
+    assert not repeated, repeated
+    assert not outside, outside
+    return len(instance_ids), time.perf_counter() - start
+
+
+def solve_baseline(data, start):
+    """Solve the baseline configuration; returns the solve log entry and objective."""
+    fixed_hubs = list(range(1, int(data.S) + 1))
+    with RoutingSession(data, alternating_predictions(data)) as session:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = session.solve(fixed_hubs, *BASELINE, start=start)
+        return session.solve_log[-1], result['objective_value']
+
+
+if __name__ == "__main__":
+    instances = VirtualInstances()
+    references = reference_results()
+    check_leg_insertion(instances.load("9R-alpha=021_Flow_40perc"))
+    check_hub_transfer(instances.load("8R-alpha=021"))
+    count, seconds = check_all_instances(instances)
+    print(f"Greedy plans of all {count} shipped instances are feasible with simple paths ({seconds:.1f} s)")
+    count, seconds = check_all_instances(instances, restricted_hubs=True)
+    print(f"... and with a random half of the nodes as hubs ({seconds:.1f} s)\n")
+
+    print(f"{'instance':<45} {'greedy (s)':>10} {'feasible':>8} {'greedy OFV':>12} {'MIP OFV':>12} {'gap':>7} {'MIP (s)':>8}")
+    for instance_id, (mip_ofv, mip_time) in references.iterrows():
+        data = instances.load(instance_id)
+        seconds, plan, feasible = greedy_report(data)
+        print(f"{instance_id:<45} {seconds:>10.4f} {str(feasible):>8} {plan.cost():>12.2f} {mip_ofv:>12.2f} "
+              f"{plan.cost() / mip_ofv - 1:>7.1%} {mip_time:>8.2f}")
+
+    # MIP with and without the greedy start (instances solvable with a size-limited Gurobi license)
+    print(f"\n{'instance':<20} {'start':<10} {'first inc. (s)':>14} {'time (s)':>9} {'OFV':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        solve_instances = []
+        for seed in range(3):
+            file_path = os.path.join(tmp, f"tiny_{seed}.dat")
+            write_synthetic_dat(file_path, 3, seed=seed)
+            solve_instances.append((f"S=3 seed {seed}", read_instance_from_dat(file_path)))
+    solve_instances += [(instance_id, instances.load(instance_id)) for instance_id in references.index[:2]]
+    for label, data in solve_instances:
+        start = greedy_routing_plan(data).to_solution()
+        objectives = []
+        for name, mip_start in [("none", None), ("greedy", start)]:
+            try:
+                entry, objective = solve_baseline(data, mip_start)
+            except GurobiError as e:
+                print(f"{label:<20} {name:<10} skipped: {e}")
+                continue
+            objectives.append(objective)
+            first = entry['time_to_first_incumbent']
+            print(f"{label:<20} {str(entry['warm_start'] or name):<10} {'-' if first is None else f'{first:.3f}':>14} "
+                  f"{entry['total_solving_time']:>9.3f} {objective:>12.2f}")
+        # Optimal solves must reach the same objective with or without a start
+        assert np.allclose(objectives, objectives[:1]), objectives
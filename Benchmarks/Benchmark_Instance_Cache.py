@@ -0,0 +1,77 @@
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from Auxiliary_Functions.Instance_Cache import INDEX_FILE, InstanceCache
+from Auxiliary_Functions.Instance_Catalog import InstanceCatalog
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+
+'''
+Instance cache shared by worker processes: several processes fill one cache
+folder at the same time (as the pools of Generate_Instances and
+Feasibility_Audit do), and the index must end up with the entries of all of
+them, with no entry file left unreferenced, and eviction must keep the whole
+folder (not one process's share) within max_bytes.
+'''
+
+WORKERS = 4
+
+
+def _fill(cache_dir, files, max_bytes):
+    cache = InstanceCache(cache_dir, max_bytes=max_bytes)
+    for file_path in files:
+        cache.load(file_path)
+    cache.flush()
+    return len(files)
+
+
+def fill_in_parallel(cache_dir, files, max_bytes):
+    chunks = [files[k::WORKERS] for k in range(WORKERS)]
+    with ProcessPoolExecutor(max_workers=WORKERS) as pool:
+        return sum(pool.map(_fill, [cache_dir] * WORKERS, chunks, [max_bytes] * WORKERS))
+
+
+def entry_files(cache_dir):
+    return {item.name: item.stat().st_size for item in os.scandir(cache_dir) if item.name.endswith(".bin")}
+
+
+if __name__ == "__main__":
+    files = sorted(record['path'] for record in InstanceCatalog().records.values())
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        fill_in_parallel(cache_dir, files, max_bytes=1 << 40)
+        seconds = time.perf_counter() - start
+        cache = InstanceCache(cache_dir)
+        assert len(cache._index) == len(files), (len(cache._index), len(files))
+        assert len(entry_files(cache_dir)) == len(files)
+        assert not os.path.exists(os.path.join(cache_dir, "index.lock"))
+        print(f"{WORKERS} processes cached {len(files)} instances in {seconds:.1f} s: all {len(cache._index)} in the index, "
+              f"no orphaned entry files")
+
+        # A fresh process reads every instance back from the shared cache
+        for file_path in files[::25]:
+            data, parsed = cache.load(file_path), read_instance_from_dat(file_path)
+            assert np.array_equal(data.qw, parsed.qw) and np.array_equal(data.od_dist_matrix, parsed.od_dist_matrix)
+        assert cache.misses == 0, cache.misses
+        total_bytes = cache.total_bytes()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Eviction counts the entries of every process
+        max_bytes = total_bytes // 4
+        fill_in_parallel(cache_dir, files, max_bytes=max_bytes)
+        sizes = entry_files(cache_dir)
+        cache = InstanceCache(cache_dir, max_bytes=max_bytes)
+        assert set(sizes) == {f"{key}-{entry['content_hash'][:16]}.bin" for key, entry in cache._index.items()}
+        assert cache.total_bytes() <= max_bytes, (cache.total_bytes(), max_bytes)
+        print(f"With max_bytes = {max_bytes / 1e3:.0f} kB: {len(sizes)} entries, {sum(sizes.values()) / 1e3:.0f} kB on disk, "
+              f"index and files agree")
+        assert os.path.exists(os.path.join(cache_dir, INDEX_FILE))
@@ -0,0 +1,87 @@
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from Auxiliary_Functions.Modifying_Instances import modify_flow, modify_hub_costs
+from Benchmark_Reading_Instances import write_synthetic_dat
+
+'''
+Benchmark of the vectorized modify_flow / modify_hub_costs kernels against the
+original per-origin Python loops.
+'''
+
+def legacy_modify_flow(data, percentage):
+    """Original per-origin modify_flow, kept as the benchmark reference."""
+    S = data.S
+    qw_matrix = np.array(data.qw).reshape(S, S)
+    np.fill_diagonal(qw_matrix, 0)
+    num_to_keep = int(S * (percentage / 100.0))
+    for i in range(S):
+        destinations = list(range(S))
+        destinations.remove(i)
+        keep = random.sample(destinations, num_to_keep)
+        for j in destinations:
+            if j not in keep:
+                qw_matrix[i, j] = 0
+    return data.replace(qw=qw_matrix.flatten().tolist())
+
+
+def legacy_modify_hub_costs(data, percentage):
+    """Original list-based modify_hub_costs, kept as the benchmark reference."""
+    reduction_factor = (percentage) / 100.0
+    return data.replace(Hubs_FC=[fc * reduction_factor for fc in data.Hubs_FC])
+
+
+def check_kernel(data, percentage):
+    """Check the structural guarantees of the vectorized modify_flow."""
+    S = data.S
+    num_to_keep = int(S * (percentage / 100.0))
+    modified = modify_flow(data, percentage, rng=np.random.default_rng(0))
+    qw = modified.qw.reshape(S, S)
+    original = data.qw.reshape(S, S)
+    assert not np.any(np.diag(qw)), "self-loops must be dropped"
+    assert np.all((qw == 0) | (qw == original)), "kept flows must be unchanged"
+    assert np.all(np.count_nonzero(qw, axis=1) <= num_to_keep), "too many destinations kept"
+    assert modified.od_dist is data.od_dist, "unchanged arrays must be shared"
+    # With every off-diagonal flow nonzero, exactly num_to_keep destinations per origin survive
+    full = data.replace(qw=np.where(np.eye(S, dtype=bool), 0.0, 1.0).ravel())
+    kept = np.count_nonzero(modify_flow(full, percentage, rng=np.random.default_rng(0)).qw.reshape(S, S), axis=1)
+    assert np.all(kept == min(num_to_keep, S - 1)), "wrong number of destinations kept"
+
+
+def benchmark(data, percentage=50, repeats=5):
+    """Time both implementations and return (legacy_s, vectorized_s)."""
+    check_kernel(data, percentage)
+    rng = np.random.default_rng(0)
+    legacy = min(timeit.repeat(lambda: legacy_modify_flow(data, percentage), number=1, repeat=repeats))
+    vectorized = min(timeit.repeat(lambda: modify_flow(data, percentage, rng=rng), number=1, repeat=repeats))
+    return legacy, vectorized
+
+
+if __name__ == "__main__":
+    instances = [("20R base", read_instance_from_dat(os.path.join(project_root, "DATA/Luisa Data/20R-alpha=021.dat")))]
+    with tempfile.TemporaryDirectory() as tmp:
+        for S in [100, 200, 500]:
+            synthetic = os.path.join(tmp, f"synthetic_S{S}.dat")
+            write_synthetic_dat(synthetic, S)
+            instances.append((f"synthetic S={S}", read_instance_from_dat(synthetic)))
+
+    print(f"{'modify_flow (50%)':<22} {'legacy (ms)':>12} {'vectorized (ms)':>16} {'speedup':>8}")
+    for label, data in instances:
+        legacy, vectorized = benchmark(data)
+        print(f"{label:<22} {legacy * 1e3:>12.3f} {vectorized * 1e3:>16.3f} {legacy / vectorized:>7.1f}x")
+
+    label, data = instances[-1]
+    legacy = min(timeit.repeat(lambda: legacy_modify_hub_costs(data, 20), number=1, repeat=5))
+    vectorized = min(timeit.repeat(lambda: modify_hub_costs(data, 20), number=1, repeat=5))
+    print(f"{'modify_hub_costs':<22} {legacy * 1e3:>12.3f} {vectorized * 1e3:>16.3f} {legacy / vectorized:>7.1f}x  ({label})")
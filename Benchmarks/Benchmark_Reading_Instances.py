@@ -0,0 +1,142 @@
+import os
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, "DATA"))
+
+from Auxiliary_Functions.Reading_Instances import InstanceData, read_instance_from_dat
+from Auxiliary_Functions.Modifying_Instances import save_instance_to_file
+from Generate_Synthetic_Instances import generate_synthetic_instance
+
+'''
+Parse-time benchmark: bulk NumPy parser vs. the original line-by-line parser.
+'''
+
+def legacy_read_instance_from_dat(file_path):
+    """Original readlines()-based parser, kept as the benchmark reference."""
+    with open(file_path, 'r') as file:
+        lines = file.readlines()
+
+    line_idx = 0
+    Vtyp = int(lines[line_idx].strip())
+    line_idx += 1
+
+    vcap, speed, OC, FC, Vind = [], [], [], [], []
+    for _ in range(Vtyp):
+        params = lines[line_idx].strip().split()
+        vcap.append(float(params[0]))
+        speed.append(float(params[1]))
+        OC.append(float(params[2]))
+        FC.append(float(params[3]))
+        Vind.append(int(params[4]))
+        line_idx += 1
+
+    S = int(lines[line_idx].strip())
+    line_idx += 1
+
+    Hubs_FC = []
+    for _ in range(S):
+        Hubs_FC.append(float(lines[line_idx].strip()))
+        line_idx += 1
+
+    Hub_x, Hub_y = [], []
+    for _ in range(S):
+        coords = lines[line_idx].strip().split()
+        Hub_x.append(float(coords[0]))
+        Hub_y.append(float(coords[1]))
+        line_idx += 1
+
+    ow, dw, qw, od_dist = [], [], [], []
+    while line_idx < len(lines):
+        row = lines[line_idx].strip().split()
+        ow.append(int(row[0]))
+        dw.append(int(row[1]))
+        qw.append(float(row[2]))
+        od_dist.append(float(row[3]))
+        line_idx += 1
+
+    return InstanceData(
+        Vtyp=Vtyp, vcap=vcap, speed=speed, OC=OC, FC=FC, Vind=Vind, S=S, W=S * S,
+        Hubs_FC=Hubs_FC, Hub_x=Hub_x, Hub_y=Hub_y, ow=ow, dw=dw, qw=qw, od_dist=od_dist,
+    )
+
+
+def write_synthetic_dat(file_path, S, seed=0):
+    """Write a synthetic instance with S nodes from the standard generator."""
+    save_instance_to_file(generate_synthetic_instance(S, seed, demand_density=0.9), file_path)
+
+
+def check_same_fields(a, b):
+    """Assert that two parsed instances hold the same values."""
+    for field in ['Vtyp', 'S', 'W']:
+        assert getattr(a, field) == getattr(b, field), field
+    for field in ['vcap', 'speed', 'OC', 'FC', 'Vind', 'Hubs_FC', 'Hub_x', 'Hub_y',
+                  'ow', 'dw', 'qw', 'od_dist', 'od_dist_matrix']:
+        assert np.array_equal(np.asarray(getattr(a, field)), np.asarray(getattr(b, field))), field
+
+
+def check_corrupt_sparse(folder):
+    """A sparse file with a malformed, missing or extra value raises ValueError instead of loading short."""
+    file_path = os.path.join(folder, "sparse.dat")
+    save_instance_to_file(generate_synthetic_instance(10, 0, demand_density=0.5), file_path, sparse=True)
+    with open(file_path) as file:
+        lines = file.read().splitlines()
+    header = next(k for k, line in enumerate(lines) if line.startswith("SPARSE"))
+    corruptions = [
+        lines[:header + 2] + ["1 x 3"] + lines[header + 3:],  # malformed commodity row
+        lines[:header + 2] + lines[header + 3:],  # commodity row missing
+        lines + ["0"],  # extra value
+    ]
+    for corrupted in corruptions:
+        with open(file_path, 'w') as file:
+            file.write("\n".join(corrupted) + "\n")
+        try:
+            read_instance_from_dat(file_path)
+        except ValueError:
+            continue
+        raise AssertionError("corrupt SPARSE block was loaded")
+
+
+def benchmark_file(file_path, repeats=20):
+    """Time both parsers on one file and return (legacy_s, bulk_s)."""
+    check_same_fields(legacy_read_instance_from_dat(file_path), read_instance_from_dat(file_path))
+    legacy = min(timeit.repeat(lambda: legacy_read_instance_from_dat(file_path), number=1, repeat=repeats))
+    bulk = min(timeit.repeat(lambda: read_instance_from_dat(file_path), number=1, repeat=repeats))
+    return legacy, bulk
+
+
+if __name__ == "__main__":
+    data_folders = [
+        os.path.join(project_root, "DATA/Luisa Data"),
+        os.path.join(project_root, "DATA/Modified/Flow Modifications"),
+        os.path.join(project_root, "DATA/Modified/Hub Cost Modifications"),
+        os.path.join(project_root, "DATA/Modified/BOTH"),
+    ]
+    files = sorted(
+        os.path.join(folder, f)
+        for folder in data_folders
+        for f in os.listdir(folder)
+        if f.startswith("20R") and f.endswith(".dat")
+    )
+
+    print(f"{'Instance':<55} {'legacy (ms)':>12} {'bulk (ms)':>10} {'speedup':>8}")
+    total_legacy, total_bulk = 0.0, 0.0
+    for file_path in files:
+        legacy, bulk = benchmark_file(file_path)
+        total_legacy += legacy
+        total_bulk += bulk
+    print(f"{f'20R instances ({len(files)} files)':<55} {total_legacy * 1e3:>12.2f} "
+          f"{total_bulk * 1e3:>10.2f} {total_legacy / total_bulk:>7.1f}x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check_corrupt_sparse(tmp)
+        synthetic = os.path.join(tmp, "synthetic_S200.dat")
+        write_synthetic_dat(synthetic, 200)
+        legacy, bulk = benchmark_file(synthetic, repeats=5)
+        print(f"{'synthetic S=200':<55} {legacy * 1e3:>12.2f} {bulk * 1e3:>10.2f} {legacy / bulk:>7.1f}x")
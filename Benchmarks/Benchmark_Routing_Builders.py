@@ -0,0 +1,165 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from gurobipy import GRB
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from Auxiliary_Functions.Virtual_Instances import VirtualInstances
+from MIP_Models.MIPs import ROUTING_MODEL_BUILDERS, solve_routing_decisions
+from Benchmark_Reading_Instances import write_synthetic_dat
+
+'''
+Benchmark of the quicksum and matrix-API builders of the routing model, with a
+check that both build the same model (same variables, objective and rows), and
+the model size against the original dense formulation.
+'''
+
+# (use_ml_guidance, use_location_first, use_direct, use_transhipment)
+CONFIGURATIONS = [
+    (False, False, False, False),
+    (True, False, True, True),
+    (True, False, True, False),
+    (True, False, False, True),
+    (True, True, True, True),
+]
+
+
+def alternating_predictions(data):
+    """ML input with every other commodity predicted as transhipment."""
+    return pd.DataFrame({
+        'Commodity ID': data.nonzero_flows,
+        'Predictions': [w % 2 for w in data.nonzero_flows],
+    })
+
+
+def dense_model_size(data):
+    """
+    (variables, constraints) of the original dense formulation: xijv over all N x N x V,
+    fijvw over all N x N x V x W and one row per self-loop xijv[i, i, v] == 0.
+    Pass the sparse model's constraint count to get the dense one.
+    """
+    N = int(data.S) + 1
+    Vtotal = int(data.Vind[0]) + int(data.Vind[1])
+    W = int(data.W)
+    return Vtotal + N * N * Vtotal + N * N * Vtotal * W + Vtotal * N + N, Vtotal * N
+
+
+def build(builder, data, ml_data, configuration, fixed_hubs):
+    """Build (up to model.update()) and return (model, seconds)."""
+    start = time.perf_counter()
+    model = ROUTING_MODEL_BUILDERS[builder](data, ml_data, fixed_hubs, *configuration)
+    model.update()
+    return model, time.perf_counter() - start
+
+
+def canonical_model(model):
+    """
+    Model in a builder-independent form: variables by name, objective by name and the
+    constraints as a multiset of (sense, rhs, {name: coefficient}) rows. Equality rows
+    are sign-normalised, since 'a - b == 0' and 'b - a == 0' are the same row, and rows
+    relaxed to an infinite RHS (inactive families of a RoutingSession) are left out.
+    """
+    variables = model.getVars()
+    names = model.getAttr('VarName', variables)
+    objective = {name: coef for name, coef in zip(names, model.getAttr('Obj', variables)) if coef != 0}
+    vtypes = dict(zip(names, model.getAttr('VType', variables)))
+
+    constraints = model.getConstrs()
+    A = model.getA().tocsr()
+    senses = model.getAttr('Sense', constraints)
+    rhs = model.getAttr('RHS', constraints)
+    rows = Counter()
+    for r, (sense, b) in enumerate(zip(senses, rhs)):
+        if b >= GRB.INFINITY:
+            continue
+        start, end = A.indptr[r], A.indptr[r + 1]
+        terms = tuple(sorted(
+            (names[col], coef) for col, coef in zip(A.indices[start:end], A.data[start:end]) if coef != 0
+        ))
+        if sense == '=' and (terms and terms[0][1] < 0 or not terms and b < 0):
+            terms = tuple((name, -coef) for name, coef in terms)
+            b = -b
+        rows[(sense, b, terms)] += 1
+    return vtypes, objective, model.ObjCon, rows
+
+
+def check_same_model(a, b):
+    """Assert that two routing models are the same model."""
+    vtypes_a, objective_a, constant_a, rows_a = canonical_model(a)
+    vtypes_b, objective_b, constant_b, rows_b = canonical_model(b)
+    assert vtypes_a == vtypes_b, "variables differ"
+    assert objective_a.keys() == objective_b.keys(), "objective support differs"
+    assert all(np.isclose(objective_a[name], objective_b[name]) for name in objective_a), "objective differs"
+    assert constant_a == constant_b, "objective constant differs"
+    assert rows_a == rows_b, f"constraints differ ({sum(rows_a.values())} vs {sum(rows_b.values())} rows)"
+
+
+def check_same_optimum(data, ml_data, configuration, fixed_hubs):
+    """Solve a (small) instance with both builders and compare the objective values."""
+    objectives = []
+    for builder in ROUTING_MODEL_BUILDERS:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = solve_routing_decisions(data, ml_data, fixed_hubs, *configuration, builder=builder)
+        objectives.append(result['objective_value'])
+    if objectives[0] is None or objectives[1] is None:
+        assert objectives[0] is objectives[1], objectives
+    else:
+        assert np.isclose(objectives[0], objectives[1]), objectives
+    return objectives[0]
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        # Equivalence on a small synthetic instance, every configuration
+        tiny_file = os.path.join(tmp, "tiny.dat")
+        write_synthetic_dat(tiny_file, 3, seed=1)
+        tiny = read_instance_from_dat(tiny_file)
+        tiny_ml = alternating_predictions(tiny)
+        for configuration in CONFIGURATIONS:
+            quicksum_model, _ = build("quicksum", tiny, tiny_ml, configuration, [1])
+            matrix_model, _ = build("matrix", tiny, tiny_ml, configuration, [1])
+            check_same_model(quicksum_model, matrix_model)
+            objective = check_same_optimum(tiny, tiny_ml, configuration, [1])
+            print(f"{str(configuration):<30} same model, objective {objective if objective is None else round(objective, 2)}")
+
+        instances = [
+            (name, read_instance_from_dat(os.path.join(project_root, "DATA/Luisa Data", f"{name}.dat")))
+            for name in ["8R-alpha=021", "10R-alpha=021", "20R-alpha=021"]
+        ]
+        synthetic_file = os.path.join(tmp, "synthetic_S15.dat")
+        write_synthetic_dat(synthetic_file, 15)
+        instances.append(("synthetic S=15", read_instance_from_dat(synthetic_file)))
+
+    configuration = CONFIGURATIONS[0]
+    print(f"\n{'build (no ML guidance)':<22} {'vars':>10} {'constrs':>10} {'quicksum (s)':>13} {'matrix (s)':>11} {'speedup':>8}")
+    for label, data in instances:
+        ml_data = alternating_predictions(data)
+        quicksum_model, quicksum_time = build("quicksum", data, ml_data, configuration, [])
+        matrix_model, matrix_time = build("matrix", data, ml_data, configuration, [])
+        if data.S <= 10:
+            check_same_model(quicksum_model, matrix_model)
+        print(f"{label:<22} {matrix_model.NumVars:>10} {matrix_model.NumConstrs:>10} "
+              f"{quicksum_time:>13.3f} {matrix_time:>11.3f} {quicksum_time / matrix_time:>7.1f}x")
+        del quicksum_model, matrix_model
+
+    print(f"\n{'model size (no ML guidance)':<36} {'dense vars':>11} {'sparse vars':>12} {'dense constrs':>14} {'sparse constrs':>15}")
+    instances = VirtualInstances()
+    for instance_id in ["20R-alpha=021", "20R-alpha=021_Flow_50perc", "20R-alpha=021_Flow_10perc"]:
+        data = instances.load(instance_id)
+        model, _ = build("matrix", data, alternating_predictions(data), configuration, [])
+        dense_vars, self_loop_rows = dense_model_size(data)
+        print(f"{instance_id:<36} {dense_vars:>11} {model.NumVars:>12} "
+              f"{model.NumConstrs + self_loop_rows:>14} {model.NumConstrs:>15}")
+        del model
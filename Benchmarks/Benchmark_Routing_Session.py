@@ -0,0 +1,90 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from Auxiliary_Functions.Virtual_Instances import VirtualInstances
+from MIP_Models.MIPs import ROUTING_MODEL_BUILDERS, solve_routing_decisions
+from MIP_Models.Routing_Session import RoutingSession
+from Benchmark_Reading_Instances import write_synthetic_dat
+from Benchmark_Routing_Builders import CONFIGURATIONS, alternating_predictions, check_same_model
+
+'''
+Benchmark of the build-once routing session against rebuilding the model for
+every configuration of main.py, with a check that both solve the same models.
+'''
+
+# Configurations solved per instance in main.py
+MAIN_CONFIGURATIONS = CONFIGURATIONS[:4]
+
+
+def check_session(data, ml_data, fixed_hubs, builder="quicksum"):
+    """
+    Solve every configuration with one session and with a fresh model, and assert that the
+    models (without location-first, where hubs are fixed by bounds instead of rows) and the
+    objective values are the same.
+    """
+    objectives = []
+    with RoutingSession(data, ml_data, builder=builder) as session:
+        for configuration in CONFIGURATIONS:
+            use_ml_guidance, use_location_first, use_direct, use_transhipment = configuration
+            with contextlib.redirect_stdout(io.StringIO()):
+                session_result = session.solve(fixed_hubs, *configuration)
+                fresh_result = solve_routing_decisions(data, ml_data, fixed_hubs, *configuration, builder=builder)
+            if not use_location_first:
+                fresh_model = ROUTING_MODEL_BUILDERS[builder](data, ml_data, fixed_hubs, *configuration)
+                fresh_model.update()
+                check_same_model(session.model, fresh_model)
+                fresh_model.dispose()
+            session_objective, fresh_objective = session_result['objective_value'], fresh_result['objective_value']
+            if session_objective is None or fresh_objective is None:
+                assert session_objective is fresh_objective, (configuration, session_objective, fresh_objective)
+            else:
+                assert np.isclose(session_objective, fresh_objective), (configuration, session_objective, fresh_objective)
+            objectives.append(session_objective)
+    return objectives
+
+
+def build_times(data, ml_data, builder="quicksum"):
+    """Return (rebuild_s, session_s): model build time over MAIN_CONFIGURATIONS, without solving."""
+    fixed_hubs = list(range(1, int(data.S) + 1))
+    start = time.perf_counter()
+    for configuration in MAIN_CONFIGURATIONS:
+        model = ROUTING_MODEL_BUILDERS[builder](data, ml_data, fixed_hubs, *configuration)
+        model.update()
+        model.dispose()
+    rebuild = time.perf_counter() - start
+
+    session = RoutingSession(data, ml_data, builder=builder)
+    for configuration in MAIN_CONFIGURATIONS:
+        session.configure(fixed_hubs, *configuration)
+    session.close()
+    return rebuild, session.build_time
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        tiny_file = os.path.join(tmp, "tiny.dat")
+        write_synthetic_dat(tiny_file, 3, seed=1)
+        tiny = read_instance_from_dat(tiny_file)
+    for builder in ROUTING_MODEL_BUILDERS:
+        objectives = check_session(tiny, alternating_predictions(tiny), [1], builder=builder)
+        print(f"{builder:<10} session and fresh models agree, objectives {objectives}")
+
+    instances = VirtualInstances()
+    print(f"\n{'build over 4 configurations':<30} {'builder':<10} {'rebuild (s)':>12} {'session (s)':>12} {'speedup':>8}")
+    for instance_id in ["8R-alpha=021", "10R-alpha=021", "20R-alpha=021_Flow_50perc"]:
+        data = instances.load(instance_id)
+        for builder in ROUTING_MODEL_BUILDERS:
+            rebuild, session = build_times(data, alternating_predictions(data), builder=builder)
+            print(f"{instance_id:<30} {builder:<10} {rebuild:>12.3f} {session:>12.3f} {rebuild / session:>7.1f}x")
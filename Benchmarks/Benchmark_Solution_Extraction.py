@@ -0,0 +1,139 @@
+import contextlib
+import io
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Feasibility_checks import check_feasibility
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from Auxiliary_Functions.Sparse_Solution import SOLUTION_VARIABLES, SparseVariable, solution_shapes
+from Auxiliary_Functions.Virtual_Instances import VirtualInstances
+from Heuristics.Greedy_Constructive import greedy_routing_plan
+from MIP_Models.MIPs import build_routing_model, extract_solution, optimize_routing_model
+from MIP_Models.Routing_Index import arc_keys, flow_keys
+from Benchmark_Reading_Instances import write_synthetic_dat
+from Benchmark_Routing_Builders import alternating_predictions
+
+'''
+Solution extraction: the dense {key: 0/1} dicts built per variable against the
+bulk read into sparse COO indices (extract_solution). Solved synthetic models
+(size-limited Gurobi license) compare both extractions of the same model;
+on 20R, beyond the license, both conversions run on the values of a greedy
+plan laid out as the model variables. A model without commodities (empty fijvw
+family) is extracted as well.
+'''
+
+REPEATS = 20
+
+
+def dense_extraction(model):
+    """Thresholded solution as dense dicts, as the result dict held it before extract_solution."""
+    def to_binary(value):
+        return 1 if value > 0.05 else 0
+    return {
+        name: {key: to_binary(value) for key, value in model.getAttr('X', getattr(model, f"_{name}")).items()}
+        for name in SOLUTION_VARIABLES
+    }
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        value = function(*args)
+    return value, (time.perf_counter() - start) / REPEATS
+
+
+def check_same(instance_data, dense, sparse):
+    """Every key of the dense dicts reads the same from the sparse solution, with the same feasibility verdict."""
+    for name in SOLUTION_VARIABLES:
+        assert all(sparse[name][key] == value for key, value in dense[name].items()), name
+        assert all(dense[name].get(key, 0) == 1 for key in sparse[name].nonzero()), name
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert check_feasibility(instance_data, dense) == check_feasibility(instance_data, sparse)
+
+
+def model_keys(instance_data):
+    """Keys of the routing model variables per family, in model order."""
+    N, W = int(instance_data.S) + 1, int(instance_data.W)
+    Vtotal = int(sum(instance_data.Vind))
+    return N, Vtotal, W, {
+        'av': [(v,) for v in range(Vtotal)],
+        'xijv': arc_keys(N, Vtotal),
+        'fijvw': flow_keys(N, Vtotal, instance_data.nonzero_flows),
+        'Zvi': [(v, i) for v in range(Vtotal) for i in range(N)],
+        'yi': [(i,) for i in range(N)],
+    }
+
+
+def conversions(instance_data, solution):
+    """
+    Dense and sparse conversion of a solution given as the values of the model variables (one array per
+    family, as getAttr returns them); returns (dense, dense seconds, sparse, sparse seconds).
+    """
+    N, Vtotal, W, keys = model_keys(instance_data)
+    values = {name: np.array([solution[name].get(key if len(key) > 1 else key[0], 0) for key in family], dtype=float)
+              for name, family in keys.items()}
+    key_arrays = {name: np.array(family) for name, family in keys.items()}
+    shapes = solution_shapes(N, Vtotal, W)
+
+    def dense():
+        return {name: {key if len(key) > 1 else key[0]: 1 if value > 0.05 else 0
+                       for key, value in zip(keys[name], values[name].tolist())} for name in keys}
+
+    def sparse():
+        return {name: SparseVariable(key_arrays[name][values[name] > 0.05], shapes[name]) for name in keys}
+
+    dense_solution, dense_time = timed(dense)
+    sparse_solution, sparse_time = timed(sparse)
+    return dense_solution, dense_time, sparse_solution, sparse_time
+
+
+def check_solved_model(label, data):
+    """Solve the routing model of an instance and compare both extractions of it."""
+    S = int(data.S)
+    model = build_routing_model(data, alternating_predictions(data), list(range(1, S + 1)), False, False, False, False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimize_routing_model(model, False, False)
+    dense, dense_time = timed(dense_extraction, model)
+    sparse, sparse_time = timed(extract_solution, model)
+    check_same(data, dense, sparse)
+    report(label, dense, dense_time, sparse, sparse_time)
+    model.dispose()
+
+
+def report(label, dense, dense_time, sparse, sparse_time):
+    dense_size, sparse_size = len(pickle.dumps(dense)), len(pickle.dumps(sparse))
+    print(f"{label:<34} {dense_time * 1e3:>10.3f} {sparse_time * 1e3:>10.3f} {dense_size / 1e3:>12.1f} "
+          f"{sparse_size / 1e3:>12.1f} {dense_size / sparse_size:>7.0f}x")
+    # The sparse solution survives pickling
+    restored = pickle.loads(pickle.dumps(sparse))
+    assert all(restored[name].nonzero() == sparse[name].nonzero() for name in SOLUTION_VARIABLES)
+
+
+if __name__ == "__main__":
+    print(f"{'solution':<34} {'dense (ms)':>10} {'sparse (ms)':>10} {'dense (kB)':>12} {'sparse (kB)':>12} {'size':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for S in (3, 4):
+            file_path = os.path.join(tmp, f"synthetic_{S}.dat")
+            write_synthetic_dat(file_path, S, seed=0)
+            data = read_instance_from_dat(file_path)
+            check_solved_model(f"S={S} solved model", data)
+        # No nonzero commodity, so no fijvw variables (10% flow keeps none on 8R / 9R)
+        check_solved_model("S=4 no commodities", data.replace(qw=np.zeros_like(data.qw)))
+
+    instances = VirtualInstances()
+    for instance_id in ["20R-alpha=021", "20R-alpha=021_Flow_50perc"]:
+        data = instances.load(instance_id)
+        plan = greedy_routing_plan(data).to_solution()
+        dense, dense_time, sparse, sparse_time = conversions(data, plan)
+        check_same(data, dense, sparse)
+        report(f"{instance_id} greedy", dense, dense_time, sparse, sparse_time)
@@ -0,0 +1,103 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import networkx as nx
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from MIP_Models.Routing_Session import RoutingSession
+from MIP_Models.Subtours import separate_subtours
+from Benchmark_Reading_Instances import write_synthetic_dat
+from Benchmark_Routing_Builders import alternating_predictions
+from Benchmark_Routing_Session import MAIN_CONFIGURATIONS
+
+'''
+Subtour separation of the lazy-constraint callback: the array-based
+separate_subtours against the networkx separation it replaced (same reverse
+arcs and subtours on random integer solutions, time per call), and the share
+of the solving time spent in the callback.
+'''
+
+def networkx_separation(x, active, visited, threshold=0.05):
+    """Reverse arcs and subtours as the callback found them with Python loops and networkx."""
+    N, _, V = x.shape
+    reverse_arcs, subtours = [], []
+    for v in range(V):
+        pairs, components = [], []
+        if active[v] > threshold:
+            for i in range(1, N):
+                for j in range(i + 1, N):
+                    if x[i, j, v] > threshold and x[j, i, v] > threshold \
+                            and visited[v, i] > threshold and visited[v, j] > threshold:
+                        pairs.append((i, j))
+            nodes = [i for i in range(N) if visited[v, i] > threshold]
+            G = nx.Graph()
+            for i in nodes:
+                for j in nodes:
+                    if i != j and x[i, j, v] > threshold:
+                        G.add_edge(i, j)
+            components = [sorted(c) for c in nx.connected_components(G) if 0 not in c]
+        reverse_arcs.append(pairs)
+        subtours.append(components)
+    return reverse_arcs, subtours
+
+
+def random_solution(N, V, rng):
+    """Integer solution where every active vehicle has a depot tour, some subtours and some 2-cycles."""
+    x = np.zeros((N, N, V))
+    active = (rng.random(V) < 0.8).astype(float)
+    for v in np.flatnonzero(active):
+        nodes = rng.permutation(np.arange(1, N))[:rng.integers(2, N)]
+        # Split the visited customers into a depot tour and cycles
+        cuts = np.sort(rng.choice(np.arange(1, len(nodes)), rng.integers(0, min(4, len(nodes) - 1) + 1), replace=False))
+        for k, cycle in enumerate(np.split(nodes, cuts)):
+            cycle = ([0] if k == 0 else []) + cycle.tolist()
+            if len(cycle) > 1:
+                x[cycle, cycle[1:] + cycle[:1], v] = 1.0
+    visited = (x.sum(axis=0) + x.sum(axis=1)).T > 0
+    return x, active, visited.astype(float)
+
+
+def time_per_call(separation, solutions):
+    start = time.perf_counter()
+    for solution in solutions:
+        separation(*solution)
+    return (time.perf_counter() - start) / len(solutions)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"{'N':>4} {'V':>4} {'networkx (ms)':>14} {'arrays (ms)':>12} {'speedup':>8}")
+    for N, V in [(9, 6), (21, 10), (51, 20), (101, 40)]:
+        solutions = [random_solution(N, V, rng) for _ in range(50)]
+        for solution in solutions:
+            expected_arcs, expected_subtours = networkx_separation(*solution)
+            reverse_arcs, subtours = separate_subtours(*solution)
+            assert [list(map(tuple, pairs.tolist())) for pairs in reverse_arcs] == expected_arcs
+            assert [sorted(map(sorted, s)) for s in subtours] == [sorted(s) for s in expected_subtours]
+        reference, vectorized = time_per_call(networkx_separation, solutions), time_per_call(separate_subtours, solutions)
+        print(f"{N:>4} {V:>4} {reference * 1e3:>14.3f} {vectorized * 1e3:>12.3f} {reference / vectorized:>7.1f}x")
+
+    # Callback share of the solving time (instances solvable with a size-limited Gurobi license)
+    print(f"\n{'instance':<12} {'configuration':<30} {'callback (s)':>12} {'solving (s)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for seed in range(3):
+            file_path = os.path.join(tmp, f"tiny_{seed}.dat")
+            write_synthetic_dat(file_path, 3, seed=seed)
+            data = read_instance_from_dat(file_path)
+            with RoutingSession(data, alternating_predictions(data)) as session:
+                for configuration in MAIN_CONFIGURATIONS:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        session.solve(list(range(1, int(data.S) + 1)), *configuration)
+                    entry = session.solve_log[-1]
+                    print(f"{f'S=3 seed {seed}':<12} {str(configuration):<30} {entry['callback_time']:>12.4f} "
+                          f"{entry['total_solving_time']:>12.4f}")
@@ -0,0 +1,64 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from MIP_Models.MIPs import solve_routing_decisions
+from MIP_Models.Telemetry import load_timeline, save_timeline, timeline_metrics
+from Benchmark_Reading_Instances import write_synthetic_dat
+from Benchmark_Routing_Builders import alternating_predictions
+from Benchmark_Routing_Session import MAIN_CONFIGURATIONS
+
+'''
+Solver telemetry: incumbent / bound timelines of the main.py configurations on
+instances solvable with a size-limited Gurobi license, their metrics, and
+consistency with the result dict (first feasible time, final objective and
+bound) and with a save / load round trip.
+'''
+
+def check_timeline(result):
+    """Assert that a timeline agrees with the result it was recorded for."""
+    timeline = result['timeline']
+    runtime, incumbent = timeline['runtime'], timeline['incumbent']
+    assert np.all(np.diff(runtime) >= 0)
+    found = np.isfinite(incumbent)
+    assert np.all(np.diff(incumbent[found]) <= 1e-9), incumbent  # Incumbents only improve
+    assert np.isclose(incumbent[-1], result['objective_value'])
+    assert np.isclose(timeline['bound'][-1], result['objective_bound'])
+    # The reported time to first incumbent is the first finite incumbent of the timeline
+    assert result['time_to_first_feasible'] is not None
+    assert result['time_to_first_feasible'] == timeline_metrics(timeline)['time_to_first_incumbent'] == runtime[found][0]
+
+
+if __name__ == "__main__":
+    print(f"{'instance':<12} {'configuration':<30} {'rows':>5} {'first inc (s)':>13} {'1% gap (s)':>10} "
+          f"{'primal int':>10} {'solving (s)':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for S, seed in [(3, 0), (3, 1), (4, 0)]:
+            file_path = os.path.join(tmp, f"synthetic_{S}_{seed}.dat")
+            write_synthetic_dat(file_path, S, seed=seed)
+            data = read_instance_from_dat(file_path)
+            instance_id = f"synthetic_{S}_{seed}"
+            for configuration in MAIN_CONFIGURATIONS:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = solve_routing_decisions(
+                        data, alternating_predictions(data), list(range(1, S + 1)), *configuration
+                    )
+                check_timeline(result)
+
+                stored = load_timeline(save_timeline(os.path.join(tmp, "Telemetry"), instance_id, configuration, result['timeline']))
+                assert all(np.array_equal(stored[column], values) for column, values in result['timeline'].items())
+
+                time_to_gap = result['time_to_1perc_gap']
+                print(f"{f'S={S} seed {seed}':<12} {str(configuration):<30} {len(stored['runtime']):>5} "
+                      f"{result['time_to_first_feasible']:>13.4f} {'-' if time_to_gap is None else f'{time_to_gap:.4f}':>10} "
+                      f"{result['primal_integral']:>10.4f} {result['total_solving_time']:>11.4f}")
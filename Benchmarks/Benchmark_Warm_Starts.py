@@ -0,0 +1,67 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+sys.path.append(current_dir)
+
+from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from MIP_Models.Routing_Session import RoutingSession
+from Benchmark_Reading_Instances import write_synthetic_dat
+from Benchmark_Routing_Builders import alternating_predictions
+from Benchmark_Routing_Session import MAIN_CONFIGURATIONS
+
+'''
+Cross-configuration warm starts: the main.py configurations of one instance
+solved in sequence, each from scratch and each from the previous configuration's
+solution. Logs time to first incumbent and final gap of every solve.
+'''
+
+def run_configurations(data, ml_data, warm_start, builder="quicksum"):
+    """Solve MAIN_CONFIGURATIONS in order on one session; returns (solve log, objective values)."""
+    fixed_hubs = list(range(1, int(data.S) + 1))
+    incumbent = None
+    objectives = []
+    with RoutingSession(data, ml_data, builder=builder) as session:
+        for configuration in MAIN_CONFIGURATIONS:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = session.solve(fixed_hubs, *configuration, start=incumbent if warm_start else None)
+            if result['solution'] is not None:
+                incumbent = result['solution']
+            objectives.append(result['objective_value'])
+        return session.solve_log, objectives
+
+
+def print_log(label, log):
+    for entry in log:
+        first = entry['time_to_first_incumbent']
+        print(f"{label:<6} {str(entry['configuration']):<30} {str(entry['warm_start']):<10} "
+              f"{'-' if first is None else f'{first:.3f}':>14} {entry['optimality_gap']:>8.4f} "
+              f"{entry['total_solving_time']:>9.3f}")
+
+
+if __name__ == "__main__":
+    # Solvable with a size-limited Gurobi license; point this at larger instances with a full license
+    with tempfile.TemporaryDirectory() as tmp:
+        instances = []
+        for seed in range(3):
+            file_path = os.path.join(tmp, f"tiny_{seed}.dat")
+            write_synthetic_dat(file_path, 3, seed=seed)
+            instances.append((f"S=3 seed {seed}", read_instance_from_dat(file_path)))
+
+    print(f"{'start':<6} {'configuration':<30} {'warm start':<10} {'first inc. (s)':>14} {'gap':>8} {'time (s)':>9}")
+    for label, data in instances:
+        ml_data = alternating_predictions(data)
+        cold_log, cold_objectives = run_configurations(data, ml_data, warm_start=False)
+        warm_log, warm_objectives = run_configurations(data, ml_data, warm_start=True)
+        # Optimal solves must reach the same objective with or without a start
+        assert np.allclose(cold_objectives, warm_objectives), (cold_objectives, warm_objectives)
+        print(label)
+        print_log("cold", cold_log)
+        print_log("warm", warm_log)
@@ -1,28 +1,64 @@
+import json
 import os
-import random
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
-from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
-from Auxiliary_Functions.Modifying_Instances import (
-    modify_flow,
-    modify_hub_costs,
-    save_instance_to_file,
-)
+from Auxiliary_Functions.Instance_Cache import file_content_hash, load_instance
+from Auxiliary_Functions.Modifying_Instances import save_instance_to_file
+from Auxiliary_Functions.Virtual_Instances import DEFAULT_MASTER_SEED, build_instance, instance_name
 
-def generate_instances(input_folder, output_folder, modify_flow_only=False, modify_hub_costs_only=False, modify_both=True):
+PERCENTAGES_FLOW = [10, 20, 30, 40, 50, 60, 70, 80, 90]
+PERCENTAGES_HUB = [1, 5, 10, 20, 30, 40, 50]
+MANIFEST_FILE = "manifest.json"
+
+# Base instances shared with the worker processes (set once per worker)
+_base_instances = {}
+
+
+def regenerate_instance(base_file, flow_perc, hub_perc, master_seed):
+    """Rebuild a single modified instance in memory, bit-identical to the generated file."""
+    base_name = os.path.splitext(os.path.basename(base_file))[0]
+    return build_instance(load_instance(base_file), base_name, flow_perc, hub_perc, master_seed)
+
+
+def _init_worker(base_instances):
+    global _base_instances
+    _base_instances = base_instances
+
+
+def _run_job(base_name, flow_perc, hub_perc, output_file, master_seed):
+    data = build_instance(_base_instances[base_name], base_name, flow_perc, hub_perc, master_seed)
+    save_instance_to_file(data, output_file)
+    return {
+        "instance_id": instance_name(base_name, flow_perc, hub_perc, master_seed),
+        "base": base_name,
+        "flow_perc": flow_perc,
+        "hub_perc": hub_perc,
+        "file": output_file,
+        "sha256": file_content_hash(output_file),
+    }
+
+
+def generate_instances(input_folder, output_folder, modify_flow_only=False, modify_hub_costs_only=False, modify_both=True,
+                       master_seed=DEFAULT_MASTER_SEED, max_workers=None):
     """
     Generate modified instances from .dat files in the input folder and save them to appropriate subfolders.
-    
+
+    Every (base file, flow %, hub %) combination is an independent job run on a
+    process pool, and a manifest of the produced files is written to the output folder.
+
     Parameters:
     - input_folder: Path to the folder containing the original .dat files.
     - output_folder: Path to the root folder for saving modified files.
     - modify_flow_only: If True, only modify flows.
     - modify_hub_costs_only: If True, only modify hub costs.
     - modify_both: If True, first modify flows, then apply hub cost changes to the flow-modified files.
+    - master_seed: Seed from which the random stream of every flow modification is derived.
+    - max_workers: Number of worker processes (None uses all cores).
     """
     # Ensure output subfolders exist
     flow_folder = os.path.join(output_folder, "Flow Modifications")
@@ -33,57 +69,66 @@ def generate_instances(input_folder, output_folder, modify_flow_only=False, modi
     os.makedirs(both_folder, exist_ok=True)
 
     # List all .dat files in the input folder
-    input_files = [
+    input_files = sorted(
         os.path.join(input_folder, f)
         for f in os.listdir(input_folder)
         if f.endswith(".dat")
-    ]
+    )
 
     if not input_files:
         print("No .dat files found in the input folder.")
         return
 
     print(f"Found {len(input_files)} files to process.")
-    
-    percentages_flow = [10, 20, 30, 40, 50, 60, 70, 80, 90]
-    percentages_hub = [1, 5, 10, 20, 30, 40, 50]
-
-    for file_path in input_files:
-        base_name = os.path.splitext(os.path.basename(file_path))[0]
-        print(f"Processing {base_name}.dat")
 
-        # Read instance data
-        data = read_instance_from_dat(file_path)
+    # Read every base instance once; the workers receive them at start-up
+    base_instances = {
+        os.path.splitext(os.path.basename(file_path))[0]: load_instance(file_path)
+        for file_path in input_files
+    }
 
+    # One job per (base file, flow %, hub %)
+    jobs = []
+    for base_name in base_instances:
         if not modify_hub_costs_only:
-            # Modify flows and save in "Flow Modifications"
-            for perc in percentages_flow:
-                modified_data = modify_flow(data, perc)
-                output_file = os.path.join(
-                    flow_folder, f"{base_name}_Flow_{perc}perc.dat"
-                )
-                save_instance_to_file(modified_data, output_file)
-                print(f"Saved {perc}% flow modification to {output_file}")
-
-                # If modifying both, apply hub cost modifications to flow-modified data
+            for perc in PERCENTAGES_FLOW:
+                jobs.append((base_name, perc, None, flow_folder))
                 if modify_both:
-                    for hub_perc in percentages_hub:
-                        both_modified_data = modify_hub_costs(modified_data, hub_perc)
-                        both_output_file = os.path.join(
-                            both_folder, f"{base_name}_Flow_{perc}perc_HubCosts_{hub_perc}perc.dat"
-                        )
-                        save_instance_to_file(both_modified_data, both_output_file)
-                        print(f"Saved BOTH (Flow {perc}%, HubCosts {hub_perc}%) to {both_output_file}")
+                    for hub_perc in PERCENTAGES_HUB:
+                        jobs.append((base_name, perc, hub_perc, both_folder))
 
         if not modify_flow_only and not modify_both:
-            # Modify hub costs and save in "Hub Cost Modifications"
-            for perc in percentages_hub:
-                modified_data = modify_hub_costs(data, perc)
-                output_file = os.path.join(
-                    hub_cost_folder, f"{base_name}_HubCosts_{perc}perc.dat"
-                )
-                save_instance_to_file(modified_data, output_file)
-                print(f"Saved {perc}% hub cost reduction to {output_file}")
+            for perc in PERCENTAGES_HUB:
+                jobs.append((base_name, None, perc, hub_cost_folder))
+
+    produced = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(base_instances,)) as pool:
+        futures = [
+            pool.submit(
+                _run_job, base_name, flow_perc, hub_perc,
+                os.path.join(folder, f"{instance_name(base_name, flow_perc, hub_perc, master_seed)}.dat"), master_seed,
+            )
+            for base_name, flow_perc, hub_perc, folder in jobs
+        ]
+        for future in as_completed(futures):
+            record = future.result()
+            produced.append(record)
+            print(f"Saved {record['instance_id']} to {record['file']}")
+
+    # Write the manifest of what was produced
+    produced.sort(key=lambda record: record["instance_id"])
+    manifest = {
+        "master_seed": master_seed,
+        "base_files": {
+            base_name: file_content_hash(file_path)
+            for base_name, file_path in zip(base_instances, input_files)
+        },
+        "instances": produced,
+    }
+    manifest_file = os.path.join(output_folder, MANIFEST_FILE)
+    with open(manifest_file, 'w') as file:
+        json.dump(manifest, file, indent=1)
+    print(f"Manifest of {len(produced)} instances saved to {manifest_file}")
 
 
 if __name__ == "__main__":
@@ -91,7 +136,7 @@ if __name__ == "__main__":
     input_folder = "DATA/Luisa Data"  # Folder containing .dat files
     output_folder = "DATA/Modified"  # Root folder for modified files
 
-    random = 54321
+    master_seed = DEFAULT_MASTER_SEED
 
     # Choose what to modify
     modify_flow_only = False
@@ -99,5 +144,5 @@ if __name__ == "__main__":
 
     # Generate modified instances
     generate_instances(
-        input_folder, output_folder, modify_flow_only, modify_hub_costs_only
+        input_folder, output_folder, modify_flow_only, modify_hub_costs_only, master_seed=master_seed
     )
@@ -0,0 +1,123 @@
+import os
+import sys
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from Auxiliary_Functions.Reading_Instances import InstanceData
+from Auxiliary_Functions.Modifying_Instances import save_instance_to_file
+
+'''
+Synthetic instance generator for scaling studies.
+
+Instances follow the layout of Luisa's data (two vehicle types, one hub per
+node, Euclidean O/D distances rounded to 4 decimals) but with configurable
+size, fleet, spatial layout and demand density.
+'''
+
+LAYOUTS = ("uniform", "clustered", "corridor")
+SIZE_LADDER = [10, 20, 50, 100, 200]
+
+
+def node_coordinates(S, layout, rng, area=16.0, n_clusters=4, cluster_spread=0.08, corridor_width=0.1):
+    """
+    Draw S node coordinates in an area x area square.
+
+    Parameters:
+    - layout: 'uniform' (uniform in the square), 'clustered' (Gaussian clusters around
+      n_clusters random centres) or 'corridor' (along the diagonal, within corridor_width).
+    """
+    if layout == "uniform":
+        coords = rng.uniform(0, area, (S, 2))
+    elif layout == "clustered":
+        centres = rng.uniform(0.15 * area, 0.85 * area, (n_clusters, 2))
+        coords = centres[rng.integers(0, n_clusters, S)] + rng.normal(0, cluster_spread * area, (S, 2))
+    elif layout == "corridor":
+        along = rng.uniform(0, area, S)
+        across = rng.normal(0, corridor_width * area, S) / np.sqrt(2)
+        coords = np.column_stack([along + across, along - across])
+    else:
+        raise ValueError(f"Unknown layout '{layout}', expected one of {LAYOUTS}.")
+    return np.round(np.clip(coords, 0, area), 5)
+
+
+def generate_synthetic_instance(S, seed, layout="uniform", demand_density=0.5, Vind=None,
+                                vcap=(90, 750), speed=(1, 1), OC=(300.0, 450.0), FC=(20000, 35000),
+                                hub_cost_range=(1000, 1500), demand_range=(1, 10), area=16.0):
+    """
+    Generate a random instance.
+
+    Parameters:
+    - S: Number of nodes.
+    - seed: Seed of the instance (same arguments and seed give the same instance).
+    - layout: Spatial layout of the nodes, one of LAYOUTS.
+    - demand_density: Probability that an origin-destination pair (i != j) has demand.
+    - Vind: Number of vehicles per type; defaults to (max(4, S // 2), max(2, S // 4)).
+    - vcap, speed, OC, FC: Capacity, speed, operating and fixed cost per vehicle type.
+    - hub_cost_range: Range of the hub fixed costs.
+    - demand_range: Range of the (integer) demand quantities.
+    - area: Side of the square the nodes are placed in.
+
+    Returns:
+    - InstanceData with dense demand.
+    """
+    rng = np.random.default_rng(seed)
+    if Vind is None:
+        Vind = (max(4, S // 2), max(2, S // 4))
+
+    coords = node_coordinates(S, layout, rng, area=area)
+    # Pairwise Euclidean distances, vectorized
+    diff = coords[:, None, :] - coords[None, :, :]
+    od_dist = np.round(np.sqrt((diff ** 2).sum(axis=-1)), 4)
+
+    has_demand = rng.random((S, S)) < demand_density
+    np.fill_diagonal(has_demand, False)
+    qw = np.where(has_demand, rng.integers(demand_range[0], demand_range[1] + 1, (S, S)), 0).astype(float)
+
+    nodes = np.arange(1, S + 1)
+    return InstanceData(
+        Vtyp=len(Vind),
+        vcap=vcap, speed=speed, OC=OC, FC=FC, Vind=Vind,
+        S=S, W=S * S,
+        Hubs_FC=np.round(rng.uniform(*hub_cost_range, S), 2),
+        Hub_x=coords[:, 0], Hub_y=coords[:, 1],
+        ow=np.repeat(nodes, S), dw=np.tile(nodes, S),
+        qw=qw.ravel(), od_dist=od_dist.ravel(),
+    )
+
+
+def synthetic_instance_name(S, layout, demand_density, seed):
+    """File stem of a synthetic instance, e.g. SYN-S50-clustered-d30-seed0."""
+    return f"SYN-S{S}-{layout}-d{round(demand_density * 100)}-seed{seed}"
+
+
+def generate_size_ladder(output_folder, sizes=SIZE_LADDER, layouts=LAYOUTS, demand_densities=(0.5,), seeds=(0,),
+                         sparse=False):
+    """
+    Write the standard size ladder of synthetic instances and return the written paths.
+
+    Parameters:
+    - output_folder: Folder the .dat files are written to.
+    - sizes, layouts, demand_densities, seeds: Grid of instances to generate.
+    - sparse: If True, write the sparse .dat variant.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    paths = []
+    for S in sizes:
+        for layout in layouts:
+            for density in demand_densities:
+                for seed in seeds:
+                    data = generate_synthetic_instance(S, seed, layout=layout, demand_density=density)
+                    path = os.path.join(output_folder, f"{synthetic_instance_name(S, layout, density, seed)}.dat")
+                    save_instance_to_file(data, path, sparse=sparse)
+                    print(f"Saved {path}")
+                    paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    output_folder = "DATA/Synthetic"
+    generate_size_ladder(output_folder)
@@ -0,0 +1,565 @@
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from Heuristics.Greedy_Constructive import RoutingPlan, best_leg_insertion, greedy_routing_plan
+from MIP_Models.Routing_Index import ml_commodities
+
+'''
+Adaptive large neighborhood search (ALNS) for the routing model.
+
+For instances beyond what the routing MIP solves within its time limit. The
+search works on a successor array per vehicle plus the vehicle path (legs) of
+every commodity, and keeps the cost of solve_routing_decisions (FC per used
+vehicle plus OC * dist / speed per customer arc) and the arc loads up to date
+move by move. Every iteration removes commodities with a destroy operator,
+reinserts them with a repair operator, improves the changed routes with 2-opt
+and accepts the result by simulated annealing; operator weights adapt to their
+success. ML predictions bias which commodities are removed and how they are
+reinserted (direct or through a hub) instead of being enforced.
+'''
+
+class ALNSState:
+    """
+    Routing plan in successor form, with loads and cost updated by every move.
+
+    Parameters:
+    - instance_data: InstanceData of the instance.
+    - arc_cost: Optional (2, N, N) arc costs per vehicle type with a zero depot row/column
+      (shared between copies of a state).
+
+    Attributes:
+    - succ / pred: (Vtotal, N) next / previous node of every node on the route of each vehicle
+      (-1 if not visited; node 0 is the depot and succ[v, 0] == 0 for an unused vehicle).
+    - load: (Vtotal, N) load on the arc leaving every node.
+    - endpoints: (Vtotal, N) number of legs starting or ending at every node.
+    - legs: {w: [(v, a, b), ...]} vehicle path of every commodity, from its origin.
+    - on_vehicle: Commodities with a leg on every vehicle.
+    - cost: Objective value of the plan.
+    """
+    def __init__(self, instance_data, arc_cost=None):
+        self.instance_data = instance_data
+        self.V_small = int(instance_data.Vind[0])
+        self.Vtotal = self.V_small + int(instance_data.Vind[1])
+        self.N = int(instance_data.S) + 1
+        if arc_cost is None:
+            arc_cost = np.zeros((2, self.N, self.N))
+            arc_cost[:, 1:, 1:] = instance_data.arc_cost
+        self.arc_cost = arc_cost
+
+        self.succ = np.full((self.Vtotal, self.N), -1, dtype=np.int64)
+        self.succ[:, 0] = 0
+        self.pred = self.succ.copy()
+        self.load = np.zeros((self.Vtotal, self.N))
+        self.endpoints = np.zeros((self.Vtotal, self.N), dtype=np.int64)
+        self.legs = {}
+        self.on_vehicle = [set() for _ in range(self.Vtotal)]
+        self.cost = 0.0
+        self.changed = set()  # Vehicles whose route changed since the last clear
+
+    @classmethod
+    def from_plan(cls, plan, arc_cost=None):
+        state = cls(plan.instance_data, arc_cost)
+        for v, route in enumerate(plan.routes):
+            state.apply_route(v, route)
+        for w, legs in plan.legs.items():
+            for v, a, b in legs:
+                state.add_leg(w, v, a, b)
+        state.changed = set()
+        return state
+
+    def to_plan(self):
+        return RoutingPlan(
+            self.instance_data, [self.route(v) for v in range(self.Vtotal)],
+            {w: list(legs) for w, legs in self.legs.items()},
+        )
+
+    def copy(self):
+        state = ALNSState.__new__(ALNSState)
+        state.instance_data = self.instance_data
+        state.V_small, state.Vtotal, state.N = self.V_small, self.Vtotal, self.N
+        state.arc_cost = self.arc_cost
+        state.succ = self.succ.copy()
+        state.pred = self.pred.copy()
+        state.load = self.load.copy()
+        state.endpoints = self.endpoints.copy()
+        state.legs = {w: list(legs) for w, legs in self.legs.items()}
+        state.on_vehicle = [set(commodities) for commodities in self.on_vehicle]
+        state.cost = self.cost
+        state.changed = set(self.changed)
+        return state
+
+    def vehicle_type(self, v):
+        return 0 if v < self.V_small else 1
+
+    def capacity(self, v):
+        """Capacity enforced by the MIP (small vehicles only)."""
+        return self.instance_data.vcap[0] if v < self.V_small else np.inf
+
+    def used(self, v):
+        return self.succ[v, 0] != 0
+
+    def route(self, v):
+        route = []
+        node = self.succ[v, 0]
+        while node != 0:
+            route.append(int(node))
+            node = self.succ[v, node]
+        return route
+
+    def route_cost(self, v, route):
+        tour = [0] + list(route) + [0]
+        return float(self.arc_cost[self.vehicle_type(v), tour[:-1], tour[1:]].sum())
+
+    def leg_path(self, v, a, b):
+        """Nodes from a to b (both included) along the route of v."""
+        path = [a]
+        while path[-1] != b:
+            path.append(int(self.succ[v, path[-1]]))
+        return path
+
+    def transfer_hubs(self):
+        """Nodes where some commodity changes vehicle."""
+        return {legs[k][2] for legs in self.legs.values() for k in range(len(legs) - 1)}
+
+    # Moves; each one updates cost, loads and succ/pred in time proportional to the nodes it touches
+
+    def _insert_node(self, v, node, after):
+        t = self.vehicle_type(v)
+        cost = self.arc_cost[t]
+        nxt = self.succ[v, after]
+        if not self.used(v):
+            self.cost += self.instance_data.FC[t]
+        self.cost += cost[after, node] + cost[node, nxt] - cost[after, nxt]
+        self.succ[v, after], self.succ[v, node] = node, nxt
+        self.pred[v, nxt], self.pred[v, node] = node, after
+        self.load[v, node] = self.load[v, after]  # Legs passing the old arc now pass the node
+        self.changed.add(v)
+
+    def _remove_node(self, v, node):
+        t = self.vehicle_type(v)
+        cost = self.arc_cost[t]
+        prev, nxt = self.pred[v, node], self.succ[v, node]
+        self.cost -= cost[prev, node] + cost[node, nxt] - cost[prev, nxt]
+        self.succ[v, prev], self.pred[v, nxt] = nxt, prev
+        self.succ[v, node] = self.pred[v, node] = -1
+        self.load[v, node] = 0.0
+        if not self.used(v):
+            self.cost -= self.instance_data.FC[t]
+        self.changed.add(v)
+
+    def apply_route(self, v, route):
+        """Insert the nodes of route that are not on v yet (route keeps the current nodes of v in order)."""
+        after = 0
+        for node in route:
+            if self.succ[v, node] < 0:
+                self._insert_node(v, node, after)
+            after = node
+
+    def set_route(self, v, route):
+        """Replace the route of v by an ordering of the same nodes and recompute its loads."""
+        self.cost += self.route_cost(v, route) - self.route_cost(v, self.route(v))
+        tour = [0] + list(route) + [0]
+        self.succ[v] = -1
+        self.pred[v] = -1
+        self.succ[v, tour[:-1]] = tour[1:]
+        self.pred[v, tour[1:]] = tour[:-1]
+        self.load[v] = 0.0
+        qw = self.instance_data.qw
+        for w in self.on_vehicle[v]:
+            for leg_vehicle, a, b in self.legs[w]:
+                if leg_vehicle == v:
+                    self.load[v, self.leg_path(v, a, b)[:-1]] += qw[w]
+        self.changed.add(v)
+
+    def add_leg(self, w, v, a, b):
+        self.load[v, self.leg_path(v, a, b)[:-1]] += self.instance_data.qw[w]
+        self.endpoints[v, a] += 1
+        self.endpoints[v, b] += 1
+        self.legs.setdefault(w, []).append((v, a, b))
+        self.on_vehicle[v].add(w)
+
+    def remove_commodity(self, w):
+        """Remove the legs of w and the route nodes no other leg starts or ends at."""
+        for v, a, b in self.legs.pop(w, []):
+            self.load[v, self.leg_path(v, a, b)[:-1]] -= self.instance_data.qw[w]
+            self.endpoints[v, a] -= 1
+            self.endpoints[v, b] -= 1
+            self.on_vehicle[v].discard(w)
+            for node in (a, b):
+                if self.endpoints[v, node] == 0:
+                    self._remove_node(v, node)
+
+    # Evaluation
+
+    def leg_insertion(self, w, v, a, b):
+        """
+        Cheapest insertion of leg a -> b of commodity w on vehicle v.
+
+        Returns:
+        - (added cost, new route), FC included for an unused vehicle, or None if the leg does not fit or
+          would make a commodity path pass through its own origin or destination.
+        """
+        route = self.route(v)
+        t = self.vehicle_type(v)
+        insertion = best_leg_insertion(
+            route, self.load[v, [0] + route], self.instance_data.arc_cost[t], self.capacity(v),
+            a, b, self.instance_data.qw[w],
+        )
+        if insertion is None:
+            return None
+        added, new_route = insertion
+        # A route visiting a node twice has no successor array (and a wrong added cost)
+        if len(set(new_route)) < len(new_route) or not self._keeps_paths_simple(w, v, a, b, route, new_route):
+            return None
+        return added + (0.0 if route else self.instance_data.FC[t]), new_route
+
+    def commodity_path(self, w):
+        """Nodes visited by commodity w from its origin to its destination."""
+        path = []
+        for v, a, b in self.legs[w]:
+            path += self.leg_path(v, a, b)[len(path) > 0:]
+        return path
+
+    def _keeps_paths_simple(self, w, v, a, b, route, new_route):
+        # Commodity paths visit every node at most once (as check_feasibility expects)
+        ow, dw = self.instance_data.ow, self.instance_data.dw
+        position = {node: k for k, node in enumerate(new_route)}
+        if {int(ow[w]), int(dw[w])} & set(new_route[position[a] + 1:position[b]]):
+            return False
+        for node in set(new_route) - set(route):
+            for other in self.on_vehicle[v]:
+                legs = self.legs[other]
+                for leg_vehicle, la, lb in legs:
+                    if leg_vehicle != v or not position[la] < position[node] < position[lb]:
+                        continue
+                    if node == ow[other] or node == dw[other] or (len(legs) > 1 and node in self.commodity_path(other)):
+                        return False
+        return True
+
+    def paths_simple(self, v):
+        """True if no commodity with a leg on v visits a node twice."""
+        for w in self.on_vehicle[v]:
+            path = self.commodity_path(w)
+            if len(set(path)) < len(path):
+                return False
+        return True
+
+
+class ALNS:
+    """
+    Adaptive large neighborhood search on ALNSState.
+
+    Parameters:
+    - instance_data: InstanceData of the instance.
+    - hubs: Nodes where commodities may change vehicle (None: every customer node).
+    - direct_commodities / transshipment_commodities: ML predictions, used as move biases.
+    - ml_bias: Strength of the ML biases (0 ignores the predictions).
+    - seed: Seed of the random generator.
+    - destroy_fraction: Range of the share of commodities removed per iteration.
+    - max_destroy: Maximum number of commodities removed per iteration (vehicle and hub removal may exceed it).
+    - hub_sample: Hubs tried per commodity by the greedy repair.
+    - start_temperature: A solution this much worse (relative) is accepted with probability 1/2 at the start.
+    - cooling: Temperature factor per iteration.
+    - segment: Iterations between operator weight updates.
+    - reaction: Weight of the last segment in the updated operator weights.
+    - scores: Operator score for a new best, an improving and an accepted solution.
+    """
+    DESTROY_OPERATORS = ("random_removal", "worst_removal", "vehicle_removal", "hub_removal")
+    REPAIR_OPERATORS = ("greedy_repair", "direct_repair", "hub_open_repair")
+
+    def __init__(self, instance_data, hubs=None, direct_commodities=(), transshipment_commodities=(), ml_bias=0.5,
+                 seed=0, destroy_fraction=(0.1, 0.3), max_destroy=25, hub_sample=4, start_temperature=0.05,
+                 cooling=0.999, segment=50, reaction=0.1, scores=(5.0, 3.0, 1.0)):
+        self.instance_data = instance_data
+        self.hubs = np.array(sorted(range(1, int(instance_data.S) + 1) if hubs is None else hubs), dtype=np.int64)
+        self.direct = set(int(w) for w in direct_commodities)
+        self.transshipment = set(int(w) for w in transshipment_commodities)
+        self.ml_bias = ml_bias
+        self.rng = np.random.default_rng(seed)
+        self.destroy_fraction = destroy_fraction
+        self.max_destroy = max_destroy
+        self.hub_sample = hub_sample
+        self.start_temperature = start_temperature
+        self.cooling = cooling
+        self.segment = segment
+        self.reaction = reaction
+        self.scores = scores
+
+        self.weights = {name: 1.0 for name in self.DESTROY_OPERATORS + self.REPAIR_OPERATORS}
+        self.iterations = 0
+        self.history = []  # (seconds, best cost) at every new best
+        self._closed_hubs = set()
+
+    def run(self, initial, time_budget, max_iterations=None):
+        """
+        Improve an initial RoutingPlan or ALNSState within time_budget seconds.
+
+        Returns:
+        - Best ALNSState found.
+        """
+        start = time.perf_counter()
+        current = initial if isinstance(initial, ALNSState) else ALNSState.from_plan(initial)
+        best = current.copy()
+        temperature = self.start_temperature * current.cost / math.log(2)
+        self.history.append((0.0, best.cost))
+        segment_scores = {name: 0.0 for name in self.weights}
+        segment_uses = {name: 0 for name in self.weights}
+
+        while time.perf_counter() - start < time_budget and (max_iterations is None or self.iterations < max_iterations):
+            self.iterations += 1
+            destroy = self._select(self.DESTROY_OPERATORS)
+            repair = self._select(self.REPAIR_OPERATORS)
+            candidate = current.copy()
+            candidate.changed = set()
+            self._closed_hubs = set()
+
+            removed = getattr(self, destroy)(candidate)
+            if removed and getattr(self, repair)(candidate, removed):
+                for v in sorted(candidate.changed):
+                    if candidate.used(v):
+                        self.two_opt(candidate, v)
+
+                score = 0.0
+                if candidate.cost < best.cost - 1e-9:
+                    best, score = candidate.copy(), self.scores[0]
+                    self.history.append((time.perf_counter() - start, best.cost))
+                if candidate.cost < current.cost - 1e-9:
+                    current, score = candidate, max(score, self.scores[1])
+                elif self.rng.random() < math.exp(-(candidate.cost - current.cost) / max(temperature, 1e-12)):
+                    current, score = candidate, max(score, self.scores[2])
+                segment_scores[destroy] += score
+                segment_scores[repair] += score
+            segment_uses[destroy] += 1
+            segment_uses[repair] += 1
+            temperature *= self.cooling
+
+            if self.iterations % self.segment == 0:
+                for name in self.weights:
+                    if segment_uses[name]:
+                        self.weights[name] = (1 - self.reaction) * self.weights[name] \
+                            + self.reaction * segment_scores[name] / segment_uses[name]
+                        self.weights[name] = max(self.weights[name], 0.05)
+                    segment_scores[name], segment_uses[name] = 0.0, 0
+        return best
+
+    def _select(self, operators):
+        weights = np.array([self.weights[name] for name in operators])
+        return operators[self.rng.choice(len(operators), p=weights / weights.sum())]
+
+    def _destroy_size(self, state):
+        low, high = self.destroy_fraction
+        size = int(round(len(state.legs) * self.rng.uniform(low, high)))
+        return max(1, min(size, self.max_destroy, len(state.legs)))
+
+    def _disagrees(self, state, w):
+        """True if w is routed against its ML prediction."""
+        transfers = len(state.legs[w]) > 1
+        return (w in self.direct and transfers) or (w in self.transshipment and not transfers)
+
+    # Destroy operators: remove commodities from the state and return them
+
+    def random_removal(self, state):
+        commodities = list(state.legs)
+        weights = np.array([1.0 + self.ml_bias * self._disagrees(state, w) for w in commodities])
+        chosen = self.rng.choice(len(commodities), self._destroy_size(state), replace=False, p=weights / weights.sum())
+        removed = [commodities[k] for k in chosen]
+        for w in removed:
+            state.remove_commodity(w)
+        return removed
+
+    def worst_removal(self, state):
+        """Remove commodities with the largest share of the arc costs they ride on (shared by load)."""
+        qw = self.instance_data.qw
+        commodities = list(state.legs)
+        shares = np.zeros(len(commodities))
+        for k, w in enumerate(commodities):
+            for v, a, b in state.legs[w]:
+                path = state.leg_path(v, a, b)
+                cost = state.arc_cost[state.vehicle_type(v), path[:-1], path[1:]]
+                shares[k] += (cost * qw[w] / state.load[v, path[:-1]]).sum()
+            shares[k] *= 1.0 + self.ml_bias * self._disagrees(state, w)
+        order = list(np.argsort(-shares))
+        removed = []
+        for _ in range(self._destroy_size(state)):
+            # Randomized worst: prefer the front of the order
+            removed.append(commodities[order.pop(int(len(order) * self.rng.random() ** 3))])
+        for w in removed:
+            state.remove_commodity(w)
+        return removed
+
+    def vehicle_removal(self, state):
+        """Empty one vehicle (fewer commodities: more likely) so the repair merges its load into the others."""
+        used = [v for v in range(state.Vtotal) if state.used(v)]
+        if len(used) < 2:
+            return self.random_removal(state)
+        weights = np.array([1.0 / (1 + len(state.on_vehicle[v])) for v in used])
+        v = used[self.rng.choice(len(used), p=weights / weights.sum())]
+        removed = list(state.on_vehicle[v])
+        for w in removed:
+            state.remove_commodity(w)
+        return removed
+
+    def hub_removal(self, state):
+        """Close one transfer hub: remove the commodities changing vehicle there and keep it closed in the repair."""
+        hubs = sorted(state.transfer_hubs())
+        if not hubs:
+            return self.random_removal(state)
+        hub = hubs[self.rng.integers(len(hubs))]
+        removed = [w for w, legs in state.legs.items() if any(legs[k][2] == hub for k in range(len(legs) - 1))]
+        for w in removed:
+            state.remove_commodity(w)
+        self._closed_hubs = {hub}
+        return removed
+
+    # Repair operators: reinsert removed commodities; return False if one cannot be placed
+
+    def greedy_repair(self, state, removed):
+        qw = self.instance_data.qw
+        for w in sorted(removed, key=lambda w: -qw[w]):
+            hubs = self.hubs[~np.isin(self.hubs, list(self._closed_hubs))]
+            hubs = self.rng.choice(hubs, min(self.hub_sample, len(hubs)), replace=False) if len(hubs) else hubs
+            if not self.insert(state, w, hubs):
+                return False
+        return True
+
+    def direct_repair(self, state, removed):
+        for w in self.rng.permutation(removed):
+            if not self.insert(state, int(w), (), noise=0.1):
+                return False
+        return True
+
+    def hub_open_repair(self, state, removed):
+        """Offer every removed commodity one hub that no commodity uses yet, besides direct insertion."""
+        unused = [h for h in self.hubs if h not in state.transfer_hubs() and h not in self._closed_hubs]
+        hubs = [unused[self.rng.integers(len(unused))]] if unused else []
+        for w in self.rng.permutation(removed):
+            if not self.insert(state, int(w), hubs):
+                return False
+        return True
+
+    def insert(self, state, w, hubs, noise=0.0):
+        """
+        Insert commodity w at its cheapest (ML-biased) position: directly on one vehicle or on two
+        vehicles changing at one of the given hubs. Returns True if w was inserted.
+        """
+        o, d = int(self.instance_data.ow[w]), int(self.instance_data.dw[w])
+        direct_factor = 1.0 + self.ml_bias * (w in self.transshipment)
+        transfer_factor = 1.0 + self.ml_bias * (w in self.direct)
+
+        # Used vehicles plus one unused vehicle per type
+        vehicles, opened = [], set()
+        for v in range(state.Vtotal):
+            if state.used(v):
+                vehicles.append(v)
+            elif state.vehicle_type(v) not in opened:
+                opened.add(state.vehicle_type(v))
+                vehicles.append(v)
+
+        options = []  # (biased cost, legs [(v, a, b, new route), ...])
+        for v in vehicles:
+            insertion = state.leg_insertion(w, v, o, d)
+            if insertion is not None:
+                options.append((insertion[0] * direct_factor, [(v, o, d, insertion[1])]))
+        for h in hubs:
+            h = int(h)
+            if h == o or h == d:
+                continue
+            first = [(v, insertion) for v in vehicles if (insertion := state.leg_insertion(w, v, o, h)) is not None]
+            second = [(v, insertion) for v in vehicles if (insertion := state.leg_insertion(w, v, h, d)) is not None]
+            for v1, (added1, route1) in first:
+                path1 = route1[route1.index(o):route1.index(h) + 1]
+                for v2, (added2, route2) in second:
+                    path2 = route2[route2.index(h):route2.index(d) + 1]
+                    if v1 != v2 and set(path1) & set(path2) == {h}:
+                        options.append(((added1 + added2) * transfer_factor, [(v1, o, h, route1), (v2, h, d, route2)]))
+        if not options:
+            return False
+
+        biased = np.array([option[0] for option in options])
+        if noise:
+            biased *= self.rng.uniform(1 - noise, 1 + noise, len(biased))
+        for v, a, b, route in options[int(np.argmin(biased))][1]:
+            state.apply_route(v, route)
+            state.add_leg(w, v, a, b)
+        return True
+
+    # Local improvement
+
+    def two_opt(self, state, v, max_passes=10):
+        """Reverse route segments of v while the cost drops and loads, capacity and commodity paths stay valid."""
+        capacity = state.capacity(v)
+        cost = state.arc_cost[state.vehicle_type(v)]
+        for _ in range(max_passes):
+            route = state.route(v)
+            if len(route) < 3:
+                return
+            tour = np.array([0] + route + [0])
+            forward = np.concatenate([[0.0], np.cumsum(cost[tour[:-1], tour[1:]])])
+            backward = np.concatenate([[0.0], np.cumsum(cost[tour[1:], tour[:-1]])])
+            # Reverse tour[i..j] (1 <= i < j <= len(route))
+            i, j = np.triu_indices(len(tour) - 1, k=1)
+            keep = i >= 1
+            i, j = i[keep], j[keep]
+            delta = cost[tour[i - 1], tour[j]] + cost[tour[i], tour[j + 1]] - cost[tour[i - 1], tour[i]] \
+                - cost[tour[j], tour[j + 1]] + (backward[j] - backward[i]) - (forward[j] - forward[i])
+
+            position = {node: k + 1 for k, node in enumerate(route)}
+            legs = [(position[a], position[b]) for w in state.on_vehicle[v] for lv, a, b in state.legs[w] if lv == v]
+            improved = False
+            for k in np.argsort(delta):
+                if delta[k] > -1e-9:
+                    break
+                if any(i[k] <= pa and pb <= j[k] for pa, pb in legs):
+                    continue  # A leg inside the segment would be reversed
+                old_cost, old_route = state.cost, route
+                state.set_route(v, route[:i[k] - 1] + route[i[k] - 1:j[k]][::-1] + route[j[k]:])
+                if state.load[v].max() <= capacity + 1e-9 and state.paths_simple(v) and state.cost < old_cost - 1e-9:
+                    improved = True
+                    break
+                state.set_route(v, old_route)
+            if not improved:
+                return
+
+
+def solve_routing_alns(instance_data, ml_data, fixed_hubs, use_ml_guidance, use_location_first, use_direct,
+                       use_transhipment, time_budget=60.0, seed=0):
+    """
+    Solve the routing decisions with ALNS from the greedy constructive plan.
+
+    Same configuration arguments as MIPs.solve_routing_decisions: hubs are fixed_hubs under
+    location-first (otherwise every node), and the ML direct / transhipment predictions bias the
+    moves if use_ml_guidance. Returns a result dict with the keys of solve_routing_decisions
+    ('status' is 'ALNS', 'optimality_gap' is None) plus 'iterations'.
+    """
+    start = time.perf_counter()
+    direct, transshipment = ml_commodities(ml_data, instance_data.nonzero_flows) if use_ml_guidance else ([], [])
+    direct = direct if use_direct else []
+    transshipment = transshipment if use_transhipment else []
+    hubs = fixed_hubs if use_location_first else None
+
+    initial = greedy_routing_plan(instance_data, hubs=hubs, no_transfer=direct)
+    first_feasible = time.perf_counter() - start
+    alns = ALNS(instance_data, hubs=hubs, direct_commodities=direct, transshipment_commodities=transshipment, seed=seed)
+    best = alns.run(initial, max(time_budget - first_feasible, 0.0))
+    total = time.perf_counter() - start
+    print(f"ALNS: {alns.iterations} iterations, cost {initial.cost():.2f} -> {best.cost:.2f} in {total:.2f} s")
+
+    return {
+        'solution': best.to_plan().to_solution(),
+        'objective_value': best.cost,
+        'optimality_gap': None,
+        'status': 'ALNS',
+        'time_to_first_feasible': first_feasible,
+        'total_solving_time': total,
+        'solution_count': len(alns.history),
+        'warm_start': None,
+        'iterations': alns.iterations,
+    }
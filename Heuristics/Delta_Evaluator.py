@@ -0,0 +1,283 @@
+import os
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from Auxiliary_Functions.Feasibility_checks import TOLERANCE, VIOLATION_FAMILIES, check_continuous_path, solution_arrays
+
+'''
+Incremental feasibility and cost evaluation of routing solutions for local search.
+
+DeltaEvaluator holds a solution in the format of result['solution'] together
+with the sums the constraints of check_feasibility read: flow out of the origin
+and into the destination per commodity, net flow per (node, commodity) and per
+(node, vehicle, commodity), load per small-vehicle arc, vehicle balance per
+(vehicle, node), and the flow arcs of every commodity for its path check. A
+move is a partial solution of new values ({'xijv': {(i, j, v): 1}, 'fijvw':
+{(i, j, v, w): 0}, 'yi': {...}, 'av': {...}}); applying it updates these sums
+and re-evaluates only the constraints that read a changed value, so a move
+costs time in the arcs it touches (plus the path search of the commodities it
+reroutes). The violated constraints are kept as sets of keys per family of
+feasibility_violations, so the evaluator is feasible exactly when
+check_feasibility is.
+'''
+
+PATH_THRESHOLD = 0.05  # Flow above which an arc is part of a commodity path (as commodity_arcs)
+
+
+class DeltaEvaluator:
+    """
+    Solution state with incremental feasibility and cost (objective of solve_routing_decisions).
+
+    Parameters:
+    - instance_data: InstanceData of the instance.
+    - solution: Solution in the format of result['solution'] ({key: value} dicts or SparseVariable families).
+    """
+    def __init__(self, instance_data, solution):
+        self.instance_data = instance_data
+        self.N = int(instance_data.S) + 1
+        self.V_small = int(instance_data.Vind[0])
+        self.Vtotal = self.V_small + int(instance_data.Vind[1])
+        self.ow = np.asarray(instance_data.ow)
+        self.dw = np.asarray(instance_data.dw)
+        self.qw = np.asarray(instance_data.qw, dtype=float)
+        self.commodities = set(int(w) for w in instance_data.nonzero_flows)
+
+        # Solution values (nonzero entries only for arcs and flows)
+        self.av = {v: 0.0 for v in range(self.Vtotal)}
+        self.yi = {i: 0.0 for i in range(self.N)}
+        self.x = {}
+        self.flows = defaultdict(dict)  # w -> {(i, j, v): f}
+        self.cost = 0.0
+
+        # Sums read by the constraints
+        self.vehicle_arcs = defaultdict(set)  # v -> arcs with x != 0
+        self.arc_flows = defaultdict(dict)  # (i, j, v) -> {w: f}
+        self.balance = defaultdict(float)  # (v, i) -> x out - x in
+        self.net = defaultdict(float)  # (i, w) -> f out - f in
+        self.vehicle_net = defaultdict(float)  # (i, v, w) -> f in - f out
+        self.node_transfers = defaultdict(set)  # i -> (v, w) with vehicle_net != 0
+        self.path_arcs = defaultdict(lambda: defaultdict(list))  # w -> {i: [(j, v)]} with f > PATH_THRESHOLD
+        self.path_commodities = defaultdict(lambda: defaultdict(int))  # i -> {w: path arcs leaving i}
+        self.load = defaultdict(float)  # (i, j, v) -> qw * f of small vehicles
+
+        self.violated = {family: set() for family in VIOLATION_FAMILIES}
+        self._touched = defaultdict(set)
+
+        # Start from the empty solution: every commodity lacks its origin and destination flow
+        for w in self.commodities:
+            self._touch_commodity(w)
+        av, yi, xijv, f_index, f_values = solution_arrays(instance_data, solution)
+        move = {
+            'av': dict(enumerate(av.tolist())),
+            'yi': dict(enumerate(yi.tolist())),
+            'xijv': {tuple(key): xijv[tuple(key)] for key in np.argwhere(xijv != 0).tolist()},
+            'fijvw': dict(zip(map(tuple, f_index.tolist()), f_values.tolist())),
+        }
+        self.apply(move)
+
+    @property
+    def feasible(self):
+        return not any(self.violated.values())
+
+    def violations(self):
+        """Violated constraints per family, keyed as the indices of feasibility_violations ({family: sorted keys})."""
+        return {family: sorted(keys) for family, keys in self.violated.items()}
+
+    def evaluate(self, move):
+        """Feasibility and cost delta of a move, leaving the solution unchanged; returns (feasible, cost delta)."""
+        cost = self.cost
+        reverse = self.apply(move)
+        feasible, delta = self.feasible, self.cost - cost
+        self.apply(reverse)
+        self.cost = cost
+        return feasible, delta
+
+    def apply(self, move):
+        """Apply a move (partial solution of new values); returns the move that undoes it."""
+        reverse = {}
+        for name, setter, current in [('yi', self._set_hub, self.yi), ('av', self._set_vehicle, self.av),
+                                      ('xijv', self._set_arc, self.x)]:
+            if name in move:
+                reverse[name] = {key: current.get(key, 0) for key in move[name]}
+                for key, value in move[name].items():
+                    setter(key, value)
+        if 'fijvw' in move:
+            reverse['fijvw'] = {key: self.flows[key[3]].get(key[:3], 0) for key in move['fijvw']}
+            for key, value in move['fijvw'].items():
+                self._set_flow(key, value)
+        self._recheck()
+        return reverse
+
+    def reroute(self, w, arcs):
+        """Move that sends commodity w along the given (i, j, v) arcs instead of its current ones."""
+        move = {key + (w,): 0 for key in self.flows[w]}
+        move.update({tuple(key) + (w,): 1 for key in arcs})
+        return {'fijvw': move}
+
+    def to_solution(self):
+        """Current solution in the format of result['solution'] (Zvi = 1 where vehicle v leaves node i)."""
+        solution = {
+            'av': dict(self.av), 'yi': dict(self.yi), 'xijv': dict(self.x),
+            'fijvw': {key + (w,): f for w, flows in self.flows.items() for key, f in flows.items()},
+            'Zvi': {(v, i): 0 for v in range(self.Vtotal) for i in range(self.N)},
+        }
+        for (i, j, v), value in self.x.items():
+            if value > 0.5:
+                solution['Zvi'][v, i] = 1
+        return solution
+
+    # Value changes: update the sums and mark the constraints that read the changed value
+
+    def _set_hub(self, i, value):
+        if self.yi[i] == value:
+            return
+        self.yi[i] = value
+        self._touched["transfer_without_hub"].update((i, v, w) for v, w in self.node_transfers[i])
+        self._touched["continuous_path"].update((w,) for w in self.path_commodities[i])
+
+    def _set_vehicle(self, v, value):
+        old = self.av[v]
+        if old == value:
+            return
+        self.av[v] = value
+        self.cost += self.instance_data.FC[self._type(v)] * (value - old)
+        self._touched["vehicle_acquisition"].update(self.vehicle_arcs[v])
+
+    def _set_arc(self, key, value):
+        old = self.x.get(key, 0)
+        if old == value:
+            return
+        i, j, v = key
+        if value:
+            self.x[key] = value
+            self.vehicle_arcs[v].add(key)
+        else:
+            del self.x[key]
+            self.vehicle_arcs[v].discard(key)
+        delta = value - old
+        if i != j:
+            self.balance[v, i] += delta
+            self.balance[v, j] -= delta
+            if i >= 1 and j >= 1:
+                self.cost += self.instance_data.arc_cost[self._type(v), i - 1, j - 1] * delta
+        self._touched["node_balance"].update(((v, i), (v, j)))
+        self._touched["vehicle_acquisition"].add(key)
+        self._touched["capacity"].add(key)
+        self._touched["flow_without_arc"].update(key + (w,) for w in self.arc_flows[key])
+
+    def _set_flow(self, key, value):
+        i, j, v, w = key
+        flows = self.flows[w]
+        old = flows.get(key[:3], 0)
+        if old == value:
+            return
+        if value:
+            flows[key[:3]] = value
+            self.arc_flows[key[:3]][w] = value
+        else:
+            del flows[key[:3]]
+            del self.arc_flows[key[:3]][w]
+        if w not in self.commodities:
+            return
+
+        # Path arcs (all arcs, as the path check)
+        if (old > PATH_THRESHOLD) != (value > PATH_THRESHOLD):
+            if value > PATH_THRESHOLD:
+                self.path_arcs[w][i].append((j, v))
+                self.path_commodities[i][w] += 1
+            else:
+                self.path_arcs[w][i].remove((j, v))
+                self.path_commodities[i][w] -= 1
+                if not self.path_commodities[i][w]:
+                    del self.path_commodities[i][w]
+            self._touched["continuous_path"].add((w,))
+
+        # Flow constraints read customer arcs only
+        if i < 1 or j < 1:
+            return
+        delta = value - old
+        self._touch_commodity(w)
+        self._touched["flow_without_arc"].add(key)
+        if i != j:
+            self.net[i, w] += delta
+            self.net[j, w] -= delta
+            self._update_vehicle_net(j, v, w, delta)
+            self._update_vehicle_net(i, v, w, -delta)
+            self._touched["flow_conservation"].update(((i, w), (j, w)))
+        if v < self.V_small:
+            self.load[key[:3]] += self.qw[w] * delta
+            self._touched["capacity"].add(key[:3])
+
+    def _update_vehicle_net(self, i, v, w, delta):
+        self.vehicle_net[i, v, w] += delta
+        if self.vehicle_net[i, v, w] != 0:
+            self.node_transfers[i].add((v, w))
+        else:
+            self.node_transfers[i].discard((v, w))
+        self._touched["transfer_without_hub"].add((i, v, w))
+
+    def _touch_commodity(self, w):
+        self._touched["origin_flow"].add((w,))
+        self._touched["destination_flow"].add((w,))
+
+    # Constraint evaluation (same conditions as feasibility_violations)
+
+    def _type(self, v):
+        return 0 if v < self.V_small else 1
+
+    def _recheck(self):
+        for family, keys in self._touched.items():
+            is_violated = getattr(self, f"_violates_{family}")
+            violated = self.violated[family]
+            for key in keys:
+                if is_violated(key):
+                    violated.add(key)
+                else:
+                    violated.discard(key)
+        self._touched.clear()
+
+    def _violates_origin_flow(self, key):
+        w, = key
+        # Summed from the flows of w (exact, as the batch check)
+        return sum(f for (i, j, v), f in self.flows[w].items() if i == self.ow[w] and j >= 1) != 1
+
+    def _violates_destination_flow(self, key):
+        w, = key
+        return sum(f for (i, j, v), f in self.flows[w].items() if j == self.dw[w] and i >= 1) != 1
+
+    def _violates_flow_conservation(self, key):
+        i, w = key
+        return abs(self.net[key]) >= TOLERANCE and i != self.ow[w] and i != self.dw[w]
+
+    def _violates_flow_without_arc(self, key):
+        i, j, v, w = key
+        if w not in self.commodities or i < 1 or j < 1:
+            return False
+        return self.flows[w].get(key[:3], 0) - self.x.get(key[:3], 0) > TOLERANCE
+
+    def _violates_transfer_without_hub(self, key):
+        i, v, w = key
+        return (abs(self.vehicle_net[key]) >= TOLERANCE and i != self.ow[w] and i != self.dw[w]
+                and self.yi[i] == 0)
+
+    def _violates_capacity(self, key):
+        i, j, v = key
+        load, arc = self.load.get(key, 0.0), self.x.get(key, 0)
+        return v < self.V_small and any(load > capacity * arc for capacity in self.instance_data.vcap[:2])
+
+    def _violates_node_balance(self, key):
+        return abs(self.balance[key]) >= TOLERANCE
+
+    def _violates_vehicle_acquisition(self, key):
+        return self.av[key[2]] < 0.5 and self.x.get(key, 0) > TOLERANCE
+
+    def _violates_continuous_path(self, key):
+        w, = key
+        return not check_continuous_path(w, self.ow[w], self.dw[w], None, None, None, self.yi,
+                                         arcs=self.path_arcs[w])
@@ -0,0 +1,430 @@
+import copy
+import os
+import sys
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+'''
+Greedy constructive heuristic for the routing model.
+
+Builds a plan in two phases:
+1. Direct shipments: commodities (largest first) are inserted into vehicle routes
+   at the cheapest position, or put on a new small/big vehicle, subject to the
+   capacity of the small vehicles (the only capacity the MIP enforces).
+2. Consolidation through hubs: vehicles are closed one at a time when all their
+   commodities can be carried by the other routes, directly or with one vehicle
+   change at a hub, and the total cost drops.
+
+The plan is scored with the MIP objective (fixed cost per vehicle plus
+OC * dist / speed per customer arc) and converted to av/xijv/fijvw/Zvi/yi values
+in the format of result['solution'], e.g. to be loaded as a MIP start.
+'''
+
+class RoutingPlan:
+    """
+    Routing plan in route form.
+
+    Parameters:
+    - instance_data: InstanceData of the instance.
+    - routes: Customer nodes visited by every vehicle, in order ([] for an unused vehicle;
+      the depot is implicit at both ends).
+    - legs: {w: [(v, a, b), ...]}: commodity w rides vehicle v from node a to node b along v's route.
+    """
+    def __init__(self, instance_data, routes=None, legs=None):
+        self.instance_data = instance_data
+        self.V_small = int(instance_data.Vind[0])
+        self.Vtotal = self.V_small + int(instance_data.Vind[1])
+        self.N = int(instance_data.S) + 1
+        self.routes = routes if routes is not None else [[] for _ in range(self.Vtotal)]
+        self.legs = legs if legs is not None else {}
+
+    def copy(self):
+        return RoutingPlan(self.instance_data, copy.deepcopy(self.routes), copy.deepcopy(self.legs))
+
+    def vehicle_type(self, v):
+        return 0 if v < self.V_small else 1
+
+    def capacity(self, v):
+        """Capacity enforced by the MIP (small vehicles only)."""
+        return self.instance_data.vcap[0] if v < self.V_small else np.inf
+
+    def route_cost(self, v, route=None):
+        """Arc cost of a route (arcs from and to the depot are free, as in the MIP objective)."""
+        route = self.routes[v] if route is None else route
+        if len(route) < 2:
+            return 0.0
+        nodes = np.asarray(route) - 1
+        return float(self.instance_data.arc_cost[self.vehicle_type(v), nodes[:-1], nodes[1:]].sum())
+
+    def cost(self):
+        """Objective value of the plan."""
+        FC = self.instance_data.FC
+        return sum(FC[self.vehicle_type(v)] + self.route_cost(v) for v in range(self.Vtotal) if self.routes[v])
+
+    def leg_path(self, v, a, b):
+        """Nodes from a to b (both included) along the route of vehicle v."""
+        route = self.routes[v]
+        return route[route.index(a):route.index(b) + 1]
+
+    def arc_loads(self, v):
+        """Load on every arc of the route of v (route[k] -> route[k + 1])."""
+        route = self.routes[v]
+        position = {node: k for k, node in enumerate(route)}
+        loads = np.zeros(max(len(route) - 1, 0))
+        qw = self.instance_data.qw
+        for w, legs in self.legs.items():
+            for leg_vehicle, a, b in legs:
+                if leg_vehicle == v:
+                    loads[position[a]:position[b]] += qw[w]
+        return loads
+
+    def commodity_path(self, w):
+        """Nodes visited by commodity w from its origin to its destination (legs in path order)."""
+        path = []
+        for v, a, b in self.legs[w]:
+            path += self.leg_path(v, a, b)[len(path) > 0:]
+        return path
+
+    def hubs(self):
+        """Nodes where a commodity changes vehicle."""
+        return {b for legs in self.legs.values() for _, _, b in legs[:-1]}
+
+    def prune(self):
+        """Drop route nodes where no leg starts or ends (shortcuts; costs satisfy the triangle inequality)."""
+        endpoints = [set() for _ in range(self.Vtotal)]
+        for legs in self.legs.values():
+            for v, a, b in legs:
+                endpoints[v].update((a, b))
+        self.routes = [[node for node in route if node in endpoints[v]] for v, route in enumerate(self.routes)]
+
+    def to_solution(self):
+        """Plan as av/xijv/fijvw/Zvi/yi values in the format of result['solution'] (absent fijvw/xijv keys are 0)."""
+        N, Vtotal = self.N, self.Vtotal
+        solution = {
+            'fijvw': {},
+            'xijv': {},
+            'av': {v: int(bool(self.routes[v])) for v in range(Vtotal)},
+            'Zvi': {(v, i): 0 for v in range(Vtotal) for i in range(N)},
+            'yi': {i: 0 for i in range(N)},
+        }
+        for v, route in enumerate(self.routes):
+            if not route:
+                continue
+            tour = [0] + route + [0]
+            for i, j in zip(tour[:-1], tour[1:]):
+                solution['xijv'][i, j, v] = 1
+                solution['Zvi'][v, i] = 1
+        for w, legs in self.legs.items():
+            for v, a, b in legs:
+                path = self.leg_path(v, a, b)
+                for i, j in zip(path[:-1], path[1:]):
+                    solution['fijvw'][i, j, v, int(w)] = 1
+        for hub in self.hubs():
+            solution['yi'][hub] = 1
+        return solution
+
+
+def plan_cost(instance_data, solution):
+    """Objective of the routing MIP for a solution in the format of result['solution']."""
+    V_small = int(instance_data.Vind[0])
+    arc_cost = instance_data.arc_cost
+    cost = sum(instance_data.FC[0 if v < V_small else 1] for v, used in solution['av'].items() if used > 0.5)
+    for (i, j, v), used in solution['xijv'].items():
+        if used > 0.5 and i > 0 and j > 0:
+            cost += arc_cost[0 if v < V_small else 1, i - 1, j - 1]
+    return float(cost)
+
+
+def _insertion_costs(route, cost, node):
+    """Added arc cost of inserting node into every gap of a route (gap k is before route[k]; depot arcs are free)."""
+    nodes = np.asarray(route, dtype=int) - 1
+    added = np.zeros(len(route) + 1)
+    if len(route) == 0:
+        return added
+    added[0] = cost[node - 1, nodes[0]]
+    added[-1] = cost[nodes[-1], node - 1]
+    added[1:-1] = cost[nodes[:-1], node - 1] + cost[node - 1, nodes[1:]] - cost[nodes[:-1], nodes[1:]]
+    return added
+
+
+def best_leg_insertion(route, gap_loads, cost, capacity, o, d, q):
+    """
+    Cheapest way to carry q from o to d along a route, inserting o and/or d if they are not on it.
+
+    Parameters:
+    - route: Customer nodes of the vehicle, in order.
+    - gap_loads: Load per gap (len(route) + 1): gap 0 is depot -> route[0], gap k is route[k - 1] -> route[k],
+      the last gap is route[-1] -> depot.
+    - cost: Arc cost matrix of the vehicle type (S x S, 0-based customers).
+    - capacity: Vehicle capacity (np.inf if not limited).
+
+    Returns:
+    - (added_cost, new_route), or None if the leg does not fit. new_route never visits a node twice.
+    """
+    if o in route and d in route:
+        po, pd = route.index(o), route.index(d)
+        if po < pd and gap_loads[po + 1:pd + 1].max() + q <= capacity:
+            return 0.0, route
+        return None
+
+    if o in route:
+        po = route.index(o)
+        # Insert d into gap k > po; the leg covers gaps po + 1 .. k
+        span = np.maximum.accumulate(gap_loads[po + 1:])
+        added = _insertion_costs(route, cost, d)[po + 1:]
+        added[span + q > capacity] = np.inf
+        k = int(np.argmin(added))
+        return (added[k], route[:po + 1 + k] + [d] + route[po + 1 + k:]) if np.isfinite(added[k]) else None
+
+    if d in route:
+        pd = route.index(d)
+        # Insert o into gap k <= pd; the leg covers gaps k .. pd
+        span = np.maximum.accumulate(gap_loads[:pd + 1][::-1])[::-1]
+        added = _insertion_costs(route, cost, o)[:pd + 1]
+        added[span + q > capacity] = np.inf
+        k = int(np.argmin(added))
+        return (added[k], route[:k] + [o] + route[k:]) if np.isfinite(added[k]) else None
+
+    # Neither end is on the route. o == d is not a leg: inserting it would visit the node twice
+    if o == d:
+        return None
+
+    # Insert o into gap k1 and d into gap k2 >= k1; the leg covers gaps k1 .. k2
+    gaps = len(route) + 1
+    pair = _insertion_costs(route, cost, o)[:, None] + _insertion_costs(route, cost, d)[None, :]
+    # o and d in the same gap: prev -> o -> d -> next
+    nodes = [None] + list(route) + [None]
+    for k in range(gaps):
+        prev, nxt = nodes[k], nodes[k + 1]
+        pair[k, k] = (cost[prev - 1, o - 1] if prev else 0.0) + cost[o - 1, d - 1] + (cost[d - 1, nxt - 1] if nxt else 0.0) \
+            - (cost[prev - 1, nxt - 1] if prev and nxt else 0.0)
+    span = np.zeros((gaps, gaps))
+    for k1 in range(gaps):
+        span[k1, k1:] = np.maximum.accumulate(gap_loads[k1:])
+    pair[span + q > capacity] = np.inf
+    # d before o is not a leg (the capacity mask does not exclude it for unlimited vehicles)
+    pair[np.tril_indices(gaps, -1)] = np.inf
+    k1, k2 = np.unravel_index(int(np.argmin(pair)), pair.shape)
+    if not np.isfinite(pair[k1, k2]):
+        return None
+    return pair[k1, k2], route[:k1] + [o] + route[k1:k2] + [d] + route[k2:]
+
+
+def _best_insertion(plan, v, o, d, q):
+    """best_leg_insertion on the route of vehicle v of a RoutingPlan."""
+    route = plan.routes[v]
+    gap_loads = np.concatenate([[0.0], plan.arc_loads(v), [0.0]]) if route else np.zeros(1)
+    cost = plan.instance_data.arc_cost[plan.vehicle_type(v)]
+    return best_leg_insertion(route, gap_loads, cost, plan.capacity(v), o, d, q)
+
+
+def _leg_nodes(route, a, b):
+    """Nodes from a to b (both included) along a route, or None if the route does not visit a before b."""
+    if a not in route or b not in route:
+        return None
+    pa, pb = route.index(a), route.index(b)
+    return route[pa:pb + 1] if pa < pb else None
+
+
+def _path_simple(plan, w, legs, routes):
+    """
+    True if the legs of w (in any order, possibly not yet joined up) visit every node at most once and
+    pass through the destination of w only at their end; routes(v) gives the route of vehicle v.
+    """
+    destination = int(plan.instance_data.dw[w])
+    nodes = [int(plan.instance_data.ow[w])]
+    for v, a, b in legs:
+        path = _leg_nodes(routes(v), a, b)
+        if path is None or destination in path[1:-1]:
+            return False
+        nodes += path[1:]
+    return len(set(nodes)) == len(nodes)
+
+
+def _keeps_paths_simple(plan, w, v, a, b, new_route):
+    """
+    True if putting leg a -> b of w on vehicle v with route new_route keeps the path of w and the paths of
+    the commodities riding v (whose legs may now span inserted nodes) free of repeated nodes.
+    """
+    def routes(u):
+        return new_route if u == v else plan.routes[u]
+
+    if not _path_simple(plan, w, plan.legs.get(w, []) + [(v, a, b)], routes):
+        return False
+    if set(new_route) <= set(plan.routes[v]):
+        return True
+    return all(
+        _path_simple(plan, other, legs, routes)
+        for other, legs in plan.legs.items() if other != w and any(leg[0] == v for leg in legs)
+    )
+
+
+def _order_legs(plan, w):
+    """Sort the legs of w along its path, from its origin on."""
+    legs, ordered = list(plan.legs[w]), []
+    node = int(plan.instance_data.ow[w])
+    while legs:
+        leg = next((leg for leg in legs if leg[1] == node), legs[0])
+        legs.remove(leg)
+        ordered.append(leg)
+        node = leg[2]
+    plan.legs[w] = ordered
+
+
+def _place_direct(plan, w, o, d, allow_new_vehicle=True, exclude=()):
+    """
+    Put commodity leg o -> d of w on the cheapest vehicle (existing route or new vehicle) where it keeps
+    the commodity paths simple. Returns True if placed.
+    """
+    q = plan.instance_data.qw[w]
+    FC = plan.instance_data.FC
+    options = []
+    opened_types = set()
+    for v in range(plan.Vtotal):
+        if v in exclude:
+            continue
+        if not plan.routes[v]:
+            # Unused vehicle: one candidate per type is enough
+            t = plan.vehicle_type(v)
+            if not allow_new_vehicle or t in opened_types or q > plan.capacity(v):
+                continue
+            opened_types.add(t)
+            option = (FC[t] + plan.instance_data.arc_cost[t, o - 1, d - 1], v, [o, d])
+        else:
+            insertion = _best_insertion(plan, v, o, d, q)
+            if insertion is None:
+                continue
+            option = (insertion[0], v, insertion[1])
+        options.append(option)
+    for _, v, route in sorted(options, key=lambda option: option[0]):
+        if _keeps_paths_simple(plan, w, v, o, d, route):
+            plan.routes[v] = route
+            plan.legs.setdefault(w, []).append((v, o, d))
+            _order_legs(plan, w)
+            return True
+    return False
+
+
+def _place_through_hub(plan, w, o, d, hubs, exclude=()):
+    """
+    Carry leg o -> d of w on two existing routes with one vehicle change at a hub h
+    (o before h on the first route, h before d on the second). Returns True if placed.
+    """
+    q = plan.instance_data.qw[w]
+    origin, destination = int(plan.instance_data.ow[w]), int(plan.instance_data.dw[w])
+    other_legs = plan.legs.get(w, [])
+    vehicles = [v for v in range(plan.Vtotal) if plan.routes[v] and v not in exclude]
+    loads = {v: plan.arc_loads(v) for v in vehicles}
+    best = None
+    for v1 in vehicles:
+        route1 = plan.routes[v1]
+        if o not in route1:
+            continue
+        p1 = route1.index(o)
+        for h_pos in range(p1 + 1, len(route1)):
+            h = route1[h_pos]
+            # Keep the commodity path simple: no pass through its own origin/destination
+            if h in (origin, destination) or destination in route1[p1 + 1:h_pos]:
+                break
+            if loads[v1][p1:h_pos].max() + q > plan.capacity(v1):
+                break
+            # The commodity may ride past non-hub nodes; it only changes vehicle at a hub
+            if h not in hubs:
+                continue
+            for v2 in vehicles:
+                route2 = plan.routes[v2]
+                if v2 == v1 or h not in route2 or d not in route2:
+                    continue
+                p2, p3 = route2.index(h), route2.index(d)
+                if p2 >= p3 or set(route1[p1:h_pos + 1]) & set(route2[p2:p3 + 1]) != {h}:
+                    continue
+                if loads[v2][p2:p3].max() + q > plan.capacity(v2):
+                    continue
+                # The path through h must not cross the other legs of w
+                if other_legs and not _path_simple(plan, w, other_legs + [(v1, o, h), (v2, h, d)], plan.routes.__getitem__):
+                    continue
+                added = 0.0  # Both routes exist already
+                if best is None or added < best[0]:
+                    best = (added, v1, h, v2)
+    if best is None:
+        return False
+    _, v1, h, v2 = best
+    plan.legs.setdefault(w, []).extend([(v1, o, h), (v2, h, d)])
+    _order_legs(plan, w)
+    return True
+
+
+def _two_tour_plan(instance_data):
+    """Fallback: two big vehicles visit all demand nodes in opposite orders and carry every commodity directly."""
+    plan = RoutingPlan(instance_data)
+    nodes = sorted({int(n) for w in instance_data.nonzero_flows for n in (instance_data.ow[w], instance_data.dw[w])})
+    plan.routes[plan.V_small] = nodes
+    plan.routes[plan.V_small + 1] = nodes[::-1]
+    for w in instance_data.nonzero_flows:
+        o, d = int(instance_data.ow[w]), int(instance_data.dw[w])
+        plan.legs[int(w)] = [(plan.V_small if o < d else plan.V_small + 1, o, d)]
+    return plan
+
+
+def greedy_routing_plan(instance_data, hubs=None, no_transfer=(), consolidate=True):
+    """
+    Build a routing plan with the greedy constructive heuristic.
+
+    Parameters:
+    - instance_data: InstanceData of the instance.
+    - hubs: Nodes where commodities may change vehicle (None: every customer node).
+    - no_transfer: Commodities that must stay on one vehicle (e.g. ML direct predictions).
+    - consolidate: If True, run the hub consolidation phase after the direct phase.
+
+    Returns:
+    - RoutingPlan (use .cost() for its objective and .to_solution() for the variable values).
+    """
+    plan = RoutingPlan(instance_data)
+    hubs = set(range(1, plan.N)) if hubs is None else set(hubs)
+    no_transfer = set(int(w) for w in no_transfer)
+    qw = instance_data.qw
+
+    # Phase 1: direct shipments, largest commodities first
+    commodities = sorted((int(w) for w in instance_data.nonzero_flows), key=lambda w: -qw[w])
+    for w in commodities:
+        if not _place_direct(plan, w, int(instance_data.ow[w]), int(instance_data.dw[w])):
+            if int(instance_data.Vind[1]) >= 2:
+                return _two_tour_plan(instance_data)
+            raise ValueError("Greedy heuristic could not place every commodity with the available fleet.")
+
+    # Phase 2: close vehicles whose commodities the other routes can carry (directly or through a hub)
+    improved = consolidate
+    while improved:
+        improved = False
+        current_cost = plan.cost()
+        used = [v for v in range(plan.Vtotal) if plan.routes[v]]
+        # Cheapest-to-absorb vehicles first: fewest commodities
+        used.sort(key=lambda v: sum(leg[0] == v for legs in plan.legs.values() for leg in legs))
+        for u in used:
+            candidate = plan.copy()
+            moved = [(w, a, b) for w, legs in candidate.legs.items() for v, a, b in legs if v == u]
+            for w in {w for w, _, _ in moved}:
+                candidate.legs[w] = [leg for leg in candidate.legs[w] if leg[0] != u]
+            candidate.routes[u] = []
+            placed = True
+            for w, a, b in sorted(moved, key=lambda leg: -qw[leg[0]]):
+                if _place_direct(candidate, w, a, b, allow_new_vehicle=False, exclude={u}):
+                    continue
+                if w not in no_transfer and _place_through_hub(candidate, w, a, b, hubs, exclude={u}):
+                    continue
+                placed = False
+                break
+            if not placed:
+                continue
+            candidate.prune()
+            if candidate.cost() < current_cost - 1e-9:
+                plan = candidate
+                improved = True
+                break
+
+    plan.prune()
+    return plan
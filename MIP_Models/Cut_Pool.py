@@ -0,0 +1,152 @@
+import json
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from Auxiliary_Functions.Instance_Catalog import parse_instance_id
+from MIP_Models.Subtours import cut_constraint
+
+'''
+Persistent pool of the cuts added by the routing callback.
+
+Reverse-arc, subtour and connectivity cuts involve only xijv and Zvi, so they
+hold for every configuration and every flow / hub cost variant of a base
+instance with the same vehicles. The pool records the cuts every solve finds
+and gives them to the next solve of the same key upfront, as lazy constraints,
+instead of letting the callback rediscover them.
+'''
+
+DEFAULT_CUT_POOL_FILE = os.path.join(project_root, "DATA", "cut_pool.json")
+
+
+def cut_pool_key(instance_id, instance_data):
+    """Pool key of an instance: base instance and vehicle set, e.g. '8R-alpha=021|S=8|V=4,2'."""
+    base = parse_instance_id(instance_id)[0]
+    return f"{base}|S={int(instance_data.S)}|V={int(instance_data.Vind[0])},{int(instance_data.Vind[1])}"
+
+
+class CutPool:
+    """
+    Cuts per key with usage counts, size limits and eviction.
+
+    Parameters:
+    - pool_file: JSON file the pool is read from and saved to (None: in memory only).
+    - max_cuts: Cuts kept per key; the least used (found + tight at the optimum, then least recent) are evicted.
+    - max_keys: Keys kept; the least recently used key is evicted.
+    - lazy: Lazy attribute of the seeded constraints (1, 2 or 3, see Gurobi's Lazy attribute).
+    - seed_cuts: If False, cuts are only recorded (to measure how often solves rediscover them).
+    """
+    def __init__(self, pool_file=None, max_cuts=2000, max_keys=200, lazy=1, seed_cuts=True):
+        self.pool_file = pool_file
+        self.max_cuts = max_cuts
+        self.max_keys = max_keys
+        self.lazy = lazy
+        self.seed_cuts = seed_cuts
+        self.solves = 0  # Solves recorded so far (recency clock)
+        self.entries = {}  # key -> {'last_used': solve, 'cuts': {cut: {'found', 'tight', 'last_used'}}}
+        if pool_file is not None:
+            self._read()
+
+    def __len__(self):
+        return sum(len(entry['cuts']) for entry in self.entries.values())
+
+    def cuts(self, key):
+        entry = self.entries.get(key)
+        return list(entry['cuts']) if entry else []
+
+    def seed(self, model, key):
+        """
+        Add the pool cuts of key that are not in the model yet as lazy constraints and start the cut
+        log of the callback. Returns the number of pool cuts in the model.
+        """
+        model._cut_log = []
+        seeded = getattr(model, '_pool_constraints', None)
+        if seeded is None:
+            seeded = model._pool_constraints = {}
+        if not self.seed_cuts:
+            return 0
+        new_cuts = [cut for cut in self.cuts(key) if cut not in seeded]
+        if new_cuts:
+            constraints = [model.addConstr(cut_constraint(model, cut)) for cut in new_cuts]
+            model.setAttr('Lazy', constraints, [self.lazy] * len(constraints))
+            seeded.update(zip(new_cuts, constraints))
+            model.update()
+        return len(seeded)
+
+    def record(self, model, key, tolerance=1e-6):
+        """
+        Record the cuts the callback added in the last solve of model (and the seeded cuts that are
+        tight at its solution) under key, then enforce the limits. Returns the solve statistics:
+        seeded cuts, tight seeded cuts, cuts found and cuts found that were already in the pool.
+        """
+        self.solves += 1
+        entry = self.entries.setdefault(key, {'last_used': self.solves, 'cuts': {}})
+        entry['last_used'] = self.solves
+        cuts = entry['cuts']
+
+        found = list(dict.fromkeys(getattr(model, '_cut_log', [])))
+        stats = {'seeded': 0, 'tight': 0, 'found': len(found), 'found_in_pool': sum(cut in cuts for cut in found)}
+        for cut in found:
+            usage = cuts.setdefault(cut, {'found': 0, 'tight': 0, 'last_used': self.solves})
+            usage['found'] += 1
+            usage['last_used'] = self.solves
+
+        seeded = getattr(model, '_pool_constraints', {})
+        stats['seeded'] = len(seeded)
+        if seeded and model.SolCount > 0:
+            slacks = model.getAttr('Slack', list(seeded.values()))
+            for cut, slack in zip(seeded, slacks):
+                if abs(slack) <= tolerance and cut in cuts:
+                    stats['tight'] += 1
+                    cuts[cut]['tight'] += 1
+                    cuts[cut]['last_used'] = self.solves
+
+        self._evict(key)
+        return stats
+
+    def _evict(self, key):
+        cuts = self.entries[key]['cuts']
+        if len(cuts) > self.max_cuts:
+            ranked = sorted(cuts, key=lambda cut: (cuts[cut]['found'] + cuts[cut]['tight'], cuts[cut]['last_used']))
+            for cut in ranked[:len(cuts) - self.max_cuts]:
+                del cuts[cut]
+        while len(self.entries) > self.max_keys:
+            del self.entries[min(self.entries, key=lambda k: self.entries[k]['last_used'])]
+
+    def save(self):
+        """Write the pool to pool_file."""
+        entries = {
+            key: {
+                'last_used': entry['last_used'],
+                'cuts': [[_encode(cut), usage] for cut, usage in entry['cuts'].items()],
+            }
+            for key, entry in self.entries.items()
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.pool_file)), exist_ok=True)
+        tmp_path = f"{self.pool_file}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump({'solves': self.solves, 'entries': entries}, file)
+        os.replace(tmp_path, self.pool_file)
+
+    def _read(self):
+        try:
+            with open(self.pool_file, 'r') as file:
+                stored = json.load(file)
+        except (OSError, ValueError):
+            return
+        self.solves = stored['solves']
+        self.entries = {
+            key: {'last_used': entry['last_used'], 'cuts': {_decode(cut): usage for cut, usage in entry['cuts']}}
+            for key, entry in stored['entries'].items()
+        }
+
+
+def _encode(cut):
+    return [list(part) if isinstance(part, tuple) else part for part in cut]
+
+
+def _decode(cut):
+    return tuple(tuple(part) if isinstance(part, list) else part for part in cut)
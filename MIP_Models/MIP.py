@@ -10,6 +10,8 @@ project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
 from MIP_Models.Subtours import subtour_elimination_callback
+from MIP_Models.MIPs import extract_solution
+from MIP_Models.Routing_Index import arc_keys, flow_keys, ml_commodities
 
 
 def solve_flow_aware_location_decisions(instance_data, ml_data, use_ml_guidance, use_direct,use_transhipment):
@@ -80,25 +82,24 @@ def solve_all_or_routing_decisions(instance_data, ml_data, fixed_hubs, use_ml_gu
     # Problem dimensions
     N = int(instance_data.S) + 1  # Add depot
     W = int(instance_data.W)
-    V_small_total = instance_data.Vind[0]
-    V_big_total = instance_data.Vind[1]
+    V_small_total = int(instance_data.Vind[0])
+    V_big_total = int(instance_data.Vind[1])
     Vtotal = V_small_total + V_big_total
 
     # Non-zero flows
     nonzero_flows = [w for w, flow in enumerate(instance_data.qw) if flow > 0]
 
     # ML Decisions
-    direct_commodities = ml_data.loc[ml_data['Predictions'] == 0, 'Commodity ID'].tolist()
-    transshipment_commodities = ml_data.loc[ml_data['Predictions'] == 1, 'Commodity ID'].tolist()
+    direct_commodities, transshipment_commodities = ml_commodities(ml_data, nonzero_flows)
 
     # Gurobi model
     model = gp.Model("RoutingDecision")
     model.setParam("TimeLimit", 1800)
 
-    # Decision variables
+    # Decision variables (arcs i != j only; flows only for nonzero commodities on customer arcs)
     av = model.addVars(Vtotal, vtype=GRB.BINARY, name="av")
-    xijv = model.addVars(N, N, Vtotal, vtype=GRB.BINARY, name="xijv")
-    fijvw = model.addVars(N, N, Vtotal, W, vtype=GRB.BINARY, name="fijvw")
+    xijv = model.addVars(arc_keys(N, Vtotal), vtype=GRB.BINARY, name="xijv")
+    fijvw = model.addVars(flow_keys(N, Vtotal, nonzero_flows), vtype=GRB.BINARY, name="fijvw")
     Zvi = model.addVars(Vtotal, N, vtype=GRB.BINARY, name="Zvi")
     yi = model.addVars(N, vtype=GRB.BINARY, name="yi")
 
@@ -292,12 +293,6 @@ def solve_all_or_routing_decisions(instance_data, ml_data, fixed_hubs, use_ml_gu
         for v in range(Vtotal) for i in range(N)
     )
 
-    # Prevent self-loops
-    model.addConstrs(
-        xijv[i, i, v] == 0
-        for v in range(Vtotal) for i in range(N)
-    )
-
     # Lazy constraints parameter
     model.Params.LazyConstraints = 1
 
@@ -332,11 +327,12 @@ def solve_all_or_routing_decisions(instance_data, ml_data, fixed_hubs, use_ml_gu
     # Print results
     if model.Status == GRB.OPTIMAL:
         print("Optimal solution found.")
+        arc_values = model.getAttr('X', xijv)
         for v in range(Vtotal):
             print(f"Vehicle {v}:")
             for i in range(N):
                 for j in range(N):
-                    if xijv[i, j, v].X > 0.05:
+                    if arc_values.get((i, j, v), 0) > 0.05:
                         print(f"  Arc ({i}, {j})")
     
     if model.Status == GRB.OPTIMAL:
@@ -357,27 +353,10 @@ def solve_all_or_routing_decisions(instance_data, ml_data, fixed_hubs, use_ml_gu
         
         # Get the best feasible solution if available
         if model.SolCount > 0:
-            result['time_to_first_feasible']: model._first_feasible_time
-            # Helper function to threshold values
-            def to_binary(value):
-                return 1 if value > 0.05 else 0
-
-            # Extract and threshold the solution values
-            solution = {
-                'fijvw': { (i, j, v, w): to_binary(model._fijvw[i, j, v, w].X)
-                           for i in range(model._N) for j in range(model._N)
-                           for v in range(model._Vtotal) for w in range(model._W) },
-                'xijv': { (i, j, v): to_binary(model._xijv[i, j, v].X)
-                          for i in range(model._N) for j in range(model._N)
-                          for v in range(model._Vtotal) },
-                'av': { v: to_binary(model._av[v].X) for v in range(model._Vtotal) },
-                'Zvi': { (v, i): to_binary(model._Zvi[v, i].X)
-                         for v in range(model._Vtotal) for i in range(model._N) },
-                'yi': { i: to_binary(model._yi[i].X) for i in range(len(model._yi)) }
-            }
-
-            # Update result dictionary
-            result['solution'] = solution
+            result['time_to_first_feasible'] = getattr(model, '_first_feasible_time', None)
+
+            # Update result dictionary (thresholded solution, nonzero entries only)
+            result['solution'] = extract_solution(model)
             result['objective_value'] = model.ObjVal
             result['optimality_gap'] = model.MIPGap
         else:
@@ -1,5 +1,6 @@
 import gurobipy as gp
 from gurobipy import GRB
+import numpy as np
 import pandas as pd
 import os
 import sys
@@ -8,13 +9,20 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
-from MIP_Models.Subtours import subtour_elimination_callback
+from MIP_Models.Subtours import FRACTIONAL_CUTS, subtour_elimination_callback
+from MIP_Models.Telemetry import finish_timeline, start_timeline, timeline_metrics
+from Auxiliary_Functions.Sparse_Solution import SOLUTION_VARIABLES, SparseVariable, solution_shapes
+from MIP_Models.Matrix_Builder import (
+    add_routing_family_matrix,
+    build_base_routing_model_matrix,
+    build_routing_model_matrix,
+)
+from MIP_Models.Routing_Index import active_routing_families, arc_keys, flow_keys, ml_commodities, routing_families
 
 
 def solve_location_decisions(instance_data, ml_data, use_ml_guidance, use_direct,use_transhipment):
     # Problem dimensions
     N = int(instance_data.S) + 1  # Add depot
-    W = int(instance_data.W)
 
     slns =0
     solved = False
@@ -27,7 +35,7 @@ def solve_location_decisions(instance_data, ml_data, use_ml_guidance, use_direct
         considered_commodities = transshipment_commodities
     else:
         # Consider all commodities
-        considered_commodities = [w for w, flow in enumerate(instance_data.qw) if flow > 0]
+        considered_commodities = instance_data.nonzero_flows
 
     # Gurobi model
     if (use_transhipment and len(transshipment_commodities) > 0) or not use_transhipment :
@@ -38,11 +46,14 @@ def solve_location_decisions(instance_data, ml_data, use_ml_guidance, use_direct
 
             # Decision variables
             yi = model.addVars(N, vtype=GRB.BINARY, name="yi")  # Hub selection
-            viw = model.addVars(N, W, vtype=GRB.BINARY, name="viw")  # Assignment of commodities to hubs
+            viw = model.addVars(range(N), list(considered_commodities), vtype=GRB.BINARY, name="viw")  # Assignment of commodities to hubs
 
             # Objective function: Minimize total distance of commodities to hubs
+            od_dist_matrix = instance_data.od_dist_matrix
+            ow_idx = instance_data.ow_idx
+            dw_idx = instance_data.dw_idx
             total_distance = gp.quicksum(
-                viw[i, w] * (instance_data.od_dist_matrix[instance_data.ow[w] - 1][i - 1] + instance_data.od_dist_matrix[i-1][instance_data.dw[w] - 1]) * instance_data.qw[w]
+                viw[i, w] * (od_dist_matrix[ow_idx[w], i - 1] + od_dist_matrix[i - 1, dw_idx[w]]) * instance_data.qw[w]
                 for i in range(1, N) for w in considered_commodities
             )
 
@@ -99,34 +110,29 @@ def solve_location_decisions(instance_data, ml_data, use_ml_guidance, use_direct
     return selected_hubs,slns,solved
 
 
-def solve_routing_decisions (instance_data, ml_data, fixed_hubs, use_ml_guidance, use_location_first,use_direct,use_transhipment):
-     # Problem dimensions
+def build_base_routing_model(instance_data):
+    """
+    Build the part of the routing model shared by every configuration (variables, objective and
+    the constraints that do not depend on the ML guidance) with gp.quicksum expressions.
+    Returns the Gurobi model with the variable containers attached as model._xijv, model._fijvw, ...
+    """
+    # Problem dimensions
     N = int(instance_data.S) + 1  # Add depot
     W = int(instance_data.W)
-    V_small_total = instance_data.Vind[0]
-    V_big_total = instance_data.Vind[1]
+    V_small_total = int(instance_data.Vind[0])
+    V_big_total = int(instance_data.Vind[1])
     Vtotal = V_small_total + V_big_total
 
     # Non-zero flows
-    nonzero_flows = [w for w, flow in enumerate(instance_data.qw) if flow > 0]
-
-    # ML Decisions
-    direct_commodities = ml_data.loc[ml_data['Predictions'] == 0, 'Commodity ID'].tolist()
-    transshipment_commodities = ml_data.loc[ml_data['Predictions'] == 1, 'Commodity ID'].tolist()
+    nonzero_flows = instance_data.nonzero_flows
 
     # Gurobi model
     model = gp.Model("RoutingDecision")
-    
-    if not use_location_first and use_ml_guidance:
-        model.setParam("TimeLimit", 240)
-    
-    if use_location_first:
-        model.setParam("TimeLimit", 120)
 
-    # Decision variables
+    # Decision variables (arcs i != j only; flows only for nonzero commodities on customer arcs)
     av = model.addVars(Vtotal, vtype=GRB.BINARY, name="av")
-    xijv = model.addVars(N, N, Vtotal, vtype=GRB.BINARY, name="xijv")
-    fijvw = model.addVars(N, N, Vtotal, W, vtype=GRB.BINARY, name="fijvw")
+    xijv = model.addVars(arc_keys(N, Vtotal), vtype=GRB.BINARY, name="xijv")
+    fijvw = model.addVars(flow_keys(N, Vtotal, nonzero_flows), vtype=GRB.BINARY, name="fijvw")
     Zvi = model.addVars(Vtotal, N, vtype=GRB.BINARY, name="Zvi")
     yi = model.addVars(N, vtype=GRB.BINARY, name="yi")
 
@@ -135,29 +141,17 @@ def solve_routing_decisions (instance_data, ml_data, fixed_hubs, use_ml_guidance
     # Objective function: Minimize routing and vehicle costs
     veh_costs_term1 = gp.quicksum(instance_data.FC[0] * av[v] for v in range(V_small_total))
     veh_costs_term2 = gp.quicksum(instance_data.FC[1] * av[v] for v in range(V_small_total, Vtotal))
+    arc_cost = instance_data.arc_cost  # OC * dist / speed per vehicle type
     route_term1 = gp.quicksum(
-        (instance_data.OC[0] * instance_data.od_dist_matrix[i - 1][j - 1] / instance_data.speed[0]) * xijv[i, j, v]
+        arc_cost[0, i - 1, j - 1] * xijv[i, j, v]
         for i in range(1, N) for j in range(1, N) if i != j for v in range(V_small_total)
     )
     route_term2 = gp.quicksum(
-        (instance_data.OC[1] * instance_data.od_dist_matrix[i - 1][j - 1] / instance_data.speed[1]) * xijv[i, j, v]
+        arc_cost[1, i - 1, j - 1] * xijv[i, j, v]
         for i in range(1, N) for j in range(1, N) if i != j for v in range(V_small_total, Vtotal)
     )
     model.setObjective(veh_costs_term1 + veh_costs_term2 + route_term1 + route_term2, GRB.MINIMIZE)
 
-    # Fix location decisions if you solve using the location thing first:
-    if use_location_first and len(fixed_hubs)>0:
-        for i in range(1, N):
-            if i in fixed_hubs:
-                model.addConstr(yi[i] == 1, name=f"FixHub_{i}")
-            else:
-                model.addConstr(yi[i] == 0, name=f"FixNoHub_{i}")
-    
-    elif use_location_first and len(fixed_hubs) == 0:
-        for i in range(1, N):
-            model.addConstr(yi[i] == 0)
-
-  
     # Add routing constraints (as in your original routing model)
     # Constraints
 
@@ -169,17 +163,6 @@ def solve_routing_decisions (instance_data, ml_data, fixed_hubs, use_ml_guidance
         for w in nonzero_flows
     )
 
-    if use_ml_guidance and use_direct and len(direct_commodities)>0: 
-        model.addConstrs(
-        gp.quicksum(fijvw[i, j, v, w] for v in range(Vtotal))  
-        <= 1
-        for i in range (1,N)
-        for j in range (1,N)
-        if i !=j 
-        for w in direct_commodities 
-    )
-        
-    
     # (2) Flow conservation at destinations
     model.addConstrs(
         gp.quicksum(fijvw[j, instance_data.dw[w], v, w] for j in range(1, N) if j != instance_data.dw[w] for v in range(Vtotal)) 
@@ -203,29 +186,95 @@ def solve_routing_decisions (instance_data, ml_data, fixed_hubs, use_ml_guidance
         for w in nonzero_flows for v in range(Vtotal) for i in range(1, N) for j in range(1, N) if i != j
     )
 
-    ''''Would need to seperate between transhipment and non transhipment balance if I have both nodes on  the graph'''
-    # Can only change vehicle at transhipment nodes:
-    if use_ml_guidance and use_transhipment and len(transshipment_commodities)>0:
-         model.addConstrs(
-        gp.quicksum(
-            fijvw[i, j, v, w]
-                for i in range(1,N) if i != j
-            )
-        -
-        gp.quicksum(
-            fijvw[j, i, v, w]
-            for i in range(1,N) if i != j
-            )
-        <= yi[j]
+    # Making sense of the transhipment centers opened in location decisions:
+    # if use_location_first and len(fixed_hubs)>0:
+    #     if not use_transhipment:
+    #         for w in nonzero_flows:
+    #             origin = instance_data.ow[w]
+    #             destination = instance_data.dw[w]
+    #             for i in fixed_hubs:
+    #                 if i!= origin and i!= destination:
+    #                     model.addConstr(Ti[i] >= gp.quicksum(fijvw[j,i,v,w] - fijvw[i,j,v,w] for j in range (1,N) j!= i)) 
+
+          
+
+    # (5) Capacity constraints per vehicle
+    model.addConstrs(
+        gp.quicksum(fijvw[i, j, v, w] * instance_data.qw[w] for w in nonzero_flows) <= instance_data.vcap[0] * xijv[i, j, v]
+        for v in range(V_small_total) for i in range(1, N) for j in range(1, N) if i != j
+    )
+
+    # (6) Vehicle arrival and departure balance
+    model.addConstrs(
+        gp.quicksum(xijv[i, j, v] for j in range(N) if i != j) ==
+        gp.quicksum(xijv[j, i, v] for j in range(N) if i != j)
+        for v in range(Vtotal) for i in range(N)
+    )
+
+    # (7) Depot constraints
+    model.addConstrs(
+        gp.quicksum(xijv[0, j, v] for j in range(1, N)) == av[v]
         for v in range(Vtotal)
-        for w in transshipment_commodities  
-        for j in range(1, N) 
-        if j != instance_data.ow[w]
-        if j!= instance_data.dw[w]
     )
 
-    if (not use_ml_guidance) or (not use_transhipment):
-        model.addConstrs(
+# Vehicles must end at the depot
+    model.addConstrs(
+        gp.quicksum(xijv[j, 0, v] for j in range(1, N)) == av[v]
+        for v in range(Vtotal)
+    )
+
+    model.addConstrs(
+        Zvi[v,0] == av[v]
+        for v in range(Vtotal)
+    )
+
+    model.addConstrs(
+        Zvi[v,i] <= av[v]
+        for v in range(Vtotal) for i in range (N)
+    )
+
+    # Vehicles visit a node only if it's included in the solution
+    model.addConstrs(
+        gp.quicksum(xijv[i, j, v] for j in range(N) if i != j) == Zvi[v, i]
+        for v in range(Vtotal) for i in range(N)
+    )
+
+    model._xijv = xijv
+    model._Zvi = Zvi
+    model._av = av
+    model._yi = yi
+    model._fijvw = fijvw
+    model._N = N
+    model._W = W
+    model._Vtotal = Vtotal
+
+    return model
+
+
+def add_routing_family(model, instance_data, family, commodities):
+    """
+    Add one ML-dependent constraint family (see Routing_Index.ROUTING_FAMILIES) to a base routing
+    model for the given commodities and return its constraints.
+    """
+    N = model._N
+    Vtotal = model._Vtotal
+    fijvw = model._fijvw
+    yi = model._yi
+
+    if family == "direct_arc":
+        # Direct commodities use at most one vehicle per arc
+        constraints = model.addConstrs(
+        gp.quicksum(fijvw[i, j, v, w] for v in range(Vtotal))  
+        <= 1
+        for i in range (1,N)
+        for j in range (1,N)
+        if i !=j 
+        for w in commodities 
+    )
+
+    elif family in ("hub_transshipment", "hub_other"):
+        # Can only change vehicle at transhipment nodes:
+        constraints = model.addConstrs(
         gp.quicksum(
             fijvw[i, j, v, w]
                 for i in range(1,N) if i != j
@@ -236,17 +285,16 @@ def solve_routing_decisions (instance_data, ml_data, fixed_hubs, use_ml_guidance
             for i in range(1,N) if i != j
             )
         <= yi[j]
-        for v in range(Vtotal) 
-        for w in nonzero_flows
+        for v in range(Vtotal)
+        for w in commodities  
         for j in range(1, N) 
         if j != instance_data.ow[w]
         if j!= instance_data.dw[w]
+    )
 
-        )
-
-    if use_ml_guidance and use_direct and len(direct_commodities)>0:
+    elif family == "direct_no_change":
         # Direct Commodities no vehicle change:
-        model.addConstrs(
+        constraints = model.addConstrs(
         gp.quicksum(
             fijvw[i, j, v, w]
                 for i in range(1,N) if i != j
@@ -258,15 +306,15 @@ def solve_routing_decisions (instance_data, ml_data, fixed_hubs, use_ml_guidance
             )
         <= 0
         for v in range(Vtotal)
-        for w in direct_commodities
+        for w in commodities
         for j in range(1, N) 
         if j != instance_data.ow[w]
         if j!= instance_data.dw[w]
         )
-    
-    if use_ml_guidance and use_transhipment and len(transshipment_commodities)>0:
+
+    elif family == "transshipment_change":
         # Transhipment Commodities at least one vehicle change:
-        model.addConstrs(
+        constraints = model.addConstrs(
         gp.quicksum(
             fijvw[instance_data.ow[w], j, v, w]
                 for j in range(1,N) if instance_data.ow[w] != j
@@ -278,83 +326,96 @@ def solve_routing_decisions (instance_data, ml_data, fixed_hubs, use_ml_guidance
             )
         <= 1
         for v in range(Vtotal)
-        for w in transshipment_commodities
+        for w in commodities
         )
-    
-    # Making sense of the transhipment centers opened in location decisions:
-    # if use_location_first and len(fixed_hubs)>0:
-    #     if not use_transhipment:
-    #         for w in nonzero_flows:
-    #             origin = instance_data.ow[w]
-    #             destination = instance_data.dw[w]
-    #             for i in fixed_hubs:
-    #                 if i!= origin and i!= destination:
-    #                     model.addConstr(Ti[i] >= gp.quicksum(fijvw[j,i,v,w] - fijvw[i,j,v,w] for j in range (1,N) j!= i)) 
 
-          
+    else:
+        raise ValueError(f"Unknown routing constraint family '{family}'.")
 
-    # (5) Capacity constraints per vehicle
-    model.addConstrs(
-        gp.quicksum(fijvw[i, j, v, w] * instance_data.qw[w] for w in nonzero_flows) <= instance_data.vcap[0] * xijv[i, j, v]
-        for v in range(V_small_total) for i in range(1, N) for j in range(1, N) if i != j
-    )
+    return list(constraints.values())
 
-    # (6) Vehicle arrival and departure balance
-    model.addConstrs(
-        gp.quicksum(xijv[i, j, v] for j in range(N) if i != j) ==
-        gp.quicksum(xijv[j, i, v] for j in range(N) if i != j)
-        for v in range(Vtotal) for i in range(N)
-    )
 
-    # (7) Depot constraints
-    model.addConstrs(
-        gp.quicksum(xijv[0, j, v] for j in range(1, N)) == av[v]
-        for v in range(Vtotal)
-    )
+def build_routing_model(instance_data, ml_data, fixed_hubs, use_ml_guidance, use_location_first, use_direct, use_transhipment):
+    """
+    Build the routing model of one configuration with gp.quicksum expressions.
+    Returns the Gurobi model with the variable containers attached as model._xijv, model._fijvw, ...
+    """
+    model = build_base_routing_model(instance_data)
+    N = model._N
+    yi = model._yi
 
-# Vehicles must end at the depot
-    model.addConstrs(
-        gp.quicksum(xijv[j, 0, v] for j in range(1, N)) == av[v]
-        for v in range(Vtotal)
-    )
+    # Fix location decisions if you solve using the location thing first:
+    if use_location_first and len(fixed_hubs)>0:
+        for i in range(1, N):
+            if i in fixed_hubs:
+                model.addConstr(yi[i] == 1, name=f"FixHub_{i}")
+            else:
+                model.addConstr(yi[i] == 0, name=f"FixNoHub_{i}")
+    
+    elif use_location_first and len(fixed_hubs) == 0:
+        for i in range(1, N):
+            model.addConstr(yi[i] == 0)
 
-    model.addConstrs(
-        Zvi[v,0] == av[v]
-        for v in range(Vtotal)
-    )
+    # ML-dependent constraint families
+    families = routing_families(instance_data.nonzero_flows, *ml_commodities(ml_data, instance_data.nonzero_flows))
+    for family in active_routing_families(families, use_ml_guidance, use_direct, use_transhipment):
+        add_routing_family(model, instance_data, family, families[family])
 
-    model.addConstrs(
-        Zvi[v,i] <= av[v]
-        for v in range(Vtotal) for i in range (N)
-    )
+    return model
 
-    # Vehicles visit a node only if it's included in the solution
-    model.addConstrs(
-        gp.quicksum(xijv[i, j, v] for j in range(N) if i != j) == Zvi[v, i]
-        for v in range(Vtotal) for i in range(N)
-    )
 
-    # Prevent self-loops
-    model.addConstrs(
-        xijv[i, i, v] == 0
-        for v in range(Vtotal) for i in range(N)
-    )
+def optimize_routing_model(model, use_ml_guidance, use_location_first, fractional_cuts=None):
+    """
+    Solve a built routing model with the subtour elimination callback and collect the result
+    (status, objective, gap, times, the thresholded solution and the incumbent / bound timeline
+    with its primal integral, see Telemetry.py).
+
+    Parameters:
+    - fractional_cuts: None (integer solutions only), or a dict of Subtours.FRACTIONAL_CUTS settings
+      ({} for the defaults) to also add subtour cuts of fractional node relaxations at MIPNODE.
+    """
+    N = model._N
+    Vtotal = model._Vtotal
+    xijv = model._xijv
+
+    # Time limit of the configuration (no limit for the baseline)
+    model.setParam("TimeLimit", GRB.INFINITY)
+    if not use_location_first and use_ml_guidance:
+        model.setParam("TimeLimit", 240)
+    
+    if use_location_first:
+        model.setParam("TimeLimit", 120)
 
     # Lazy constraints parameter
     model.Params.LazyConstraints = 1
 
-    # Register callback and optimize
-    model._xijv = xijv
-    model._Zvi = Zvi
-    model._av = av
-    model._N = N
-    model._Vtotal = Vtotal
+    # User cuts of fractional node relaxations (need presolve reductions that keep the original space)
+    model._fractional_cuts = None if fractional_cuts is None else {**FRACTIONAL_CUTS, **fractional_cuts}
+    model.Params.PreCrush = 0 if fractional_cuts is None else 1
+    model._user_cuts = 0
 
-    first_feasible_time = None
+    # Register callback and optimize
+    model._first_feasible_time = None
+    model._callback_time = 0.0
+    model._callback_calls = 0
+    model._lazy_cuts = 0
+    start_timeline(model)
     start_time = model.Runtime  # Get the start time
 
     model.optimize(subtour_elimination_callback)
 
+    timeline = finish_timeline(model)
+    telemetry = timeline_metrics(timeline)
+
+    # Every telemetry value, the time to first incumbent included, comes from the timeline
+    first_incumbent = telemetry['time_to_first_incumbent']
+    time_to_gap = telemetry['time_to_1perc_gap']
+    print(f"Time to first incumbent: {'-' if first_incumbent is None else f'{first_incumbent:.2f} s'}, "
+          f"time to 1% gap: {'-' if time_to_gap is None else f'{time_to_gap:.2f} s'}, "
+          f"primal integral: {telemetry['primal_integral']:.3f}, final gap: {model.MIPGap if model.SolCount > 0 else '-'}")
+    print(f"Subtour callback: {model._callback_calls} calls, {model._user_cuts} user cuts, "
+          f"{model._callback_time:.3f} s of {model.Runtime:.3f} s solving time")
+
     # Collect results
     result = {
         'solution': None,
@@ -363,7 +424,16 @@ def solve_routing_decisions (instance_data, ml_data, fixed_hubs, use_ml_guidance
         'status': model.Status,
         'time_to_first_feasible': None,
         'total_solving_time': model.Runtime,
-        'solution_count': model.SolCount
+        'solution_count': model.SolCount,
+        'callback_time': model._callback_time,
+        'callback_calls': model._callback_calls,
+        'lazy_cuts': model._lazy_cuts,
+        'user_cuts': model._user_cuts,
+        'objective_bound': model.ObjBound if model.SolCount > 0 else None,
+        'node_count': model.NodeCount,
+        'timeline': timeline,
+        'primal_integral': telemetry['primal_integral'],
+        'time_to_1perc_gap': telemetry['time_to_1perc_gap'],
     }
 
     # Check model status
@@ -374,52 +444,27 @@ def solve_routing_decisions (instance_data, ml_data, fixed_hubs, use_ml_guidance
     # Print results
     if model.Status == GRB.OPTIMAL:
         print("Optimal solution found.")
+        arc_values = _var_values(model, xijv)
         for v in range(Vtotal):
             print(f"Vehicle {v}:")
             for i in range(N):
                 for j in range(N):
-                    if xijv[i, j, v].X > 0.05:
+                    if arc_values.get((i, j, v), 0) > 0.05:
                         print(f"  Arc ({i}, {j})")
     
     if model.Status == GRB.OPTIMAL:
         print("Optimal solution found.")
 
-    model._xijv = xijv
-    model._Zvi = Zvi
-    model._av = av
-    model._yi = yi
-    model._fijvw = fijvw
-    model._N = N
-    model._W = W
-    model._Vtotal = Vtotal
-
     # Check model status
     if model.Status in [GRB.OPTIMAL, GRB.TIME_LIMIT, GRB.INTERRUPTED]:
         print(f"Model solved with status {model.Status}.")
         
         # Get the best feasible solution if available
         if model.SolCount > 0:
-            result['time_to_first_feasible']: model._first_feasible_time
-            # Helper function to threshold values
-            def to_binary(value):
-                return 1 if value > 0.05 else 0
-
-            # Extract and threshold the solution values
-            solution = {
-                'fijvw': { (i, j, v, w): to_binary(model._fijvw[i, j, v, w].X)
-                           for i in range(model._N) for j in range(model._N)
-                           for v in range(model._Vtotal) for w in range(model._W) },
-                'xijv': { (i, j, v): to_binary(model._xijv[i, j, v].X)
-                          for i in range(model._N) for j in range(model._N)
-                          for v in range(model._Vtotal) },
-                'av': { v: to_binary(model._av[v].X) for v in range(model._Vtotal) },
-                'Zvi': { (v, i): to_binary(model._Zvi[v, i].X)
-                         for v in range(model._Vtotal) for i in range(model._N) },
-                'yi': { i: to_binary(model._yi[i].X) for i in range(len(model._yi)) }
-            }
-
-            # Update result dictionary
-            result['solution'] = solution
+            result['time_to_first_feasible'] = first_incumbent
+
+            # Update result dictionary (thresholded solution, nonzero entries only)
+            result['solution'] = extract_solution(model)
             result['objective_value'] = model.ObjVal
             result['optimality_gap'] = model.MIPGap
         else:
@@ -429,7 +474,124 @@ def solve_routing_decisions (instance_data, ml_data, fixed_hubs, use_ml_guidance
         print("Model is infeasible.")
     elif model.Status == GRB.UNBOUNDED:
         print("Model is unbounded.")
+
+    return result
+
+
+def solve_routing_decisions (instance_data, ml_data, fixed_hubs, use_ml_guidance, use_location_first,use_direct,use_transhipment, builder="quicksum",
+                             start=None, fractional_cuts=None, cut_pool=None, cut_pool_key=None):
+    """
+    Build and solve the routing model.
+
+    Parameters:
+    - builder: 'quicksum' (build_routing_model) or 'matrix' (build_routing_model_matrix,
+      the same model assembled with the matrix API).
+    - start: Optional solution of another configuration (result['solution']) used as MIP start.
+    - fractional_cuts: Settings of the fractional subtour cuts (see optimize_routing_model).
+    - cut_pool / cut_pool_key: Optional Cut_Pool.CutPool seeding the model with the known cuts of the key
+      and recording the cuts this solve finds.
+    """
+    model = ROUTING_MODEL_BUILDERS[builder](
+        instance_data, ml_data, fixed_hubs, use_ml_guidance, use_location_first, use_direct, use_transhipment
+    )
+    warm_start = apply_mip_start(model, start) if start is not None else None
+    if cut_pool is not None:
+        cut_pool.seed(model, cut_pool_key)
+    result = optimize_routing_model(model, use_ml_guidance, use_location_first, fractional_cuts)
+    result['warm_start'] = warm_start
+    result['cut_pool'] = cut_pool.record(model, cut_pool_key) if cut_pool is not None else None
     
     del model
     
-    return result
\ No newline at end of file
+    return result
+
+
+def apply_mip_start(model, solution, tolerance=1e-6):
+    """
+    Load a routing solution (result['solution'] of another configuration) as the MIP start of a
+    built routing model.
+
+    The start is clipped to the variable bounds and checked against every constraint of the model.
+    If it violates some, the variables of the violated constraints are left undefined, so Gurobi
+    completes this partial start instead.
+
+    Returns:
+    - 'feasible' if the full start satisfies the model, 'repaired' if a partial start was loaded.
+    """
+    model.update()
+    variables, values = [], []
+    for name in ('av', 'xijv', 'fijvw', 'Zvi', 'yi'):
+        container = getattr(model, f"_{name}")
+        given = solution[name]
+        variables.extend(container.values())
+        values.extend(given.get(key, 0) for key in container.keys())
+
+    x = np.zeros(model.NumVars)
+    x[[var.index for var in variables]] = values
+    all_vars = model.getVars()
+    x = np.clip(x, model.getAttr('LB', all_vars), model.getAttr('UB', all_vars))
+
+    # Row activities against the senses and right-hand sides
+    constraints = model.getConstrs()
+    A = model.getA().tocsr()
+    activity = A @ x
+    rhs = np.asarray(model.getAttr('RHS', constraints))
+    sense = np.asarray(model.getAttr('Sense', constraints))
+    violated = np.flatnonzero(
+        ((sense == GRB.LESS_EQUAL) & (activity > rhs + tolerance))
+        | ((sense == GRB.GREATER_EQUAL) & (activity < rhs - tolerance))
+        | ((sense == GRB.EQUAL) & (np.abs(activity - rhs) > tolerance))
+    )
+
+    status = 'feasible'
+    if len(violated) > 0:
+        x[np.unique(A[violated].indices)] = GRB.UNDEFINED
+        status = 'repaired'
+    model.setAttr('Start', all_vars, x.tolist())
+    return status
+
+
+def extract_solution(model, threshold=0.05):
+    """
+    Thresholded solution of a solved routing model as {name: SparseVariable} (see Sparse_Solution.py).
+
+    The values of all variables are read with one getAttr call and only the entries above threshold
+    are kept. The variable list and the keys of every family are built at the first call, so models
+    re-solved per configuration (RoutingSession) reuse them.
+    """
+    shapes = solution_shapes(model._N, model._Vtotal, model._W)
+    index = getattr(model, '_solution_index', None)
+    if index is None:
+        variables, families = [], []
+        for name in SOLUTION_VARIABLES:
+            container = getattr(model, f"_{name}")
+            # Explicit width: a family can be empty (e.g. no nonzero commodity, so no fijvw)
+            keys = np.array(list(container.keys()), dtype=np.int64).reshape(len(container), len(shapes[name]))
+            families.append((name, len(variables), keys))
+            variables.extend(container.values())
+        index = (variables, families)
+        model._solution_index = index
+    variables, families = index
+
+    values = np.array(model.getAttr('X', variables)) > threshold
+    return {
+        name: SparseVariable(keys[values[offset:offset + len(keys)]], shapes[name])
+        for name, offset, keys in families
+    }
+
+
+def _var_values(model, variables):
+    """Solution values of a tupledict as a {key: value} dict (one attribute query)."""
+    return model.getAttr('X', variables)
+
+
+ROUTING_MODEL_BUILDERS = {
+    "quicksum": build_routing_model,
+    "matrix": build_routing_model_matrix,
+}
+
+# Base model and constraint-family builders, used by Routing_Session.RoutingSession
+ROUTING_BASE_BUILDERS = {
+    "quicksum": (build_base_routing_model, add_routing_family),
+    "matrix": (build_base_routing_model_matrix, add_routing_family_matrix),
+}
@@ -0,0 +1,351 @@
+import itertools
+import os
+import sys
+
+import gurobipy as gp
+from gurobipy import GRB
+import numpy as np
+import scipy.sparse as sp
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from MIP_Models.Routing_Index import active_routing_families, arc_keys, flow_keys, ml_commodities, routing_families
+
+'''
+Matrix-API builder of the routing model.
+
+Builds the same model as MIPs.build_routing_model (base model and ML-dependent
+constraint families alike), but every constraint family is assembled as one
+sparse coefficient matrix over all model variables (NumPy index arithmetic, no
+per-term Python expressions) and added with addMConstr.
+Variable order and names are the same as in the quicksum builder.
+'''
+
+class _VariableIndex:
+    """
+    Column index of every routing variable. Variables are created as av, xijv, fijvw, Zvi, yi;
+    xijv over the arcs i != j (Routing_Index.arc_keys) and fijvw over the customer arcs and
+    nonzero commodities (Routing_Index.flow_keys).
+    """
+    def __init__(self, N, Vtotal, W, nonzero_flows):
+        self.N, self.V, self.K = N, Vtotal, len(nonzero_flows)
+        # Position of every commodity among the nonzero ones (-1 for zero demand)
+        self.commodity_position = np.full(W, -1)
+        self.commodity_position[nonzero_flows] = np.arange(self.K)
+        self.x0 = Vtotal
+        self.f0 = self.x0 + N * (N - 1) * Vtotal
+        self.z0 = self.f0 + (N - 1) * (N - 2) * Vtotal * self.K
+        self.y0 = self.z0 + Vtotal * N
+        self.num_vars = self.y0 + N
+
+    def a(self, v):
+        return v
+
+    def x(self, i, j, v):
+        arc = i * (self.N - 1) + j - (j > i)
+        return self.x0 + arc * self.V + v
+
+    def f(self, i, j, v, w):
+        arc = (i - 1) * (self.N - 2) + (j - 1) - (j > i)
+        return self.f0 + (arc * self.V + v) * self.K + self.commodity_position[w]
+
+    def z(self, v, i):
+        return self.z0 + v * self.N + i
+
+    def y(self, i):
+        return self.y0 + i
+
+
+class _Rows:
+    """Accumulates the COO triplets of one constraint family."""
+    def __init__(self):
+        self.rows, self.cols, self.vals = [], [], []
+        self.num_rows = 0
+
+    def add(self, rows, cols, vals):
+        rows, cols = np.broadcast_arrays(rows, cols)
+        self.rows.append(rows.ravel())
+        self.cols.append(cols.ravel())
+        self.vals.append(np.broadcast_to(vals, cols.shape).ravel().astype(float))
+
+    def matrix(self, num_vars):
+        if not self.rows:
+            return sp.csr_matrix((self.num_rows, num_vars))
+        return sp.csr_matrix(
+            (np.concatenate(self.vals), (np.concatenate(self.rows), np.concatenate(self.cols))),
+            shape=(self.num_rows, num_vars),
+        )
+
+
+def _add_family(model, index, family, sense, rhs, name):
+    if family.num_rows == 0:
+        return []
+    return model.addMConstr(
+        family.matrix(index.num_vars), None, sense, np.broadcast_to(rhs, family.num_rows).astype(float), name=name
+    ).tolist()
+
+
+def _node_flow_terms(family, index, nodes, commodities, vehicles, out_coef, in_coef):
+    """
+    Add, per row r, out_coef * f[node, j, v, w] + in_coef * f[j, node, v, w] summed over
+    customer nodes j != node and the vehicles of the row.
+
+    Parameters:
+    - nodes, commodities: Node and commodity of every row (length R).
+    - vehicles: R x nv array of the vehicles summed in every row.
+    """
+    customers = np.arange(1, index.N)
+    rows = family.num_rows + np.arange(len(nodes))[:, None, None]
+    node = np.asarray(nodes)[:, None, None]
+    w = np.asarray(commodities)[:, None, None]
+    j = customers[None, :, None]
+    v = np.asarray(vehicles)[:, None, :]
+    mask = np.broadcast_to(j != node, np.broadcast_shapes(j.shape, node.shape, v.shape))
+    rows = np.broadcast_to(rows, mask.shape)[mask]
+    family.add(rows, np.broadcast_to(index.f(node, j, v, w), mask.shape)[mask], out_coef)
+    family.add(rows, np.broadcast_to(index.f(j, node, v, w), mask.shape)[mask], in_coef)
+
+
+def build_base_routing_model_matrix(instance_data):
+    """
+    Build the base routing model of MIPs.build_base_routing_model with the Gurobi matrix API.
+    Returns the Gurobi model with the variable containers attached as model._xijv, model._fijvw, ...
+    """
+    # Problem dimensions
+    N = int(instance_data.S) + 1  # Add depot
+    W = int(instance_data.W)
+    V_small_total = int(instance_data.Vind[0])
+    V_big_total = int(instance_data.Vind[1])
+    Vtotal = V_small_total + V_big_total
+
+    customers = np.arange(1, N)
+    nodes = np.arange(N)
+    vehicles = np.arange(Vtotal)
+    all_vehicles = vehicles[None, :]
+
+    # Non-zero flows and their origins/destinations
+    nonzero_flows = np.asarray(instance_data.nonzero_flows)
+    ow = np.asarray(instance_data.ow)
+    dw = np.asarray(instance_data.dw)
+
+    # Gurobi model
+    model = gp.Model("RoutingDecision")
+
+    # Decision variables (arcs i != j only; flows only for nonzero commodities on customer arcs)
+    index = _VariableIndex(N, Vtotal, W, nonzero_flows)
+    x_keys = arc_keys(N, Vtotal)
+    f_keys = flow_keys(N, Vtotal, nonzero_flows)
+    av = model.addMVar(Vtotal, vtype=GRB.BINARY)
+    xijv = model.addMVar(len(x_keys), vtype=GRB.BINARY)
+    fijvw = model.addMVar(len(f_keys), vtype=GRB.BINARY)
+    Zvi = model.addMVar((Vtotal, N), vtype=GRB.BINARY)
+    yi = model.addMVar(N, vtype=GRB.BINARY)
+    Zvi_keys = list(itertools.product(range(Vtotal), range(N)))
+    # Same variable names as the quicksum builder
+    for variables, name, keys in [(av, "av", range(Vtotal)), (xijv, "xijv", x_keys), (fijvw, "fijvw", f_keys),
+                                  (Zvi, "Zvi", Zvi_keys), (yi, "yi", range(N))]:
+        model.setAttr('VarName', variables.reshape(-1).tolist(), [
+            f"{name}[{','.join(map(str, key))}]" if isinstance(key, tuple) else f"{name}[{key}]" for key in keys
+        ])
+    model.update()
+
+    # Objective function: Minimize routing and vehicle costs
+    c = np.zeros(index.num_vars)
+    c[index.a(vehicles)] = np.where(vehicles < V_small_total, instance_data.FC[0], instance_data.FC[1])
+    i, j, v = np.meshgrid(customers, customers, vehicles, indexing='ij')
+    off_diagonal = i != j
+    i, j, v = i[off_diagonal], j[off_diagonal], v[off_diagonal]
+    c[index.x(i, j, v)] = instance_data.arc_cost[(v >= V_small_total).astype(int), i - 1, j - 1]
+    model.setMObjective(None, c, 0.0, sense=GRB.MINIMIZE)
+
+    # Commodity rows
+    w_nz = nonzero_flows
+    o_nz = ow[w_nz]
+    d_nz = dw[w_nz]
+
+    # (1) Flow conservation at origins
+    family = _Rows()
+    _node_flow_terms(family, index, o_nz, w_nz, np.broadcast_to(all_vehicles, (len(w_nz), Vtotal)), 1.0, -1.0)
+    family.num_rows = len(w_nz)
+    _add_family(model, index, family, GRB.EQUAL, 1.0, "FlowOrigin")
+
+    # (2) Flow conservation at destinations
+    family = _Rows()
+    _node_flow_terms(family, index, d_nz, w_nz, np.broadcast_to(all_vehicles, (len(w_nz), Vtotal)), -1.0, 1.0)
+    family.num_rows = len(w_nz)
+    _add_family(model, index, family, GRB.EQUAL, 1.0, "FlowDestination")
+
+    # (3) Flow conservation at intermediate nodes
+    w, i = np.meshgrid(w_nz, customers, indexing='ij')
+    keep = (i != ow[w]) & (i != dw[w])
+    w, i = w[keep], i[keep]
+    family = _Rows()
+    _node_flow_terms(family, index, i, w, np.broadcast_to(all_vehicles, (len(w), Vtotal)), -1.0, 1.0)
+    family.num_rows = len(w)
+    _add_family(model, index, family, GRB.EQUAL, 0.0, "flow_conservation")
+
+    # (4) Flow arc and vehicle usage relationship
+    w, v, i, j = np.meshgrid(w_nz, vehicles, customers, customers, indexing='ij')
+    keep = i != j
+    w, v, i, j = w[keep], v[keep], i[keep], j[keep]
+    family = _Rows()
+    rows = np.arange(len(w))
+    family.add(rows, index.f(i, j, v, w), 1.0)
+    family.add(rows, index.x(i, j, v), -1.0)
+    family.num_rows = len(w)
+    _add_family(model, index, family, GRB.LESS_EQUAL, 0.0, "FlowArc")
+
+    # (5) Capacity constraints per vehicle
+    v, i, j = np.meshgrid(np.arange(V_small_total), customers, customers, indexing='ij')
+    keep = i != j
+    v, i, j = v[keep], i[keep], j[keep]
+    family = _Rows()
+    rows = np.arange(len(v))
+    family.add(rows[:, None], index.f(i[:, None], j[:, None], v[:, None], w_nz[None, :]), np.asarray(instance_data.qw)[w_nz][None, :])
+    family.add(rows, index.x(i, j, v), -instance_data.vcap[0])
+    family.num_rows = len(v)
+    _add_family(model, index, family, GRB.LESS_EQUAL, 0.0, "Capacity")
+
+    # (6) Vehicle arrival and departure balance
+    v, i, j = np.meshgrid(vehicles, nodes, nodes, indexing='ij')
+    rows = np.broadcast_to((np.arange(Vtotal)[:, None] * N + nodes[None, :])[:, :, None], v.shape)
+    keep = i != j
+    family = _Rows()
+    family.add(rows[keep], index.x(i, j, v)[keep], 1.0)
+    family.add(rows[keep], index.x(j, i, v)[keep], -1.0)
+    family.num_rows = Vtotal * N
+    _add_family(model, index, family, GRB.EQUAL, 0.0, "VehicleBalance")
+
+    # (7) Depot constraints / Vehicles must end at the depot
+    for outgoing, name in [(True, "DepotStart"), (False, "DepotEnd")]:
+        family = _Rows()
+        i, j = (0, customers[None, :]) if outgoing else (customers[None, :], 0)
+        family.add(vehicles[:, None], index.x(i, j, vehicles[:, None]), 1.0)
+        family.add(vehicles, index.a(vehicles), -1.0)
+        family.num_rows = Vtotal
+        _add_family(model, index, family, GRB.EQUAL, 0.0, name)
+
+    family = _Rows()
+    family.add(vehicles, index.z(vehicles, 0), 1.0)
+    family.add(vehicles, index.a(vehicles), -1.0)
+    family.num_rows = Vtotal
+    _add_family(model, index, family, GRB.EQUAL, 0.0, "DepotVisit")
+
+    family = _Rows()
+    rows = np.arange(Vtotal * N).reshape(Vtotal, N)
+    family.add(rows, index.z(vehicles[:, None], nodes[None, :]), 1.0)
+    family.add(rows, index.a(vehicles)[:, None], -1.0)
+    family.num_rows = Vtotal * N
+    _add_family(model, index, family, GRB.LESS_EQUAL, 0.0, "VisitIfAcquired")
+
+    # Vehicles visit a node only if it's included in the solution
+    v, i, j = np.meshgrid(vehicles, nodes, nodes, indexing='ij')
+    rows = np.broadcast_to((np.arange(Vtotal)[:, None] * N + nodes[None, :])[:, :, None], v.shape)
+    keep = i != j
+    family = _Rows()
+    family.add(rows[keep], index.x(i, j, v)[keep], 1.0)
+    family.add(np.arange(Vtotal * N), index.z(vehicles[:, None], nodes[None, :]).ravel(), -1.0)
+    family.num_rows = Vtotal * N
+    _add_family(model, index, family, GRB.EQUAL, 0.0, "VisitArcs")
+
+    # Variable containers as tupledicts, as in the quicksum builder
+    model._xijv = gp.tupledict(zip(x_keys, xijv.tolist()))
+    model._Zvi = gp.tupledict(zip(Zvi_keys, Zvi.reshape(-1).tolist()))
+    model._av = gp.tupledict(zip(range(Vtotal), av.tolist()))
+    model._yi = gp.tupledict(zip(range(N), yi.tolist()))
+    model._fijvw = gp.tupledict(zip(f_keys, fijvw.tolist()))
+    model._N = N
+    model._W = W
+    model._Vtotal = Vtotal
+    model._index = index
+
+    return model
+
+
+def add_routing_family_matrix(model, instance_data, family, commodities):
+    """
+    Add one ML-dependent constraint family (see Routing_Index.ROUTING_FAMILIES) to a base routing
+    model of build_base_routing_model_matrix for the given commodities and return its constraints.
+    """
+    index = model._index
+    N = model._N
+    customers = np.arange(1, N)
+    vehicles = np.arange(model._Vtotal)
+    ow = np.asarray(instance_data.ow)
+    dw = np.asarray(instance_data.dw)
+    commodities = np.asarray(commodities, dtype=int)
+
+    def vehicle_change_rows(with_hub, name):
+        # sum_i f[i,j,v,w] - f[j,i,v,w] <= yi[j] (or <= 0) at nodes j other than the commodity's origin/destination
+        v, w, j = np.meshgrid(vehicles, commodities, customers, indexing='ij')
+        keep = (j != ow[w]) & (j != dw[w])
+        v, w, j = v[keep], w[keep], j[keep]
+        rows = _Rows()
+        _node_flow_terms(rows, index, j, w, v[:, None], -1.0, 1.0)
+        if with_hub:
+            rows.add(np.arange(len(w)), index.y(j), -1.0)
+        rows.num_rows = len(w)
+        return _add_family(model, index, rows, GRB.LESS_EQUAL, 0.0, name)
+
+    if family == "direct_arc":
+        # Direct commodities use at most one vehicle per arc
+        i, j, w = np.meshgrid(customers, customers, commodities, indexing='ij')
+        keep = i != j
+        i, j, w = i[keep], j[keep], w[keep]
+        rows = _Rows()
+        rows.add(np.arange(len(w))[:, None], index.f(i[:, None], j[:, None], vehicles[None, :], w[:, None]), 1.0)
+        rows.num_rows = len(w)
+        return _add_family(model, index, rows, GRB.LESS_EQUAL, 1.0, "DirectArc")
+
+    if family in ("hub_transshipment", "hub_other"):
+        # Can only change vehicle at transhipment nodes:
+        return vehicle_change_rows(True, "TransshipmentHub")
+
+    if family == "direct_no_change":
+        # Direct Commodities no vehicle change:
+        return vehicle_change_rows(False, "DirectNoChange")
+
+    if family == "transshipment_change":
+        # Transhipment Commodities at least one vehicle change:
+        v, w = np.meshgrid(vehicles, commodities, indexing='ij')
+        v, w = v.ravel(), w.ravel()
+        rows = _Rows()
+        row = np.arange(len(w))[:, None]
+        o, d = ow[w][:, None], dw[w][:, None]
+        j = customers[None, :]
+        keep = np.broadcast_to(j != o, (len(w), N - 1))
+        rows.add(np.broadcast_to(row, keep.shape)[keep], index.f(o, j, v[:, None], w[:, None])[keep], 1.0)
+        keep = np.broadcast_to(j != d, (len(w), N - 1))
+        rows.add(np.broadcast_to(row, keep.shape)[keep], index.f(j, d, v[:, None], w[:, None])[keep], 1.0)
+        rows.num_rows = len(w)
+        return _add_family(model, index, rows, GRB.LESS_EQUAL, 1.0, "TransshipmentChange")
+
+    raise ValueError(f"Unknown routing constraint family '{family}'.")
+
+
+def build_routing_model_matrix(instance_data, ml_data, fixed_hubs, use_ml_guidance, use_location_first, use_direct, use_transhipment):
+    """
+    Build the routing model of MIPs.build_routing_model with the Gurobi matrix API.
+    Returns the Gurobi model with the variable containers attached as model._xijv, model._fijvw, ...
+    """
+    model = build_base_routing_model_matrix(instance_data)
+    index = model._index
+    N = model._N
+    customers = np.arange(1, N)
+
+    # Fix location decisions if you solve using the location thing first:
+    if use_location_first:
+        fixed = np.isin(customers, fixed_hubs)
+        rows = _Rows()
+        rows.add(np.arange(N - 1), index.y(customers), 1.0)
+        rows.num_rows = N - 1
+        _add_family(model, index, rows, GRB.EQUAL, fixed.astype(float), "FixHub")
+
+    # ML-dependent constraint families
+    families = routing_families(instance_data.nonzero_flows, *ml_commodities(ml_data, instance_data.nonzero_flows))
+    for family in active_routing_families(families, use_ml_guidance, use_direct, use_transhipment):
+        add_routing_family_matrix(model, instance_data, family, families[family])
+
+    return model
@@ -0,0 +1,79 @@
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+'''
+Index sets of the routing model.
+
+Arc variables exist only for i != j and flow variables only for nonzero
+commodities on customer arcs, so variables the model would force to zero are
+never created. Solutions keyed on these sets treat missing keys as 0.
+'''
+
+def arc_keys(N, Vtotal):
+    """Keys (i, j, v) of the arc variables: every ordered node pair i != j, depot included."""
+    return [(i, j, v) for i in range(N) for j in range(N) if i != j for v in range(Vtotal)]
+
+
+def flow_keys(N, Vtotal, nonzero_flows):
+    """Keys (i, j, v, w) of the flow variables: customer arcs i != j and nonzero commodities only."""
+    commodities = [int(w) for w in nonzero_flows]
+    return [
+        (i, j, v, w)
+        for i in range(1, N) for j in range(1, N) if i != j
+        for v in range(Vtotal) for w in commodities
+    ]
+
+
+def ml_commodities(ml_data, nonzero_flows):
+    """Direct (prediction 0) and transhipment (prediction 1) commodities of the ML input, restricted to nonzero flows."""
+    nonzero = set(int(w) for w in nonzero_flows)
+    direct = [w for w in ml_data.loc[ml_data['Predictions'] == 0, 'Commodity ID'].tolist() if w in nonzero]
+    transshipment = [w for w in ml_data.loc[ml_data['Predictions'] == 1, 'Commodity ID'].tolist() if w in nonzero]
+    return direct, transshipment
+
+
+# ML-dependent constraint families of the routing model (all other constraints are shared by every configuration):
+# - direct_arc: direct commodities use at most one vehicle per arc
+# - hub_transshipment / hub_other: vehicle changes only at hubs, for the transhipment / remaining commodities
+# - direct_no_change: direct commodities never change vehicle
+# - transshipment_change: transhipment commodities change vehicle at least once
+ROUTING_FAMILIES = ("direct_arc", "hub_transshipment", "hub_other", "direct_no_change", "transshipment_change")
+
+
+def routing_families(nonzero_flows, direct_commodities, transshipment_commodities):
+    """Commodities of every constraint family in ROUTING_FAMILIES."""
+    transshipment = set(transshipment_commodities)
+    return {
+        "direct_arc": list(direct_commodities),
+        "hub_transshipment": list(transshipment_commodities),
+        "hub_other": [int(w) for w in nonzero_flows if int(w) not in transshipment],
+        "direct_no_change": list(direct_commodities),
+        "transshipment_change": list(transshipment_commodities),
+    }
+
+
+def active_routing_families(families, use_ml_guidance, use_direct, use_transhipment):
+    """
+    Names of the families a configuration adds. The hub constraints cover the transhipment
+    commodities under ML transhipment guidance and all nonzero commodities otherwise.
+    """
+    ml_direct = use_ml_guidance and use_direct and len(families["direct_arc"]) > 0
+    ml_transshipment = use_ml_guidance and use_transhipment and len(families["hub_transshipment"]) > 0
+    no_transshipment_guidance = (not use_ml_guidance) or (not use_transhipment)
+
+    active = []
+    if ml_direct:
+        active.append("direct_arc")
+    if ml_transshipment or no_transshipment_guidance:
+        active.append("hub_transshipment")
+    if no_transshipment_guidance:
+        active.append("hub_other")
+    if ml_direct:
+        active.append("direct_no_change")
+    if ml_transshipment:
+        active.append("transshipment_change")
+    return [family for family in active if len(families[family]) > 0]
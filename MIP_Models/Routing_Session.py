@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+
+from gurobipy import GRB
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from MIP_Models.MIPs import ROUTING_BASE_BUILDERS, apply_mip_start, optimize_routing_model
+from MIP_Models.Routing_Index import ROUTING_FAMILIES, active_routing_families, ml_commodities, routing_families
+
+'''
+Routing model session: build once per instance, re-solve per configuration.
+
+The configurations of main.py differ only in the ML-dependent constraint
+families and in the fixed hubs, so the base formulation is built once. A family
+is added the first time a configuration needs it and relaxed (RHS = infinity)
+while a configuration does not, and hubs are fixed through the bounds of yi.
+'''
+
+class RoutingSession:
+    """
+    Routing model of one instance shared by all its configurations.
+
+    Parameters:
+    - instance_data: InstanceData of the instance.
+    - ml_data: ML predictions of the instance ('Commodity ID', 'Predictions').
+    - builder: 'quicksum' or 'matrix' (see MIPs.ROUTING_BASE_BUILDERS).
+    - cut_pool: Optional Cut_Pool.CutPool seeding every solve with the known cuts of cut_pool_key and
+      recording the cuts it finds.
+    - cut_pool_key: Key of the instance in the cut pool (see Cut_Pool.cut_pool_key).
+    """
+    def __init__(self, instance_data, ml_data, builder="quicksum", cut_pool=None, cut_pool_key=None):
+        build_base, self._add_family = ROUTING_BASE_BUILDERS[builder]
+        self.instance_data = instance_data
+        self.cut_pool = cut_pool
+        self.cut_pool_key = cut_pool_key
+        self.families = routing_families(
+            instance_data.nonzero_flows, *ml_commodities(ml_data, instance_data.nonzero_flows)
+        )
+
+        start = time.perf_counter()
+        self.model = build_base(instance_data)
+        self.model.update()
+        self.build_time = time.perf_counter() - start  # Base model plus every family added so far
+
+        self._constraints = {}  # family -> (constraints, RHS when active)
+        self._active = set()
+        self.solve_log = []  # One entry per solve: configuration, warm start, time to first incumbent, gap, callback time, primal integral
+
+    def configure(self, fixed_hubs, use_ml_guidance, use_location_first, use_direct, use_transhipment):
+        """Bring the model to the given configuration (same arguments as MIPs.solve_routing_decisions)."""
+        model = self.model
+        active = set(active_routing_families(self.families, use_ml_guidance, use_direct, use_transhipment))
+
+        start = time.perf_counter()
+        for family in ROUTING_FAMILIES:
+            if family in active and family not in self._constraints:
+                constraints = self._add_family(model, self.instance_data, family, self.families[family])
+                model.update()
+                self._constraints[family] = (constraints, model.getAttr('RHS', constraints))
+            elif family in self._constraints and (family in active) != (family in self._active):
+                constraints, rhs = self._constraints[family]
+                model.setAttr('RHS', constraints, rhs if family in active else [GRB.INFINITY] * len(constraints))
+        self.build_time += time.perf_counter() - start
+        self._active = active
+
+        # Fix location decisions through the bounds of yi
+        hubs = [model._yi[i] for i in range(1, model._N)]
+        if use_location_first:
+            fixed = [1.0 if i in fixed_hubs else 0.0 for i in range(1, model._N)]
+            model.setAttr('LB', hubs, fixed)
+            model.setAttr('UB', hubs, fixed)
+        else:
+            model.setAttr('LB', hubs, [0.0] * len(hubs))
+            model.setAttr('UB', hubs, [1.0] * len(hubs))
+        model.update()
+
+    def solve(self, fixed_hubs, use_ml_guidance, use_location_first, use_direct, use_transhipment, start=None,
+              fractional_cuts=None):
+        """
+        Configure and solve the model; returns the result dict of MIPs.solve_routing_decisions.
+
+        Parameters:
+        - start: Optional solution of another configuration (result['solution']) used as MIP start,
+          checked against this configuration and repaired if needed (see MIPs.apply_mip_start).
+        - fractional_cuts: Settings of the fractional subtour cuts (see MIPs.optimize_routing_model).
+        """
+        configuration = (use_ml_guidance, use_location_first, use_direct, use_transhipment)
+        self.configure(fixed_hubs, *configuration)
+        # Every configuration starts from scratch; only an explicit start is carried over
+        self.model.reset(1)
+        warm_start = apply_mip_start(self.model, start) if start is not None else None
+        if self.cut_pool is not None:
+            self.cut_pool.seed(self.model, self.cut_pool_key)
+
+        result = optimize_routing_model(self.model, use_ml_guidance, use_location_first, fractional_cuts)
+        result['warm_start'] = warm_start
+        result['cut_pool'] = self.cut_pool.record(self.model, self.cut_pool_key) if self.cut_pool is not None else None
+        self.solve_log.append({
+            'configuration': configuration,
+            'warm_start': warm_start,
+            'time_to_first_incumbent': result['time_to_first_feasible'],
+            'time_to_1perc_gap': result['time_to_1perc_gap'],
+            'primal_integral': result['primal_integral'],
+            'optimality_gap': result['optimality_gap'],
+            'total_solving_time': result['total_solving_time'],
+            'callback_time': result['callback_time'],
+            'user_cuts': result['user_cuts'],
+            'cut_pool': result['cut_pool'],
+        })
+        return result
+
+    def close(self):
+        """Free the Gurobi model."""
+        self.model.dispose()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
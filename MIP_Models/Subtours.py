@@ -2,17 +2,31 @@
 import networkx as nx
 import gurobipy as gp
 from gurobipy import GRB
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order, connected_components, maximum_flow
 import os
 import sys
+import time
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
+from MIP_Models.Telemetry import record_event
+
 """
 MIP FUNCTIONS (To solve optimization problem):
 """
 
+# Default settings of the fractional subtour cuts at MIPNODE (optimize_routing_model(fractional_cuts=...))
+FRACTIONAL_CUTS = {
+    'tolerance': 1e-3,  # Minimum violation of a cut (also the threshold for visited nodes and used vehicles)
+    'max_cuts': 20,  # Cuts per callback
+    'max_cuts_per_vehicle': 5,  # Cuts per vehicle per callback
+    'node_frequency': 10,  # Separate at the root and at every node_frequency-th node (0: root only)
+}
+
 # Define functions for subtour detection and elimination
 def build_graph(solution, N, v, threshold=0.005):
     """
@@ -33,80 +47,229 @@ def find_subtours(G):
     components = [list(component) for component in nx.connected_components(G)]
     return [comp for comp in components if len(comp) < nx.number_of_nodes(G)]
 
-def subtour_elimination_callback(model, where):
+def separate_subtours(x, active, visited=None, threshold=0.05):
     """
-    Callback function to dynamically add subtour elimination constraints and reverse arc constraints,
-    with limits on the number of constraints per vehicle and total constraints per callback.
+    Find reverse arc pairs and subtours of an integer solution with array operations.
+
+    Parameters:
+    - x: (N, N, V) arc values xijv.
+    - active: (V,) vehicle values av; inactive vehicles are skipped.
+    - visited: Optional (V, N) node visit values Zvi; only arcs between visited nodes count.
+    - threshold: Value above which an arc, vehicle or visit is used.
+
+    Returns:
+    - reverse_arcs: Per vehicle, (k, 2) array of customer pairs i < j with both xij and xji used.
+    - subtours: Per vehicle, list of the node lists of the connected components without the depot.
     """
-    if where == GRB.Callback.MIPSOL:
-        # Extract current solution
-        solution_av = model.cbGetSolution(model._av)
-        solution_xijv = model.cbGetSolution(model._xijv)
-        solution_zvi = model.cbGetSolution(model._Zvi)
+    N, _, V = x.shape
+    used = x > threshold
+    used[np.arange(N), np.arange(N), :] = False
+    if visited is not None:
+        on = visited.T > threshold
+        used &= on[:, None, :] & on[None, :, :]
+    used &= (np.asarray(active) > threshold)[None, None, :]
+    used = used.transpose(2, 0, 1)  # (V, N, N)
 
-        all_subtours_resolved = True
-        total_constraints_added = 0  # Track total constraints added
+    # Reverse arcs: customer pairs used in both directions
+    both = used & used.transpose(0, 2, 1)
+    both[:, 0, :] = False
+    both[:, :, 0] = False
+    both &= np.triu(np.ones((N, N), dtype=bool), k=1)[None, :, :]
+    rv, ri, rj = np.nonzero(both)
+    reverse_arcs = np.split(np.column_stack([ri, rj]), np.searchsorted(rv, np.arange(1, V)))
 
-        for v in range(model._Vtotal):  # Loop over vehicles
-            if total_constraints_added >= 10:  # Stop if total constraints limit is reached
+    # Connected components of every vehicle's (undirected) arc graph in one call: node (v, i) is v * N + i
+    ev, ei, ej = np.nonzero(used)
+    graph = csr_matrix((np.ones(len(ev)), (ev * N + ei, ev * N + ej)), shape=(V * N, V * N))
+    _, labels = connected_components(graph, directed=True, connection='weak')
+    labels = labels.reshape(V, N)
+
+    # Nodes with an arc, outside the component of the depot (if the depot has an arc)
+    degree = used.sum(axis=2) + used.sum(axis=1)
+    depot_label = np.where(degree[:, 0] > 0, labels[:, 0], -1)
+    sv, si = np.nonzero((degree > 0) & (labels != depot_label[:, None]))
+    order = np.lexsort((si, labels[sv, si], sv))
+    sv, si, sl = sv[order], si[order], labels[sv, si][order]
+    subtours = [[] for _ in range(V)]
+    starts = np.flatnonzero(np.r_[True, (sv[1:] != sv[:-1]) | (sl[1:] != sl[:-1])]) if len(sv) else []
+    for start, end in zip(starts, list(starts[1:]) + [len(sv)]):
+        subtours[sv[start]].append(si[start:end].tolist())
+    return reverse_arcs, subtours
+
+
+def separate_fractional_subtours(x, active, visited, tolerance=1e-3, max_cuts_per_vehicle=5, scale=1e6):
+    """
+    Find violated connectivity cuts x(delta-(S), v) >= Zvi[v, k] of a fractional solution (S a node set
+    without the depot, k in S) with repeated depot -> k minimum cuts.
+
+    Parameters:
+    - x: (N, N, V) arc values xijv.
+    - active: (V,) vehicle values av.
+    - visited: (V, N) node visit values Zvi.
+    - tolerance: Minimum violation of a cut.
+    - max_cuts_per_vehicle: Cuts returned per vehicle.
+    - scale: Capacities are scaled to integers for scipy's maximum_flow.
+
+    Returns:
+    - Per vehicle, list of (S, k) with S the customer nodes of the cut.
+    """
+    N, _, V = x.shape
+    cuts = [[] for _ in range(V)]
+    for v in np.flatnonzero(np.asarray(active) > tolerance):
+        capacity = np.rint(np.clip(x[:, :, v], 0.0, None) * scale).astype(np.int32)
+        np.fill_diagonal(capacity, 0)
+        graph = csr_matrix(capacity)
+        covered = set()
+        for k in np.argsort(-visited[v, 1:]) + 1:
+            if visited[v, k] <= tolerance or len(cuts[v]) >= max_cuts_per_vehicle:
                 break
+            if k in covered:
+                continue
+            flow = maximum_flow(graph, 0, int(k))
+            if flow.flow_value >= (visited[v, k] - tolerance) * scale:
+                continue
+            # Sink side of the minimum cut: nodes not reachable from the depot in the residual graph
+            residual = csr_matrix(capacity - flow.flow.toarray() > 0)
+            reachable = breadth_first_order(residual, 0, directed=True, return_predecessors=False)
+            subset = np.setdiff1d(np.arange(1, N), reachable)
+            cuts[v].append((subset.tolist(), int(k)))
+            covered.update(subset.tolist())
+    return cuts
 
-            if solution_av[v] > 0.05:  # If vehicle v is active
-                vehicle_constraints_added = 0  # Track constraints for this vehicle
 
-                # Reverse Arc Constraint
-                for i in range(1, model._N):
-                    for j in range(1, model._N):
-                        if i != j and solution_xijv[i, j, v] > 0.05 and solution_xijv[j, i, v] > 0.05:
-                            # Add constraint to prevent both xij and xji being 1
-                            model.cbLazy(model._xijv[i, j, v] + model._xijv[j, i, v] <= 1)
-                            all_subtours_resolved = False
-                            vehicle_constraints_added += 1
-                            total_constraints_added += 1
+def _callback_solution(model, relaxation=False):
+    """
+    Current MIPSOL values (or MIPNODE relaxation values if relaxation) of xijv, av and Zvi as arrays
+    ((N, N, V), (V,), (V, N)), read with one call. The variable lists and their indices are built at
+    the first call.
+    """
+    index = getattr(model, '_subtour_index', None)
+    if index is None:
+        x_keys = np.array(list(model._xijv.keys()), dtype=np.int64).reshape(-1, 3)
+        z_keys = np.array(list(model._Zvi.keys()), dtype=np.int64).reshape(-1, 2)
+        variables = list(model._xijv.values()) + list(model._Zvi.values()) + [model._av[v] for v in range(model._Vtotal)]
+        index = (variables, x_keys, z_keys)
+        model._subtour_index = index
+    variables, x_keys, z_keys = index
+
+    values = np.array(model.cbGetNodeRel(variables) if relaxation else model.cbGetSolution(variables))
+    N, V = model._N, model._Vtotal
+    x = np.zeros((N, N, V))
+    x[x_keys[:, 0], x_keys[:, 1], x_keys[:, 2]] = values[:len(x_keys)]
+    visited = np.zeros((V, N))
+    visited[z_keys[:, 0], z_keys[:, 1]] = values[len(x_keys):len(x_keys) + len(z_keys)]
+    active = values[len(x_keys) + len(z_keys):]
+    return x, active, visited
 
-                            # Stop adding constraints for this vehicle if limit is reached
-                            if vehicle_constraints_added >= 3 or total_constraints_added >= 10:
-                                break
 
-                if total_constraints_added >= 10:
+def cut_constraint(model, cut):
+    """
+    Constraint of a cut of the callback for a routing model:
+    - ("reverse", v, i, j): xijv[i, j, v] + xijv[j, i, v] <= 1
+    - ("subtour", v, S): sum of xijv[i, j, v] inside S <= |S| - 1
+    - ("connect", v, S, k): sum of xijv[i, j, v] into S >= Zvi[v, k]
+    """
+    kind, v = cut[0], cut[1]
+    xijv = model._xijv
+    if kind == "reverse":
+        i, j = cut[2], cut[3]
+        return xijv[i, j, v] + xijv[j, i, v] <= 1
+    if kind == "subtour":
+        subtour = cut[2]
+        return gp.quicksum(xijv[i, j, v] for i in subtour for j in subtour if i != j) <= len(subtour) - 1
+    if kind == "connect":
+        subset, k = cut[2], cut[3]
+        outside = [i for i in range(model._N) if i not in subset]
+        return gp.quicksum(xijv[i, j, v] for i in outside for j in subset) >= model._Zvi[v, k]
+    raise ValueError(f"Unknown cut type '{kind}'.")
+
+
+def _log_cut(model, cut):
+    """Append a cut to model._cut_log if the model keeps one (see Cut_Pool.CutPool)."""
+    log = getattr(model, '_cut_log', None)
+    if log is not None:
+        log.append(cut)
+
+
+def _add_fractional_cuts(model):
+    """Separate connectivity cuts at a MIPNODE with an optimal node relaxation and add them as user cuts."""
+    settings = model._fractional_cuts
+    node_count = int(model.cbGet(GRB.Callback.MIPNODE_NODCNT))
+    if node_count > 0 and (settings['node_frequency'] <= 0 or node_count % settings['node_frequency'] != 0):
+        return
+    if model.cbGet(GRB.Callback.MIPNODE_STATUS) != GRB.OPTIMAL:
+        return
+
+    x, active, visited = _callback_solution(model, relaxation=True)
+    cuts = separate_fractional_subtours(
+        x, active, visited, settings['tolerance'], settings['max_cuts_per_vehicle']
+    )
+    added = 0
+    for v, vehicle_cuts in enumerate(cuts):
+        for subset, k in vehicle_cuts:
+            if added >= settings['max_cuts']:
+                break
+            cut = ("connect", v, tuple(subset), k)
+            model.cbCut(cut_constraint(model, cut))
+            _log_cut(model, cut)
+            added += 1
+    model._user_cuts = getattr(model, '_user_cuts', 0) + added
+
+
+def subtour_elimination_callback(model, where):
+    """
+    Callback function to dynamically add subtour elimination constraints and reverse arc constraints,
+    with limits on the number of constraints per vehicle (3) and total constraints per callback (10).
+    If model._fractional_cuts holds settings (see FRACTIONAL_CUTS), connectivity cuts of fractional
+    node relaxations are added as user cuts at MIPNODE.
+
+    The time spent in the callback is accumulated in model._callback_time and model._callback_calls, the
+    lazy constraints added in model._lazy_cuts, and the MIP / MIPSOL events go to the solve timeline
+    (see Telemetry.record_event).
+    """
+    if where == GRB.Callback.MIP:
+        record_event(model, where)
+
+    elif where == GRB.Callback.MIPNODE and getattr(model, '_fractional_cuts', None):
+        start = time.perf_counter()
+        _add_fractional_cuts(model)
+        model._callback_time = getattr(model, '_callback_time', 0.0) + time.perf_counter() - start
+        model._callback_calls = getattr(model, '_callback_calls', 0) + 1
+
+    elif where == GRB.Callback.MIPSOL:
+        start = time.perf_counter()
+        x, active, visited = _callback_solution(model)
+        reverse_arcs, subtours = separate_subtours(x, active, visited)
+
+        total_constraints_added = 0  # Track total constraints added
+        for v in range(model._Vtotal):  # Loop over vehicles
+            vehicle_constraints_added = 0  # Track constraints for this vehicle
+
+            # Reverse Arc Constraint: prevent both xij and xji being 1
+            for i, j in reverse_arcs[v]:
+                if vehicle_constraints_added >= 3 or total_constraints_added >= 10:
                     break
+                cut = ("reverse", v, int(i), int(j))
+                model.cbLazy(cut_constraint(model, cut))
+                _log_cut(model, cut)
+                vehicle_constraints_added += 1
+                total_constraints_added += 1
 
-                # Subtour Elimination Constraint
-                # Identify visited nodes (Zvi = 1)
-                visited_nodes = [i for i in range(model._N) if solution_zvi[v, i] > 0.05]
-
-                # Build graph for vehicle v
-                G = nx.Graph()
-                for i in visited_nodes:
-                    for j in visited_nodes:
-                        if i != j and solution_xijv[i, j, v] > 0.05:
-                            G.add_edge(i, j)
-
-                # Find connected components (subtours)
-                components = list(nx.connected_components(G))
-
-                # Add subtour elimination constraints for each disconnected component
-                for subtour in components:
-                    if 0 in subtour:  # Skip components that involve the depot
-                        continue
-
-                    # Arc-based constraint: sum of arcs inside the component must be <= |S| - 1
-                    expr_arc = gp.quicksum(
-                        model._xijv[i, j, v] for i in subtour for j in subtour if i != j
-                    )
-                    model.cbLazy(expr_arc <= len(subtour) - 1)
-                    all_subtours_resolved = False
-                    vehicle_constraints_added += 1
-                    total_constraints_added += 1
-
-                    # Stop adding constraints for this vehicle or overall if limits are reached
-                    if vehicle_constraints_added >= 3 or total_constraints_added >= 10:
-                        break
-
-                if total_constraints_added >= 10:
+            # Subtour Elimination Constraint: sum of arcs inside the component must be <= |S| - 1
+            for subtour in subtours[v]:
+                if vehicle_constraints_added >= 3 or total_constraints_added >= 10:
                     break
+                cut = ("subtour", v, tuple(subtour))
+                model.cbLazy(cut_constraint(model, cut))
+                _log_cut(model, cut)
+                vehicle_constraints_added += 1
+                total_constraints_added += 1
 
         # Record time to first feasible solution if no subtours were added
-        if all_subtours_resolved and not hasattr(model, '_first_feasible_time'):
+        if total_constraints_added == 0 and getattr(model, '_first_feasible_time', None) is None:
             model._first_feasible_time = model.cbGet(GRB.Callback.RUNTIME)
+        model._lazy_cuts = getattr(model, '_lazy_cuts', 0) + total_constraints_added
+        record_event(model, where, accepted=total_constraints_added == 0)
 
+        model._callback_time = getattr(model, '_callback_time', 0.0) + time.perf_counter() - start
+        model._callback_calls = getattr(model, '_callback_calls', 0) + 1
@@ -0,0 +1,152 @@
+import os
+import sys
+
+import numpy as np
+from gurobipy import GRB
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+'''
+Solver telemetry: incumbent / bound timeline of a routing solve.
+
+The routing callback appends a row (runtime, incumbent, bound, nodes, cuts) at
+every MIPSOL event and at MIP events where the incumbent or the bound changed
+(plus one row every TIMELINE_HEARTBEAT seconds for the node count), and the
+solve closes the timeline with its final values. Timelines are stored as one
+compressed .npz file (one array per column) per instance and configuration, and
+summarized as primal integral, time to first incumbent and time to 1% gap.
+'''
+
+TIMELINE_COLUMNS = ('runtime', 'incumbent', 'bound', 'nodes', 'cuts')
+TIMELINE_HEARTBEAT = 1.0  # Seconds between MIP event rows without incumbent or bound change
+TARGET_GAP = 0.01  # Gap of time_to_1perc_gap
+
+
+def start_timeline(model):
+    """Start an empty timeline; the callback records into model._timeline from now on."""
+    model._timeline = []
+
+
+def record_event(model, where, accepted=False):
+    """
+    Append a timeline row from inside the routing callback (no-op without model._timeline).
+
+    Parameters:
+    - where: GRB.Callback.MIP or GRB.Callback.MIPSOL.
+    - accepted: At MIPSOL, whether the callback let the new solution through (no lazy cut added).
+    """
+    timeline = getattr(model, '_timeline', None)
+    if timeline is None:
+        return
+    runtime = model.cbGet(GRB.Callback.RUNTIME)
+    cuts = getattr(model, '_lazy_cuts', 0) + getattr(model, '_user_cuts', 0)
+
+    if where == GRB.Callback.MIP:
+        incumbent = model.cbGet(GRB.Callback.MIP_OBJBST)
+        bound = model.cbGet(GRB.Callback.MIP_OBJBND)
+        if timeline:
+            last = timeline[-1]
+            if incumbent == last[1] and bound == last[2] and runtime - last[0] < TIMELINE_HEARTBEAT:
+                return
+        nodes = model.cbGet(GRB.Callback.MIP_NODCNT)
+
+    elif where == GRB.Callback.MIPSOL:
+        incumbent = model.cbGet(GRB.Callback.MIPSOL_OBJBST)
+        if accepted:
+            incumbent = min(incumbent, model.cbGet(GRB.Callback.MIPSOL_OBJ))
+        bound = model.cbGet(GRB.Callback.MIPSOL_OBJBND)
+        nodes = model.cbGet(GRB.Callback.MIPSOL_NODCNT)
+
+    else:
+        return
+    timeline.append((runtime, incumbent, bound, nodes, cuts))
+
+
+def finish_timeline(model):
+    """
+    Close the timeline of a finished solve with its final values and return it as columns
+    ({column: array}, no incumbent = inf, no bound = -inf), or None if no timeline was started.
+    """
+    timeline = getattr(model, '_timeline', None)
+    if timeline is None:
+        return None
+    incumbent = model.ObjVal if model.SolCount > 0 else GRB.INFINITY
+    bound = model.ObjBound if model.SolCount > 0 else -GRB.INFINITY
+    cuts = getattr(model, '_lazy_cuts', 0) + getattr(model, '_user_cuts', 0)
+    timeline.append((model.Runtime, incumbent, bound, model.NodeCount, cuts))
+
+    rows = np.array(timeline, dtype=float).reshape(-1, len(TIMELINE_COLUMNS))
+    columns = dict(zip(TIMELINE_COLUMNS, rows.T))
+    columns['incumbent'][columns['incumbent'] >= GRB.INFINITY] = np.inf
+    columns['bound'][columns['bound'] <= -GRB.INFINITY] = -np.inf
+    model._timeline = None
+    return columns
+
+
+def timeline_metrics(timeline, reference=None):
+    """
+    Primal integral, time to first incumbent and time to 1% gap of a timeline.
+
+    Parameters:
+    - timeline: Columns of finish_timeline (or load_timeline).
+    - reference: Objective the primal gap is measured against; default the best incumbent of the timeline.
+
+    The primal gap at time t is 1 without an incumbent and |reference - incumbent| / max(|reference|, |incumbent|)
+    otherwise; the primal integral is its integral over the solve (seconds). Times are None if never reached.
+    """
+    runtime, incumbent, bound = timeline['runtime'], timeline['incumbent'], timeline['bound']
+    found = np.isfinite(incumbent)
+    if reference is None:
+        reference = incumbent[found].min() if found.any() else None
+
+    primal_gap = np.ones(len(runtime))
+    if reference is not None:
+        scale = np.maximum(np.abs(reference), np.abs(incumbent[found]))
+        difference = np.abs(reference - incumbent[found])
+        primal_gap[found] = np.minimum(np.divide(difference, scale, out=np.zeros_like(difference), where=scale > 0), 1.0)
+    # Step function: no incumbent before the first row, row k holds until row k + 1
+    primal_integral = runtime[0] + float(np.sum(primal_gap[:-1] * np.diff(runtime))) if len(runtime) else 0.0
+
+    # Relative gap as Gurobi's MIPGap: |incumbent - bound| / |incumbent|
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mip_gap = np.where(found, np.abs(incumbent - bound) / np.abs(incumbent), np.inf)
+    mip_gap[found & (incumbent == bound)] = 0.0
+    within_gap = np.flatnonzero(mip_gap <= TARGET_GAP)
+
+    return {
+        'primal_integral': float(primal_integral),
+        'time_to_first_incumbent': float(runtime[found][0]) if found.any() else None,
+        'time_to_1perc_gap': float(runtime[within_gap[0]]) if len(within_gap) else None,
+    }
+
+
+def configuration_label(configuration):
+    """Short label of a main.py configuration, e.g. '1011' or '1011_alns'."""
+    label = "".join(str(int(bool(flag))) for flag in configuration[:4])
+    if len(configuration) > 4:
+        label += f"_{configuration[4]}"
+    return label
+
+
+def timeline_file(folder, instance_id, configuration):
+    """Path of the timeline of one instance and configuration, e.g. '<folder>/8R-alpha=021_1011.npz'."""
+    return os.path.join(folder, f"{instance_id}_{configuration_label(configuration)}.npz")
+
+
+def save_timeline(folder, instance_id, configuration, timeline):
+    """Write a timeline as one compressed array per column; returns the file path."""
+    os.makedirs(folder, exist_ok=True)
+    file_path = timeline_file(folder, instance_id, configuration)
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        np.savez_compressed(file, **timeline)
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+def load_timeline(file_path):
+    """Read a timeline written by save_timeline as {column: array}."""
+    with np.load(file_path) as stored:
+        return {column: stored[column] for column in TIMELINE_COLUMNS}
@@ -6,40 +6,39 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
-from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from Auxiliary_Functions.Instance_Catalog import InstanceCatalog
+from Auxiliary_Functions.Virtual_Instances import VirtualInstances
 from Auxiliary_Functions.extracting_input_features import extract_input_features
 
-def process_instances_and_save_combined(instance_files, data_folders, output_file):
+def process_instances_and_save_combined(instance_files, data_folders, output_file, instance_filter=None):
     """
     Process instance files by extracting ML input features for all commodities and saving them into one combined file.
     
     Parameters:
-    - instance_files: List of instance file names to process (e.g., ['file.dat']).
+    - instance_files: List of instance file names to process (e.g., ['file.dat']), or None to use instance_filter.
     - data_folders: List of folders to search for instance files (in order).
     - output_file: Path to the combined output CSV file.
+    - instance_filter: Catalog criteria selecting the instances when instance_files is None
+      (e.g., {'S': lambda S: S <= 10, 'flow_perc': 50}).
     """
     combined_features = []  # List to hold features for all instances and commodities
 
+    # Index the data folders once instead of probing them per instance
+    catalog = InstanceCatalog(data_folders)
+    instances = VirtualInstances(catalog)
+    if instance_files is None:
+        instance_files = [f"{instance_id}.dat" for instance_id in catalog.select(**(instance_filter or {}))]
+
     for idx, instance_file in enumerate(instance_files, start=1):
         print(f"Processing instance {idx}: {instance_file}")
 
-        # Search for the instance file in the data folders
-        instance_path = None
-        for folder in data_folders:
-            potential_path = os.path.join(folder, instance_file)
-            if os.path.isfile(potential_path):
-                instance_path = potential_path
-                break
+        # Load instance data (stored file or virtual recipe)
+        instance_data = instances.load(instance_file)
 
-        if instance_path is None:
-            print(f"Error: Instance file '{instance_file}' not found in any data folder.")
+        if instance_data is None:
+            print(f"Error: Instance '{instance_file}' not found in any data folder and has no known base instance.")
             continue
 
-        print(f"Found instance file at: {instance_path}")
-
-        # Load instance data
-        instance_data = read_instance_from_dat(instance_path)
-
         # Extract only the file name (without the full path) to use as the Instance ID
         instance_name = os.path.splitext(instance_file)[0]
 
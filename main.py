@@ -15,15 +15,27 @@ current_dir = os.getcwd()
 project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
-from Auxiliary_Functions.Reading_Instances import read_instance_from_dat
+from Auxiliary_Functions.Instance_Catalog import InstanceCatalog
+from Auxiliary_Functions.Virtual_Instances import VirtualInstances
 from MIP_Models.MIP import solve_flow_aware_location_decisions, solve_all_or_routing_decisions
 from MIP_Models.MIPs import solve_location_decisions, solve_routing_decisions
+from MIP_Models.Routing_Session import RoutingSession
+from MIP_Models.Routing_Index import ml_commodities
+from MIP_Models.Cut_Pool import CutPool, cut_pool_key
+from MIP_Models.Telemetry import configuration_label, save_timeline
+from Heuristics.Greedy_Constructive import greedy_routing_plan
+from Heuristics.ALNS import solve_routing_alns
 from Auxiliary_Functions.extracting_solution_features import extract_OFV_solution_features
+from Auxiliary_Functions.Feasibility_checks import check_feasibility
+from Auxiliary_Functions.Feasibility_Audit import save_solution
 
 
 
 # %%
-def main(data_folders, ml_input_file, heuristic_output_folder):
+def main(data_folders, ml_input_file, heuristic_output_folder, instance_filter=None, routing_builder="quicksum",
+         reuse_routing_model=True, warm_start=False, heuristic_start=False,
+         alns_time_budget=60.0, fractional_cuts=None, cut_pool_file=None, telemetry_folder=None,
+         check_solutions=True, solution_folder=None):
     # Load the ML combined input file
     try:
         ml_combined_data = pd.read_csv(ml_input_file)
@@ -31,8 +43,19 @@ def main(data_folders, ml_input_file, heuristic_output_folder):
         print(f"Error: File '{ml_input_file}' not found. Please check the path.")
         return
 
-    # Extract unique instance IDs
+    # Index the data folders once instead of probing them per instance; recipe IDs without a
+    # file (e.g. '8R-alpha=021_Flow_50perc_HubCosts_5perc_seed54321') are built from their base instance
+    catalog = InstanceCatalog(data_folders)
+    instances = VirtualInstances(catalog)
+
+    # Extract unique instance IDs (optionally restricted by instance metadata, e.g. {'S': lambda S: S <= 10, 'flow_perc': 50};
+    # recipe IDs are matched on the instance they build)
     unique_instance_ids = ml_combined_data["Instance ID"].unique()
+    if instance_filter:
+        unique_instance_ids = instances.select(unique_instance_ids, **instance_filter)
+
+    # Cuts of earlier solves of the same base instance and vehicles, given to every routing solve upfront
+    cut_pool = CutPool(cut_pool_file) if cut_pool_file is not None else None
 
     # Create heuristic output folder if it doesn't exist
     os.makedirs(heuristic_output_folder, exist_ok=True)
@@ -53,6 +76,17 @@ def main(data_folders, ml_input_file, heuristic_output_folder):
     if not os.path.exists(output_file):
         pd.DataFrame(columns=columns).to_csv(output_file, index=False)
 
+    # Solver telemetry: one timeline file per instance and configuration plus a summary CSV
+    telemetry_columns = [
+        "Instance ID", "Configuration", "Timeline File", "Time to First Incumbent", "Time to 1% Gap",
+        "Primal Integral", "Total Solving Time",
+    ]
+    if telemetry_folder is not None:
+        os.makedirs(telemetry_folder, exist_ok=True)
+        telemetry_file = os.path.join(telemetry_folder, f"Telemetry_{input_csv_name}")
+        if not os.path.exists(telemetry_file):
+            pd.DataFrame(columns=telemetry_columns).to_csv(telemetry_file, index=False)
+
     # Define all configurations for solving
     configurations = [
         (False, False, False, False),# No ML guidance, no location first
@@ -63,39 +97,40 @@ def main(data_folders, ml_input_file, heuristic_output_folder):
         # (True, True, True, False),   # ML-guided (direct only, location first)**
         # (True, True, False, True),  # ML-guided (transshipment only, location first)**
         # (True, True, True, True),   # ML-guided (both, location first)**
+        # (True, False, True, True, "alns"),  # ALNS with ML move biases instead of the MIP (Heuristics/ALNS.py)
     ]
 
     # Loop through each instance
     for instance_id in unique_instance_ids:
-        # Search for the instance file in the data folders
-        instance_file = None
-        for folder in data_folders:
-            potential_path = os.path.join(folder, f"{instance_id}.dat")
-            if os.path.isfile(potential_path):
-                instance_file = potential_path
-                break
-
-        if instance_file is None:
-            print(f"Instance file '{instance_id}.dat' not found in any data folder.")
+        # Load instance data (stored file or virtual recipe)
+        instance_data = instances.load(instance_id)
+
+        if instance_data is None:
+            print(f"Instance '{instance_id}' not found in any data folder and has no known base instance.")
             continue
 
         print(f"Processing instance: {instance_id}")
 
-        # Load instance data
-        instance_data = read_instance_from_dat(instance_file)
-
         # Filter ML data for the current instance
         ml_data = ml_combined_data[ml_combined_data["Instance ID"] == instance_id]
 
+        # Routing model shared by the configurations of this instance (built on first use)
+        session = None
+        pool_key = cut_pool_key(instance_id, instance_data)
+        # Latest routing solution of this instance, the MIP start of the next configuration if warm_start
+        incumbent = None
+
         # Loop through each configuration
-        for use_ml_guidance, use_location_first, use_ML_direct, use_ML_transhipment in configurations:
+        for configuration in configurations:
+            use_ml_guidance, use_location_first, use_ML_direct, use_ML_transhipment = configuration[:4]
+            solver = configuration[4] if len(configuration) > 4 else "mip"
             # Ensure at least one of use_ML_direct or use_ML_transhipment is True if use_ml_guidance is True
             if use_ml_guidance and not (use_ML_direct or use_ML_transhipment):
                 print("Skipping invalid configuration.")
                 continue
 
             print(f"Configuration: use_ml_guidance={use_ml_guidance}, use_location_first={use_location_first}, "
-                  f"use_ML_direct={use_ML_direct}, use_ML_transhipment={use_ML_transhipment}")
+                  f"use_ML_direct={use_ML_direct}, use_ML_transhipment={use_ML_transhipment}, solver={solver}")
 
             fixed_hubs = []  # Default value if not solving location decisions
             stage1_status = "Not Solved"
@@ -125,11 +160,56 @@ def main(data_folders, ml_input_file, heuristic_output_folder):
             # Stage 2: Solve routing decisions
             try:
                 print("Solving routing decisions...")
-                result = solve_routing_decisions(
-                    instance_data, ml_data, fixed_hubs, use_ml_guidance, use_location_first, use_ML_direct, use_ML_transhipment
-                )
+                if solver == "alns":
+                    result = solve_routing_alns(
+                        instance_data, ml_data, fixed_hubs, use_ml_guidance, use_location_first, use_ML_direct, use_ML_transhipment,
+                        time_budget=alns_time_budget,
+                    )
+                else:
+                    start = incumbent if warm_start else None
+                    if start is None and heuristic_start:
+                        # Greedy plan within this configuration's hubs, keeping ML direct commodities on one vehicle
+                        direct = ml_commodities(ml_data, instance_data.nonzero_flows)[0] if use_ml_guidance and use_ML_direct else ()
+                        start = greedy_routing_plan(instance_data, hubs=fixed_hubs, no_transfer=direct).to_solution()
+                    if reuse_routing_model:
+                        if session is None:
+                            session = RoutingSession(
+                                instance_data, ml_data, builder=routing_builder, cut_pool=cut_pool, cut_pool_key=pool_key
+                            )
+                        result = session.solve(
+                            fixed_hubs, use_ml_guidance, use_location_first, use_ML_direct, use_ML_transhipment,
+                            start=start, fractional_cuts=fractional_cuts,
+                        )
+                    else:
+                        result = solve_routing_decisions(
+                            instance_data, ml_data, fixed_hubs, use_ml_guidance, use_location_first, use_ML_direct, use_ML_transhipment,
+                            builder=routing_builder, start=start, fractional_cuts=fractional_cuts,
+                            cut_pool=cut_pool, cut_pool_key=pool_key,
+                        )
+                if result['solution'] is not None:
+                    incumbent = result['solution']
+                print(f"Warm start: {result['warm_start']}")
+
+                if telemetry_folder is not None and result.get('timeline') is not None:
+                    telemetry_row = {
+                        "Instance ID": instance_id,
+                        "Configuration": configuration_label(configuration[:4]),
+                        "Timeline File": os.path.basename(save_timeline(telemetry_folder, instance_id, configuration, result['timeline'])),
+                        "Time to First Incumbent": result['time_to_first_feasible'],
+                        "Time to 1% Gap": result['time_to_1perc_gap'],
+                        "Primal Integral": result['primal_integral'],
+                        "Total Solving Time": result['total_solving_time'],
+                    }
+                    pd.DataFrame([telemetry_row], columns=telemetry_columns).to_csv(telemetry_file, mode='a', header=False, index=False)
+
+                if result['status'] == "ALNS":
+                    # Heuristic solution: feasible, no optimality gap
+                    stage2_status = "Feasible"
+                    optimization_status = "ALNS"
+                    objective_value = result["objective_value"]
+                    solving_time = result["total_solving_time"]
 
-                if result['status'] in [GRB.OPTIMAL, GRB.TIME_LIMIT]:
+                elif result['status'] in [GRB.OPTIMAL, GRB.TIME_LIMIT]:
                     stage2_status = "Feasible"
                     optimization_status = "Optimal" if result['status'] == GRB.OPTIMAL else "Time Limit"
                     optimality_gap = result.get("optimality_gap", None)
@@ -140,6 +220,17 @@ def main(data_folders, ml_input_file, heuristic_output_folder):
                     stage2_status = "Infeasible"
                     optimization_status = "Infeasible"
 
+                # Store the routing solution for the batch audit (Auxiliary_Functions/Feasibility_Audit.py)
+                if solution_folder is not None and result['solution'] is not None:
+                    save_solution(solution_folder, instance_id, configuration_label(configuration), result, instance_data)
+
+                # Validate the routing solution against the model constraints (Feasibility_checks.py)
+                if check_solutions and result['solution'] is not None:
+                    feasible, errors = check_feasibility(instance_data, result['solution'])
+                    if not feasible:
+                        print(f"Feasibility check failed ({len(errors)} violations): {errors[:5]}")
+                        stage2_status = "Check Failed"
+
             except Exception as e:
                 print(f"Error in Stage 2: {e}")
                 stage2_status = "Error"
@@ -165,6 +256,11 @@ def main(data_folders, ml_input_file, heuristic_output_folder):
 
             print(f"Saved configuration result for instance: {instance_id}")
 
+        if session is not None:
+            session.close()
+        if cut_pool is not None:
+            cut_pool.save()
+
     print(f"All results saved to {output_file}")
 
 
@@ -184,6 +280,40 @@ if __name__ == "__main__":
     # Path to the heuristic output folder
     heuristic_output_folder = "ML Experiments/Heuristic Results"
 
+    # Routing model builder: 'quicksum' or 'matrix' (same model, built with the Gurobi matrix API)
+    routing_builder = "quicksum"
+
+    # Build the routing model once per instance and modify it per configuration
+    reuse_routing_model = True
+
+    # Start every configuration from the previous configuration's solution (checked and repaired)
+    warm_start = False
+
+    # Start from the greedy constructive plan (Heuristics/Greedy_Constructive.py) when there is no warm start
+    heuristic_start = False
+
+    # Time budget (s) of the ALNS configurations ("alns" entries of the configurations in main)
+    alns_time_budget = 60.0
+
+    # Subtour cuts of fractional node relaxations: None (off) or settings, e.g. {} for MIP_Models/Subtours.FRACTIONAL_CUTS
+    fractional_cuts = None
+
+    # Persistent cut pool file (e.g. MIP_Models/Cut_Pool.DEFAULT_CUT_POOL_FILE), None to rediscover cuts in every solve
+    cut_pool_file = None
+
+    # Folder of the solver telemetry (incumbent / bound timelines and their summary, see MIP_Models/Telemetry.py), e.g.
+    # "ML Experiments/Heuristic Results/Telemetry", None to skip
+    telemetry_folder = None
+
+    # Check every routing solution with check_feasibility ("Check Failed" in Stage 2 Feasibility if violated)
+    check_solutions = True
+
+    # Folder the routing solutions are stored in for the batch feasibility audit (Auxiliary_Functions/Feasibility_Audit.py), None to skip
+    solution_folder = None
+
     # Run the main function
-    main(data_folders, ml_input_file, heuristic_output_folder)
+    main(data_folders, ml_input_file, heuristic_output_folder, routing_builder=routing_builder,
+         reuse_routing_model=reuse_routing_model, warm_start=warm_start, heuristic_start=heuristic_start,
+         alns_time_budget=alns_time_budget, fractional_cuts=fractional_cuts, cut_pool_file=cut_pool_file,
+         telemetry_folder=telemetry_folder, check_solutions=check_solutions, solution_folder=solution_folder)
 